@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Scale benchmarks for catalog operations and hex generation (no Tk)
+- Synthetic catalogs of 1k, 100k and 1M entries (deterministic: same seed, same catalog),
+  with the mess real catalogs have: missing names, "Python" spelled differently,
+  optional images, repeated files
+- Times per size: normalization (dicts and the editor's compact entries), store build,
+  lookups by file, add/update/remove/move, search, JSON save and streaming load
+- Times Intel HEX generation: script records, complete appended-script hex, and the
+  mapped-firmware path of hex_batch.py, on a synthetic firmware of realistic size
+- Every case reports the best of --repeat runs; results go to build/bench-results.json
+- With a stored baseline (--save-baseline) a later run fails (exit 1) when a case got
+  slower than the baseline by more than --threshold
+
+Run:
+    python3 benchmarks.py [--sizes 1k,100k,1m] [--repeat 3] [--save-baseline]
+    python3 benchmarks.py --sizes 1k,100k --threshold 0.25
+
+Exit codes: 0 ok, 1 regression against the baseline, 2 unusable baseline/output.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from calliope_hex import append_script_v1, make_record, script_records
+from examples_catalog import (CatalogStore, EditHistory, Entry, atomic_write, normalize_entries, read_examples,
+                              write_catalog_atomic)
+from examples_manifest import ROOT
+from examples_search import SearchIndex
+
+RESULTS_VERSION = 1
+DEFAULT_OUTPUT = os.path.join(ROOT, "build", "bench-results.json")
+DEFAULT_BASELINE = os.path.join(ROOT, "build", "bench-baseline.json")
+DEFAULT_SIZES = "1k,100k,1m"
+OPS = 10000           # lookups/edits per size (at most half the catalog)
+MIN_DELTA_S = 0.005   # differences below this are noise, never a regression
+
+WORDS = ("stern", "kreis", "quadrat", "spirale", "blume", "haus", "baum", "auto", "ampel", "musik",
+         "licht", "sensor", "würfel", "herz", "pfeil", "uhr", "kompass", "regen", "sonne", "mond")
+DIRS = ("turtlebeispiele", "calliopebeispiele", "python/math", "micropython/sensoren", "klasse7/projekte")
+
+
+# ---------- Synthetic data ----------
+def parse_size(text):
+    text = text.strip().lower()
+    factor = {"k": 1000, "m": 1000000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * factor)
+
+
+def size_label(n):
+    if n >= 1000000 and n % 1000000 == 0:
+        return f"{n // 1000000}m"
+    if n >= 1000 and n % 1000 == 0:
+        return f"{n // 1000}k"
+    return str(n)
+
+
+def synthetic_items(n, seed=1):
+    """n raw catalog items as read from examples.json (about 1 % repeat an earlier file)."""
+    rnd = random.Random(seed)
+    items = []
+    for i in range(n):
+        d = rnd.choice(DIRS)
+        w = rnd.choice(WORDS)
+        file = f"{d}/{w}_{i}.py" if i < 100 or rnd.random() > 0.01 else items[rnd.randrange(i)]["file"]
+        it = {"file": file, "runtime": rnd.choice(("python", "micropython", "Python", "MicroPython"))}
+        if rnd.random() > 0.05:
+            it["name"] = f"{w.title()} {rnd.choice(WORDS)} {i}"
+        if rnd.random() > 0.3:
+            it["image"] = f"{d}/{w}_{i}.png"
+        items.append(it)
+    return items
+
+
+def synthetic_script(size, seed=1):
+    rnd = random.Random(seed)
+    lines = ["from calliope_mini import *", ""]
+    while sum(len(x) + 1 for x in lines) < size:
+        w = rnd.choice(WORDS).replace("ü", "ue")
+        lines.append(f"def {w}_{len(lines)}(n):  # {w}")
+        lines.append(f"    display.scroll(str(n * {rnd.randrange(100)}))")
+    return "\n".join(lines)[:size]
+
+
+def synthetic_firmware(kib=512):
+    """Intel HEX text of kib KiB of flash (16-byte data records, ELA every 64 KiB)."""
+    rnd = random.Random(7)
+    lines = []
+    for addr in range(0, kib * 1024, 16):
+        if addr % 0x10000 == 0:
+            upper = addr >> 16
+            lines.append(make_record(0, 0x04, bytes(((upper >> 8) & 0xFF, upper & 0xFF))))
+        lines.append(make_record(addr & 0xFFFF, 0x00, bytes(rnd.randrange(256) for _ in range(16))))
+    lines.append(":00000001FF")
+    return "\n".join(lines) + "\n"
+
+
+# ---------- Timing ----------
+class Bench:
+    def __init__(self, repeat):
+        self.repeat = repeat
+        self.results = {}  # case -> {"s": best seconds, "ops": n}
+
+    def run(self, case, func, setup=None, ops=1, repeat=None):
+        """Best wall time of func(state) over the repeats; setup() builds a fresh state per run."""
+        best = None
+        for _ in range(repeat or self.repeat):
+            state = setup() if setup else None
+            gc.collect()
+            t0 = time.perf_counter()
+            func(state)
+            dt = time.perf_counter() - t0
+            best = dt if best is None else min(best, dt)
+        self.results[case] = {"s": round(best, 6), "ops": ops}
+        print(f"  {case:32s} {best * 1000:10.2f} ms" + (f"  ({best / ops * 1e6:.2f} µs/op)" if ops > 1 else ""),
+              file=sys.stderr)
+        return best
+
+
+def bench_catalog(bench, n, tmp):
+    label = size_label(n)
+    repeat = 1 if n >= 1000000 else None
+    items = synthetic_items(n)
+    rnd = random.Random(n)
+    ops = min(OPS, n // 2)
+
+    bench.run(f"normalize/{label}", lambda _: normalize_entries(items), repeat=repeat)
+    bench.run(f"normalize_compact/{label}", lambda _: normalize_entries(items, compact=True), repeat=repeat)
+    entries = normalize_entries(items, compact=True)
+    bench.run(f"store_load/{label}", lambda _: CatalogStore(entries), repeat=repeat)
+
+    store = CatalogStore(entries)
+    files = [store.entry_at(rnd.randrange(len(store)))["file"] for _ in range(ops)]
+    bench.run(f"lookup_index_of/{label}", lambda _: [store.index_of(f) for f in files], ops=ops)
+    bench.run(f"lookup_get/{label}", lambda _: [store.get(f) for f in files], ops=ops)
+
+    def fresh():
+        return EditHistory(CatalogStore(entries))
+
+    def add(h):
+        for i in range(ops):
+            h.upsert(Entry(f"neu/prog_{i}.py", f"Neu {i}", "python"))
+
+    def update(h):
+        for f in files:
+            e = h.store.get(f)
+            h.upsert(Entry(e.file, e.name + "!", e.runtime, e.image, e.extra))
+
+    def remove(h):
+        r = random.Random(1)
+        for _ in range(ops):
+            h.remove_at(r.randrange(len(h.store)))
+
+    def move(h):
+        r = random.Random(2)
+        for _ in range(ops):
+            h.move(r.randrange(1, len(h.store) - 1), r.choice((-1, 1)))
+
+    def undo(h):
+        remove(h)
+        while h.can_undo:
+            h.undo()
+
+    for name, func in (("add", add), ("update", update), ("remove", remove), ("move", move), ("remove_undo", undo)):
+        bench.run(f"edit_{name}/{label}", func, setup=fresh, ops=ops, repeat=repeat)
+
+    def indexed():
+        s = CatalogStore(entries)
+        s.add_index(SearchIndex())
+        return s
+
+    bench.run(f"search_index_build/{label}", lambda _: indexed(), repeat=repeat)
+    index = SearchIndex()
+    store.add_index(index)
+    queries = [rnd.choice(WORDS)[:k] + (f" {rnd.randrange(100)}" if k > 3 else "") for k in (1, 2, 3, 4, 5) * 20]
+    index.search("warm")  # sorted word list is built on the first search
+    bench.run(f"search/{label}", lambda _: [store.at_slots(index.search(q)) for q in queries], ops=len(queries))
+
+    path = os.path.join(tmp, f"catalog-{label}.json")
+    bench.run(f"json_save/{label}", lambda _: write_catalog_atomic(path, entries), repeat=repeat)
+    bench.run(f"json_load_stream/{label}", lambda _: read_examples(path), repeat=repeat)
+
+    def load_full(_):
+        with open(path, encoding="utf-8") as f:
+            json.load(f)
+
+    bench.run(f"json_load_full/{label}", load_full, repeat=repeat)
+    os.remove(path)
+
+
+def bench_hex(bench, tmp):
+    from firmware_cache import FirmwareCache
+    base = synthetic_firmware()
+    script = synthetic_script(8000)
+    small = synthetic_script(800)
+    bench.run("hex_script_records/8k", lambda _: [script_records(script) for _ in range(100)], ops=100)
+    bench.run("hex_append_v1/8k", lambda _: [append_script_v1(base, script) for _ in range(10)], ops=10)
+
+    fw_path = os.path.join(tmp, "firmware.hex")
+    with open(fw_path, "w", encoding="utf-8") as f:
+        f.write(base)
+    cache_dir = os.path.join(tmp, "fw-cache")
+    bench.run("hex_firmware_parse/512k", lambda _: FirmwareCache(cache_dir).get(fw_path),
+              setup=lambda: shutil.rmtree(cache_dir, ignore_errors=True))
+    FirmwareCache(cache_dir).get(fw_path)
+    bench.run("hex_firmware_map/512k", lambda _: FirmwareCache(cache_dir).get(fw_path))
+    fw = FirmwareCache(cache_dir).get(fw_path)
+    bench.run("hex_mapped_v1/800", lambda _: [fw.build_v1(small) for _ in range(100)], ops=100)
+    assert fw.build_v1(small).decode("ascii") == append_script_v1(base, small)
+
+
+# ---------- Baseline ----------
+def compare(results, baseline, threshold):
+    """Cases slower than the baseline by more than threshold (and MIN_DELTA_S)."""
+    regressions = []
+    for case, now in results.items():
+        before = baseline.get(case)
+        if not before:
+            continue
+        delta = now["s"] - before["s"]
+        if delta > MIN_DELTA_S and now["s"] > before["s"] * (1 + threshold):
+            regressions.append({"case": case, "baseline_s": before["s"], "s": now["s"],
+                                "ratio": round(now["s"] / before["s"], 3)})
+    return regressions
+
+
+def read_results(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != RESULTS_VERSION:
+        raise ValueError(f"unbekannte Version in {path}")
+    return data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scale benchmarks for catalog operations and hex generation.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"catalog sizes (default {DEFAULT_SIZES})")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case, the best counts (1M: always 1)")
+    parser.add_argument("--no-hex", action="store_true", help="skip the hex generation cases")
+    parser.add_argument("--output", "-o", default=DEFAULT_OUTPUT, help="results file ('-' = stdout only)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown against the baseline (0.25 = 25 %%)")
+    args = parser.parse_args(argv)
+
+    try:
+        sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+    except ValueError:
+        print(f"Fehler: ungültige Größen {args.sizes!r}", file=sys.stderr)
+        return 2
+    bench = Bench(max(1, args.repeat))
+    t0 = time.perf_counter()
+    tmp = tempfile.mkdtemp(prefix="calliope-bench-")
+    try:
+        for n in sizes:
+            print(f"Katalog {size_label(n)}:", file=sys.stderr)
+            bench_catalog(bench, n, tmp)
+        if not args.no_hex:
+            print("Hex:", file=sys.stderr)
+            bench_hex(bench, tmp)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    report = {
+        "version": RESULTS_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+        "total_s": round(time.perf_counter() - t0, 2),
+        "results": bench.results,
+    }
+    code = 0
+    if not args.save_baseline and os.path.exists(args.baseline):
+        try:
+            baseline = read_results(args.baseline)
+        except (OSError, ValueError) as e:
+            print(f"Fehler: Baseline nicht lesbar: {e}", file=sys.stderr)
+            return 2
+        report["baseline"] = {"path": args.baseline, "created": baseline.get("created"), "threshold": args.threshold}
+        report["regressions"] = compare(bench.results, baseline["results"], args.threshold)
+        code = 1 if report["regressions"] else 0
+    try:
+        for path in ([args.output] if args.output != "-" else []) + ([args.baseline] if args.save_baseline else []):
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            atomic_write(path, lambda f: json.dump(report, f, indent=1))
+    except OSError as e:
+        print(f"Fehler: {e}", file=sys.stderr)
+        return 2
+    json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
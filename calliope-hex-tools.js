@@ -95,11 +95,64 @@ export function appendScriptV1(baseHex, pythonText){
   return lines.join('\n') + '\n';
 }
 
+///////////////////////////
+// Delta (hex_delta.py): nur die geänderten Records, Rest kommt aus der Basis-Firmware
+///////////////////////////
+export function applyHexDelta(baseHex, delta){
+  // delta = { version: 1, base, lines, ops: [["copy", ersteZeile, anzahl] | ["insert", [record, ...]]] }
+  // Zeilen beziehen sich auf die Firmware ohne EOF/Leerzeilen (wie stripEOF).
+  if (!delta || delta.version !== 1) throw new Error("Unbekanntes Delta-Format.");
+  let baseText = baseHex;
+  if (delta.base_kind === 'fs-runtime'){
+    // Dateisystem-Builds (micropython_fs.py): Basis ist der Runtime-Teil, wie ihn microbit-fs erzeugt
+    const cache = localFsBuilderCache(baseHex);
+    if (!cache) throw new Error("microbit-fs nicht geladen (für Dateisystem-Deltas nötig).");
+    baseText = cache.uPyIntelHex;
+  }
+  const base = stripEOF(baseText).split('\n');
+  const out = [];
+  for (const op of delta.ops){
+    if (op[0] === 'copy'){
+      const [, start, count] = op;
+      if (start < 0 || start + count > base.length) throw new Error("Delta passt nicht zur Firmware.");
+      for (let i = start; i < start + count; i++) out.push(base[i]);
+    } else if (op[0] === 'insert'){
+      for (const line of op[1]) out.push(line);
+    } else {
+      throw new Error(`Unbekannte Delta-Operation: ${op[0]}`);
+    }
+  }
+  if (out.length !== delta.lines) throw new Error("Delta passt nicht zur Firmware.");
+  return out.join('\n') + '\n';
+}
+
 ///////////////////////////
 // 2) Auto: V3 über Filesystem (falls Lib verfügbar) → sonst Fallback auf V1-Append
 ///////////////////////////
+// Builder-Cache der lokal eingebundenen microbit-fs-UMD (vendor/microbit-fs/dist), pro Firmware-Text
+let localFsCache = { baseHex: null, cache: null };
+
+function localFsBuilderCache(baseHex){
+  const mfs = (typeof window !== 'undefined') && window.microbitFs;
+  if (!mfs || typeof mfs.createMpFsBuilderCache !== 'function') return null;
+  if (localFsCache.baseHex !== baseHex){
+    localFsCache = { baseHex, cache: mfs.createMpFsBuilderCache(baseHex) };
+  }
+  return localFsCache.cache;
+}
+
 export async function packMainPyAuto(baseHex, pythonText){
-  // Versuche, die micro:bit-FS-Lib dynamisch zu laden (CDN).
+  // 1) Lokale microbit-fs-UMD (index.html lädt sie): offline, ohne CDN-Wartezeit.
+  //    Gleiche Ausgabe wie MicropythonFsHex.getIntelHex() (auch micropython_fs.py).
+  const cache = localFsBuilderCache(baseHex);
+  if (cache){
+    const bytes = new TextEncoder().encode(pythonText);
+    if (window.microbitFs.calculateFileSize('main.py', bytes) > cache.fsSize){
+      throw new Error('Kein Speicherplatz mehr im Dateisystem.');
+    }
+    return window.microbitFs.generateHexWithFiles(cache, { 'main.py': bytes });
+  }
+  // 2) Versuche, die micro:bit-FS-Lib dynamisch zu laden (CDN).
   // Sie kann aus einem MicroPython-HEX die FS-Region ermitteln (Layouttabelle/UICR)
   // und Dateien wie 'main.py' einbetten. Für Calliope mini V3 (CODAL-Port)
   // ist das sehr ähnlich wie beim micro:bit V2.
@@ -121,5 +174,5 @@ export async function packMainPyAuto(baseHex, pythonText){
 }
 
 // --- Ein Mini-Demo zum Ausprobieren (kannst du löschen) ---
-window.calliopeHexTools = { appendScriptV1, packMainPyAuto };
+window.calliopeHexTools = { appendScriptV1, packMainPyAuto, applyHexDelta };
 
@@ -7,6 +7,7 @@
  * Abhängigkeiten (global):
  *   - window.calliopeHexTools: { appendScriptV1, packMainPyAuto, hexToU8? }
  *   - window.CalliopeSerial?: { saveHexToDrive?, expectReset? }
+ *   - window.pyMinify?: { minifyCached } (py-minify.js, verkleinert das Script vor dem Einbetten)
  *   - DAPjs (für C3-WebUSB): lädt in deiner index.html als ES-Modul und setzt
  *       window.DAPjs, window.DAPLink, window.WebUSB
  */
@@ -53,15 +54,23 @@
   }
 
   async function fetchText(url, purpose = 'Ressource') {
-    const res = await fetch(url, { cache: 'no-store' });
+    const res = await fetch(url, { cache: 'no-cache' });
     if (!res.ok) throw new Error(`${purpose} nicht ladbar (${res.status}) → ${url}`);
     return res.text();
   }
 
+  // Firmware pro URL nur einmal laden (mehrere hundert KB); bei Fehler neu versuchen
+  const firmwareCache = new Map();
+
   async function fetchBaseHex() {
     const url = S.target === 'c3' ? S.firmwareUrls.c3 : S.firmwareUrls.c12;
     if (!url) throw new Error('Keine Firmware-URL für aktuelles Ziel.');
-    return await fetchText(url, 'Firmware');
+    if (!firmwareCache.has(url)) {
+      const p = fetchText(url, 'Firmware');
+      firmwareCache.set(url, p);
+      p.catch(() => firmwareCache.delete(url));
+    }
+    return await firmwareCache.get(url);
   }
 
   // --------- HELPER: C3 per WebUSB verbinden (mit Retries & Clock-Drossel) ----------
@@ -159,11 +168,22 @@
   }
 
   // -------------------- Build-Pipeline --------------------
+  // Kommentare/Docstrings/Einrückung entfernen (Zeilennummern bleiben gleich) → passt eher in 8 KB
+  function minifyScript(py) {
+    if (!window.pyMinify) return py;
+    const small = window.pyMinify.minifyCached(py);
+    const enc = new TextEncoder();
+    const before = enc.encode(py).length, after = enc.encode(small).length;
+    if (after < before) log(`Script minifiziert: ${before} → ${after} Bytes (−${before - after})`);
+    return small;
+  }
+
   async function buildHexText() {
     const T = ensureTools();
     const baseHex = await fetchBaseHex();
-    const py = getEditorCode();
-    if (!/\S/.test(py)) throw new Error('Kein Python-Code im Editor.');
+    const src = getEditorCode();
+    if (!/\S/.test(src)) throw new Error('Kein Python-Code im Editor.');
+    const py = minifyScript(src);
 
     if (S.target === 'c3') {
       // Calliope mini 3 – auto pack main.py in passende Slots/FS
@@ -212,8 +212,18 @@
   async function pasteExec(code, delay = 20) {
     if (!S.writer) throw new Error('Serial nicht offen.');
     await S.writer.write(S.enc.encode('\x05')); // paste mode
+    // ohne Kommentare/Einrückung → weniger Bytes je Zeile (Zeilennummern bleiben gleich)
+    if (window.pyMinify) code = window.pyMinify.minifyCached(String(code));
     const lines = String(code).replace(/\r\n/g, '\n').replace(/\r/g, '\n').split('\n');
-    for (const ln of lines) { await S.writer.write(S.enc.encode(ln + '\r')); await sleep(delay); }
+    // Leerzeilen (von entfernten Kommentaren) ohne eigene Pause mit der nächsten Zeile senden:
+    // weglassen ginge nicht, sonst stimmen Zeilennummern und mehrzeilige Strings nicht mehr
+    let blank = '';
+    for (const ln of lines) {
+      if (!ln.trim()) { blank += ln + '\r'; continue; }
+      await S.writer.write(S.enc.encode(blank + ln + '\r')); await sleep(delay);
+      blank = '';
+    }
+    if (blank) await S.writer.write(S.enc.encode(blank));
     await S.writer.write(S.enc.encode('\x04')); // Ctrl-D
   }
 
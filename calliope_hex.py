@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Intel HEX builder for Calliope mini 1/2 (MicroPython "appended script")
+- append_script_v1() produces the same text as appendScriptV1() in calliope-hex-tools.js,
+  byte for byte: base firmware without EOF, ELA record 0x0003, 16-byte data records
+  at 0xE000 ("MP", length LE, UTF-8 script), EOF, trailing newline
+- Runs in-process, no uflash needed
+
+Run:
+    python3 calliope_hex.py firmware/calliope12-micropython.hex main.py [-o main.hex]
+"""
+import argparse
+import re
+import sys
+
+APPENDED_SCRIPT_ADDR = 0x0003E000
+MAX_SCRIPT_BYTES = 8 * 1024 - 4
+CHUNK_SIZE = 16
+
+REC_DATA = 0x00
+REC_ELA = 0x04
+EOF_RECORD = ":00000001FF"
+
+_EOF_LINE = re.compile(r":00000001FF", re.IGNORECASE)
+
+
+# ---------- Intel HEX records ----------
+def checksum(data):
+    """Two's complement of the byte sum."""
+    return -sum(data) & 0xFF
+
+
+def make_record(address16, record_type, data=b""):
+    head = bytes((len(data), (address16 >> 8) & 0xFF, address16 & 0xFF, record_type))
+    body = head + bytes(data)
+    return f":{body.hex().upper()}{checksum(body):02X}"
+
+
+def strip_eof(hex_text):
+    """Drop CRs, empty lines and EOF records (stripEOF in calliope-hex-tools.js)."""
+    return "\n".join(
+        line for line in hex_text.replace("\r", "").split("\n")
+        if line.strip() and not _EOF_LINE.fullmatch(line.strip())
+    )
+
+
+# ---------- Appended script (V1) ----------
+def script_block(python_text):
+    """'MP' + length (LE) + UTF-8 script, as stored at 0x3E000."""
+    data = python_text.encode("utf-8")
+    if len(data) > MAX_SCRIPT_BYTES:
+        raise ValueError("Script zu groß für den 8KB Appended-Script-Bereich (Classic).")
+    return b"MP" + bytes((len(data) & 0xFF, (len(data) >> 8) & 0xFF)) + data
+
+
+def script_records(python_text):
+    """HEX lines that follow the firmware: ELA, data records, EOF."""
+    block = script_block(python_text)
+    upper = APPENDED_SCRIPT_ADDR >> 16
+    low = APPENDED_SCRIPT_ADDR & 0xFFFF
+    lines = [make_record(0x0000, REC_ELA, bytes(((upper >> 8) & 0xFF, upper & 0xFF)))]
+    for off in range(0, len(block), CHUNK_SIZE):
+        lines.append(make_record(low + off, REC_DATA, block[off:off + CHUNK_SIZE]))
+    lines.append(EOF_RECORD)
+    return lines
+
+
+def append_script_v1(base_hex, python_text):
+    """Complete HEX text: firmware + appended main.py."""
+    return "\n".join([strip_eof(base_hex)] + script_records(python_text)) + "\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Append a MicroPython script to a Calliope mini 1/2 firmware hex.")
+    parser.add_argument("firmware", help="MicroPython firmware (.hex)")
+    parser.add_argument("script", help="Python script (main.py)")
+    parser.add_argument("--output", "-o", default="-", help="output file ('-' = stdout)")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.firmware, encoding="utf-8", newline="") as f:
+            base = f.read()
+        with open(args.script, encoding="utf-8") as f:
+            text = append_script_v1(base, f.read())
+    except (OSError, ValueError) as e:
+        print(f"Fehler: {e}", file=sys.stderr)
+        return 2
+    if args.output == "-":
+        sys.stdout.write(text)
+    else:
+        with open(args.output, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
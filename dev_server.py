@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Classroom server for the IDE (asyncio, replaces `python3 -m http.server`)
+- Many browsers at once: one asyncio task per connection, HTTP/1.1 keep-alive
+- Strong ETags (content hash) and 304 Not Modified for If-None-Match, so revalidating
+  fetches (cache: 'no-cache') cost a header round trip instead of the file
+- Serves the gzip/brotli variants from static_build.py when the browser accepts them;
+  other compressible files are gzipped once and kept in memory
+- Single byte ranges (Range / If-Range) on the uncompressed file
+- Hashing, gzip and file reads run in worker threads (asyncio.to_thread), file bodies are
+  streamed in SEND_CHUNK blocks, so one large or cold file never stalls the other
+  connections; concurrent requests for the same cold file share one hash/gzip job
+- Cache-busting names from the static manifest (scripts.<hash>.js) are served with
+  an immutable Cache-Control, as long as the file still has that content (404 once it
+  was edited after static_build.py ran: the name must never stand for other bytes)
+- Access log with latency percentiles (every LOG_INTERVAL seconds and on exit);
+  GET /_server/stats returns them as JSON
+
+Run:
+    python3 dev_server.py [--port 8000] [--bind 0.0.0.0] [--root .] [--quiet]
+"""
+import argparse
+import asyncio
+import email.utils
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import sys
+import time
+import urllib.parse
+from collections import OrderedDict, deque
+
+from examples_manifest import ROOT
+from static_build import DEFAULT_OUT, ENCODINGS, MANIFEST_NAME, read_manifest
+
+LOG_INTERVAL = 60         # seconds between percentile summaries
+LATENCY_WINDOW = 10000    # requests kept for the percentiles
+KEEP_ALIVE_S = 15
+MAX_HEADER_BYTES = 16384
+GZIP_CACHE_BYTES = 32 * 1024 * 1024  # on-the-fly gzip results kept in memory
+SEND_CHUNK = 256 * 1024
+
+COMPRESSIBLE = ("text/", "application/javascript", "application/json", "image/svg+xml")
+TYPES = {".hex": "text/plain", ".py": "text/plain", ".mjs": "application/javascript", ".map": "application/json"}
+STATUS = {200: "OK", 206: "Partial Content", 304: "Not Modified", 400: "Bad Request", 403: "Forbidden",
+          404: "Not Found", 405: "Method Not Allowed", 416: "Range Not Satisfiable", 500: "Internal Server Error"}
+
+
+def content_type(path):
+    ext = os.path.splitext(path)[1].lower()
+    ctype = TYPES.get(ext) or mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if ctype.startswith("text/") or ctype in ("application/javascript", "application/json"):
+        ctype += "; charset=utf-8"
+    return ctype
+
+
+def parse_range(header, size):
+    """(start, end) inclusive for a single 'bytes=' range, None if absent/ignored, False if unsatisfiable."""
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, sep, last = header[6:].strip().partition("-")
+    try:
+        if not sep:
+            return None
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            start, end = size - int(last), size - 1
+    except ValueError:
+        return None
+    start, end = max(0, start), min(end, size - 1)
+    return (start, end) if start <= end and size else False
+
+
+def _gzip_file(path):
+    with open(path, "rb") as f:
+        return gzip.compress(f.read(), compresslevel=6, mtime=0)
+
+
+def percentiles(values, points=(50, 90, 99)):
+    if not values:
+        return {}
+    ordered = sorted(values)
+    return {f"p{p}": round(ordered[min(len(ordered) - 1, max(0, -(-p * len(ordered) // 100) - 1))], 2) for p in points}
+
+
+class Asset:
+    """Stat-checked facts about one file: ETag, size, compressed variants."""
+    __slots__ = ("path", "size", "mtime_ns", "etag", "variants", "last_modified")
+
+    def __init__(self, path, st, digest, variants):
+        self.path = path
+        self.size = st.st_size
+        self.mtime_ns = st.st_mtime_ns
+        self.etag = f'"{digest}"'
+        self.variants = variants  # encoding -> variant file path
+        self.last_modified = email.utils.formatdate(st.st_mtime, usegmt=True)
+
+
+class StaticServer:
+    def __init__(self, root=ROOT, static_dir=DEFAULT_OUT, quiet=False):
+        self.root = os.path.abspath(root)
+        self.static_dir = os.path.join(self.root, static_dir)
+        self.quiet = quiet
+        self._assets = {}             # abs path -> Asset
+        self._gzip = OrderedDict()    # etag -> gzipped bytes (LRU)
+        self._gzip_bytes = 0
+        self._jobs = {}               # key -> running worker-thread task (shared by concurrent requests)
+        self._manifest = {}
+        self._hashed = {}             # cache-busting name -> path
+        self._manifest_mtime = None
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.counts = {"requests": 0, "bytes": 0, "304": 0, "206": 0, "gzip": 0, "br": 0}
+        self.connections = 0
+
+    # ---------- Files ----------
+    def _load_manifest(self):
+        path = os.path.join(self.static_dir, MANIFEST_NAME)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime != self._manifest_mtime:
+            self._manifest_mtime = mtime
+            self._manifest = read_manifest(path)["assets"] if mtime else {}
+            self._hashed = {a["hashed"]: p for p, a in self._manifest.items()}
+            self._assets.clear()
+
+    def resolve(self, url_path):
+        """(abs path, content hash the name promises or None) for a request path, or None."""
+        rel = urllib.parse.unquote(url_path).lstrip("/")
+        promised = None
+        if rel in self._hashed:
+            rel = self._hashed[rel]
+            promised = self._manifest[rel]["hash"]
+        path = os.path.realpath(os.path.join(self.root, rel))
+        if path != self.root and not path.startswith(self.root + os.sep):
+            return None
+        if os.path.isdir(path):
+            path = os.path.join(path, "index.html")
+        return (path, promised) if os.path.isfile(path) else None
+
+    def asset(self, path):
+        """Asset for path (blocking: stat, and hashing on a cache miss; see _asset)."""
+        st = os.stat(path)
+        hit = self._assets.get(path)
+        if hit and (hit.size, hit.mtime_ns) == (st.st_size, st.st_mtime_ns):
+            return hit
+        rel = os.path.relpath(path, self.root).replace(os.sep, "/")
+        entry = self._manifest.get(rel)
+        variants = {}
+        if entry and (entry["size"], entry["mtime_ns"]) == (st.st_size, st.st_mtime_ns):
+            digest = entry["hash"]
+            for enc in entry["encodings"]:
+                variant = os.path.join(self.static_dir, digest + ENCODINGS[enc])
+                if os.path.exists(variant):
+                    variants[enc] = variant
+        else:
+            h = hashlib.sha256()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    h.update(block)
+            digest = h.hexdigest()[:16]
+        asset = Asset(path, st, digest, variants)
+        self._assets[path] = asset
+        return asset
+
+    async def _asset(self, path):
+        hit = self._assets.get(path)
+        st = await asyncio.to_thread(os.stat, path)
+        if hit and (hit.size, hit.mtime_ns) == (st.st_size, st.st_mtime_ns):
+            return hit
+        return await self._shared(("asset", path), self.asset, path)
+
+    async def gzipped(self, asset):
+        """On-the-fly gzip for files without a precompressed variant (cached per ETag)."""
+        body = self._gzip.get(asset.etag)
+        if body is not None:
+            self._gzip.move_to_end(asset.etag)
+            return body
+        body = await self._shared(("gzip", asset.etag), _gzip_file, asset.path)
+        if asset.etag in self._gzip:
+            return body  # stored by a concurrent request
+        self._gzip[asset.etag] = body
+        self._gzip_bytes += len(body)
+        while self._gzip_bytes > GZIP_CACHE_BYTES and len(self._gzip) > 1:
+            _, old = self._gzip.popitem(last=False)
+            self._gzip_bytes -= len(old)
+        return body
+
+    async def _shared(self, key, func, *args):
+        """func(*args) in a worker thread; concurrent calls with the same key wait for the same run."""
+        task = self._jobs.get(key)
+        if task is None:
+            task = self._jobs[key] = asyncio.ensure_future(asyncio.to_thread(func, *args))
+            task.add_done_callback(lambda _: self._jobs.pop(key, None))
+        return await asyncio.shield(task)  # a client going away must not cancel the others' job
+
+    # ---------- HTTP ----------
+    async def handle(self, reader, writer):
+        self.connections += 1
+        peer = writer.get_extra_info("peername")
+        client = peer[0] if peer else "-"
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEP_ALIVE_S)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                        ConnectionError):
+                    return
+                t0 = time.perf_counter()
+                keep_alive = await self._respond(head, writer, client, t0)
+                if not keep_alive:
+                    return
+        finally:
+            self.connections -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+    async def _respond(self, head, writer, client, t0):
+        try:
+            lines = head.decode("latin-1").split("\r\n")
+            method, target, version = lines[0].split(" ", 2)
+            headers = {}
+            for line in lines[1:]:
+                if ":" in line:
+                    k, v = line.split(":", 1)
+                    headers[k.strip().lower()] = v.strip()
+        except ValueError:
+            await self._send(writer, 400, {}, b"", client, "-", "-", t0)
+            return False
+        keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        url_path = urllib.parse.urlsplit(target).path
+
+        if method not in ("GET", "HEAD"):
+            await self._send(writer, 405, {"Allow": "GET, HEAD"}, b"", client, method, url_path, t0)
+            return keep_alive
+        if url_path == "/_server/stats":
+            body = json.dumps(self.stats(), indent=2).encode("utf-8")
+            await self._send(writer, 200, {"Content-Type": "application/json", "Cache-Control": "no-store"},
+                             body, client, method, url_path, t0)
+            return keep_alive
+
+        self._load_manifest()
+        found = await asyncio.to_thread(self.resolve, url_path)
+        if found is None:
+            await self._send(writer, 404, {"Content-Type": "text/plain; charset=utf-8"}, b"Nicht gefunden\n",
+                             client, method, url_path, t0)
+            return keep_alive
+        path, promised = found
+        try:
+            asset = await self._asset(path)
+        except OSError:
+            await self._send(writer, 404, {}, b"", client, method, url_path, t0)
+            return keep_alive
+        if promised is not None and asset.etag != f'"{promised}"':
+            # edited since the manifest was built: the hashed name refers to content that is gone
+            body = "Veraltet: static_build.py erneut ausführen\n".encode("utf-8")
+            await self._send(writer, 404, {"Content-Type": "text/plain; charset=utf-8", "Cache-Control": "no-store"},
+                             body, client, method, url_path, t0)
+            return keep_alive
+        immutable = promised is not None
+
+        ctype = content_type(path)
+        base = {
+            "Content-Type": ctype,
+            "Last-Modified": asset.last_modified,
+            "Cache-Control": "public, max-age=31536000, immutable" if immutable else "no-cache",
+            "Accept-Ranges": "bytes",
+        }
+        accepted = {e.split(";")[0].strip() for e in headers.get("accept-encoding", "").split(",")}
+        encoding = next((e for e in ("br", "gzip") if e in accepted and e in asset.variants), None)
+        if encoding is None and "gzip" in accepted and ctype.startswith(COMPRESSIBLE) and asset.size >= 1024:
+            encoding = "gzip"
+        rng = parse_range(headers.get("range"), asset.size)
+        if rng is not None and headers.get("if-range") not in (None, asset.etag):
+            rng = None  # file changed since the client's partial copy: send all of it
+        if rng is not None:
+            encoding = None  # ranges refer to the identity representation
+        etag = asset.etag if encoding is None else f'"{asset.etag[1:-1]}-{encoding}"'
+        base["ETag"] = etag
+        if ctype.startswith(COMPRESSIBLE) or asset.variants:
+            base["Vary"] = "Accept-Encoding"
+
+        inm = headers.get("if-none-match")
+        if inm and (inm.strip() == "*" or etag in [t.strip().removeprefix("W/") for t in inm.split(",")]):
+            await self._send(writer, 304, base, b"", client, method, url_path, t0, head_only=True)
+            return keep_alive
+
+        if rng is False:
+            base["Content-Range"] = f"bytes */{asset.size}"
+            await self._send(writer, 416, base, b"", client, method, url_path, t0)
+            return keep_alive
+        if encoding is not None:
+            base["Content-Encoding"] = encoding
+            if encoding in asset.variants:
+                await self._send_file(writer, 200, base, asset.variants[encoding], 0, None, method,
+                                      client, url_path, t0, encoding)
+            else:
+                await self._send(writer, 200, base, await self.gzipped(asset), client, method, url_path, t0,
+                                 head_only=method == "HEAD", encoding=encoding)
+            return keep_alive
+        if rng is not None:
+            start, end = rng
+            base["Content-Range"] = f"bytes {start}-{end}/{asset.size}"
+            await self._send_file(writer, 206, base, path, start, end - start + 1, method, client, url_path, t0)
+            return keep_alive
+        await self._send_file(writer, 200, base, path, 0, asset.size, method, client, url_path, t0)
+        return keep_alive
+
+    def _head(self, status, headers, length):
+        lines = [f"HTTP/1.1 {status} {STATUS[status]}", f"Date: {email.utils.formatdate(usegmt=True)}",
+                 "Server: calliope-dev-server"]
+        lines += [f"{k}: {v}" for k, v in headers.items()]
+        if status != 304:
+            lines.append(f"Content-Length: {length}")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _send(self, writer, status, headers, body, client, method, path, t0, head_only=False, encoding=None):
+        writer.write(self._head(status, headers, len(body)))
+        if method != "HEAD" and not head_only:
+            view = memoryview(body)
+            for i in range(0, len(body), SEND_CHUNK):
+                writer.write(view[i:i + SEND_CHUNK])
+                await writer.drain()
+        await writer.drain()
+        self._log(client, method, path, status, 0 if head_only or method == "HEAD" else len(body), t0, encoding)
+
+    async def _send_file(self, writer, status, headers, file_path, offset, count, method, client, path, t0,
+                         encoding=None):
+        if count is None:
+            count = (await asyncio.to_thread(os.path.getsize, file_path)) - offset
+        writer.write(self._head(status, headers, count))
+        sent = 0
+        if method != "HEAD":
+            f = await asyncio.to_thread(open, file_path, "rb")
+            try:
+                await asyncio.to_thread(f.seek, offset)
+                while sent < count:
+                    block = await asyncio.to_thread(f.read, min(SEND_CHUNK, count - sent))
+                    if not block:
+                        break
+                    writer.write(block)
+                    sent += len(block)
+                    await writer.drain()
+            finally:
+                f.close()
+        await writer.drain()
+        self._log(client, method, path, status, sent, t0, encoding)
+
+    # ---------- Log ----------
+    def _log(self, client, method, path, status, size, t0, encoding):
+        ms = (time.perf_counter() - t0) * 1000
+        self.latencies.append(ms)
+        self.counts["requests"] += 1
+        self.counts["bytes"] += size
+        if status in (304, 206):
+            self.counts[str(status)] += 1
+        if encoding:
+            self.counts[encoding] += 1
+        if not self.quiet:
+            print(f"{client} {method} {path} {status} {size} {ms:.1f}ms {encoding or '-'}", file=sys.stderr)
+
+    def stats(self):
+        return {"connections": self.connections, **self.counts, "latency_ms": percentiles(self.latencies)}
+
+    async def report_loop(self):
+        last = 0
+        while True:
+            await asyncio.sleep(LOG_INTERVAL)
+            if self.counts["requests"] != last:
+                last = self.counts["requests"]
+                print(f"-- {json.dumps(self.stats())}", file=sys.stderr)
+
+
+async def serve(root=ROOT, bind="0.0.0.0", port=8000, quiet=False):
+    app = StaticServer(root, quiet=quiet)
+    server = await asyncio.start_server(app.handle, bind, port, limit=MAX_HEADER_BYTES, backlog=256)
+    names = ", ".join(f"http://{s.getsockname()[0]}:{s.getsockname()[1]}/" for s in server.sockets)
+    print(f"IDE-Server läuft: {names} (Wurzel {app.root})", file=sys.stderr)
+    reporter = asyncio.create_task(app.report_loop())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        reporter.cancel()
+        print(f"-- {json.dumps(app.stats())}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Static server for the IDE (ETag, gzip/brotli, ranges).")
+    parser.add_argument("--port", "-p", type=int, default=8000)
+    parser.add_argument("--bind", "-b", default="0.0.0.0", help="address to listen on (default: all)")
+    parser.add_argument("--root", default=ROOT, help="web root (default: this folder)")
+    parser.add_argument("--quiet", "-q", action="store_true", help="no per-request log lines")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.root, args.bind, args.port, args.quiet))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"Fehler: {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,909 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Examples catalog store
+- Ordered in-memory store for the entries of examples.json (file, name, image, runtime).
+- Hash index on `file`, secondary indexes on `runtime` and `image`.
+- Streaming, cancellable background loader for large catalog files.
+- Background writer with atomic replace and coalescing of rapid saves; streaming dump
+  (dump_catalog_stream) for catalogs that come from a database cursor.
+- Load/normalization rules shared by the GUI and the headless CLI (examples_cli.py).
+- Compact slotted entries (Entry) for large catalogs in the editor.
+- Undo/redo history of store edits, recorded as operation deltas (EditHistory).
+
+Used by examples_json_editor.py and examples_cli.py; has no Tk dependency.
+
+Complexity (n = number of entries):
+    lookup by file ........ O(1)
+    index of file ......... O(log n)
+    entry at index ........ O(log n)
+    upsert / delete ....... O(log n) (amortized, deletes leave tombstones that are compacted in bulk)
+    swap / move by one .... O(log n)
+    insert at index ....... O(log n) next to a tombstone (undo of a delete), else O(n)
+    undo / redo ........... O(log n)
+"""
+import bisect
+import codecs
+import contextlib
+import json
+import os
+import queue
+import sys
+import tempfile
+import threading
+from collections import deque
+
+import perf_trace
+
+RUNTIMES = ("python", "micropython")
+
+# Objects written by build stages, kept verbatim on load/save
+#   thumbnail: {"file", "width", "height"}  (examples_thumbs.py)
+#   cost: {"cpu_ms", "draw_ops", "segments", "peak_kb"[, "stopped"]}  (turtle_preview.py)
+EXTRA_FIELDS = ("thumbnail", "cost")
+
+# Canonical runtime strings, so entries share one object per runtime
+_RUNTIME = {r: r for r in RUNTIMES}
+
+# Compact tombstones once they make up more than half of the slots (and at least this many)
+_COMPACT_MIN = 1024
+
+
+# ---------- Normalization ----------
+def default_name(file):
+    """Display name derived from the file name: "my_prog.py" -> "My Prog"."""
+    base = os.path.basename(file)
+    return os.path.splitext(base)[0].replace("_", " ").title()
+
+
+class Entry:
+    """
+    Compact catalog entry: slots instead of a per-entry dict, the runtime is one of the
+    shared RUNTIMES strings and image paths are interned, so entries showing the same
+    picture share one string.
+
+    Reads like the JSON dict (entry["file"], entry.get("image"), "thumbnail" in entry),
+    to_dict() gives the dict written to examples.json. Entries are never mutated, the
+    store and the undo history share them.
+    """
+
+    __slots__ = ("file", "name", "runtime", "image", "extra")
+
+    def __init__(self, file, name, runtime, image="", extra=None):
+        self.file = file
+        self.name = name
+        self.runtime = _RUNTIME.get(runtime, runtime)
+        self.image = sys.intern(image) if image else ""
+        self.extra = extra or None  # EXTRA_FIELDS objects, dict or None
+
+    @classmethod
+    def from_dict(cls, d):
+        extra = {k: d[k] for k in EXTRA_FIELDS if k in d}
+        return cls(d["file"], d.get("name", ""), d.get("runtime", ""), d.get("image", ""), extra)
+
+    def to_dict(self):
+        d = {"file": self.file, "name": self.name, "runtime": self.runtime}
+        if self.image:
+            d["image"] = self.image
+        if self.extra:
+            d.update(self.extra)
+        return d
+
+    def __getitem__(self, key):
+        get = _ENTRY_FIELDS.get(key)
+        if get is not None:
+            value = get(self)
+            if value:
+                return value
+        elif self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def keys(self):
+        return self.to_dict().keys()
+
+    def __eq__(self, other):
+        if isinstance(other, (Entry, dict)):
+            return self.to_dict() == (other.to_dict() if isinstance(other, Entry) else other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Entry({self.to_dict()!r})"
+
+
+# slot readers for Entry.__getitem__ (empty values count as missing, like an omitted "image")
+_ENTRY_FIELDS = {name: getattr(Entry, name).__get__ for name in ("file", "name", "runtime", "image")}
+
+
+def normalize_entries(items, compact=False):
+    """
+    Load rules of the editor: skip non-objects and items without file, derive a
+    missing name from the file, fall back to runtime "python", omit empty images,
+    keep EXTRA_FIELDS objects. compact=True returns Entry objects instead of dicts.
+    """
+    norm = []
+    for it in items:
+        if not isinstance(it, dict):
+            continue
+        file = str(it.get("file", "")).strip()
+        if not file:
+            continue
+        name = str(it.get("name", "")).strip()
+        runtime = str(it.get("runtime", "")).strip().lower()
+        image = str(it.get("image", "")).strip() if it.get("image") else ""
+
+        if not name:
+            name = default_name(file)
+        runtime = _RUNTIME.get(runtime, "python")  # fallback
+
+        if compact:
+            extra = None
+            for key in EXTRA_FIELDS:
+                if isinstance(it.get(key), dict):
+                    extra = extra or {}
+                    extra[key] = it[key]
+            norm.append(Entry(file, name, runtime, image, extra))
+            continue
+        entry = {"file": file, "name": name, "runtime": runtime}
+        if image:
+            entry["image"] = image
+        for key in EXTRA_FIELDS:
+            if isinstance(it.get(key), dict):
+                entry[key] = it[key]
+        norm.append(entry)
+    return norm
+
+
+class _Fenwick:
+    """Binary indexed tree over 0/1 slot flags (1 = live entry)."""
+
+    __slots__ = ("tree",)
+
+    def __init__(self, flags=()):
+        tree = [0]
+        tree.extend(flags)
+        n = len(tree) - 1
+        for i in range(1, n + 1):
+            j = i + (i & -i)
+            if j <= n:
+                tree[j] += tree[i]
+        self.tree = tree
+
+    def __len__(self):
+        return len(self.tree) - 1
+
+    def append(self, flag):
+        # new node i covers (i - lowbit(i), i]
+        tree = self.tree
+        i = len(tree)
+        total = flag
+        stop = i - (i & -i)
+        j = i - 1
+        while j > stop:
+            total += tree[j]
+            j -= j & -j
+        tree.append(total)
+
+    def pop(self):
+        """Drop the last slot (no other node covers it)."""
+        self.tree.pop()
+
+    def add(self, slot, delta):
+        tree = self.tree
+        n = len(tree) - 1
+        i = slot + 1
+        while i <= n:
+            tree[i] += delta
+            i += i & -i
+
+    def prefix(self, slot):
+        """Number of live slots in [0, slot)."""
+        tree = self.tree
+        total = 0
+        i = slot
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def find(self, k):
+        """Slot of the k-th (0-based) live entry."""
+        tree = self.tree
+        n = len(tree) - 1
+        pos = 0
+        step = 1 << n.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= n and tree[nxt] <= k:
+                pos = nxt
+                k -= tree[nxt]
+            step >>= 1
+        return pos
+
+
+class CatalogStore:
+    """
+    Ordered catalog entries (dicts as written to examples.json, or Entry), keyed by `file`.
+
+    Entries sharing a file (hand-edited catalogs) are kept as separate rows, so a load and
+    save round trip writes them all back; get(), index_of(), upsert() and remove() by file
+    address the first of them, as the editor always did.
+    """
+
+    def __init__(self, entries=()):
+        self.version = 0  # change counter, bumped by every mutation
+        self._indexes = []  # further secondary indexes (add_index)
+        self.load(entries)
+
+    # ---------- Bulk ----------
+    def load(self, entries):
+        """Replace the content. Entries sharing a file are all kept (see class docstring)."""
+        self._slots = []
+        self._slot_of = {}  # file -> slot of its first entry
+        self._dups = {}     # file -> sorted slots of its further entries
+        self._by_runtime = {}  # runtime -> {file: number of entries}
+        self._by_image = {}    # image -> {file: number of entries}
+        self._graves = {}  # removed file -> its former slots (tombstones, newest last), for insert()
+        self._count = 0
+        for index in self._indexes:
+            index.clear()
+        for e in entries:
+            slot = len(self._slots)
+            self._slots.append(e)
+            self._claim(e["file"], slot)
+            self._index(slot, e)
+        self._count = len(self._slots)
+        self._live = _Fenwick([1] * len(self._slots))
+        self.version += 1
+
+    def clear(self):
+        self.load(())
+
+    def add_index(self, index):
+        """
+        Register a secondary index (an object with add(slot, entry), discard(slot, entry) and
+        clear(), e.g. examples_search.SearchIndex); it is filled now and kept up to date by
+        every mutation. Slots are positions in the store that keep the catalog order; they
+        stay valid until the next clear() of the index.
+        """
+        index.clear()
+        for slot, e in enumerate(self._slots):
+            if e is not None:
+                index.add(slot, e)
+        self._indexes.append(index)
+
+    def to_list(self):
+        """Entries in catalog order, ready for json.dump()."""
+        return [e for e in self._slots if e is not None]
+
+    # ---------- Queries ----------
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        return (e for e in self._slots if e is not None)
+
+    def __contains__(self, file):
+        return file in self._slot_of
+
+    def get(self, file, default=None):
+        slot = self._slot_of.get(file)
+        return default if slot is None else self._slots[slot]
+
+    def index_of(self, file):
+        slot = self._slot_of.get(file)
+        if slot is None:
+            return None
+        return self._live.prefix(slot)
+
+    def entry_at(self, index):
+        return self._slots[self._slot_at(index)]
+
+    def window(self, start, count):
+        """Up to count entries in catalog order, beginning at index start."""
+        if count <= 0 or start >= self._count:
+            return []
+        slots = self._slots
+        slot = self._slot_at(max(start, 0))
+        out = []
+        while slot < len(slots) and len(out) < count:
+            e = slots[slot]
+            if e is not None:
+                out.append(e)
+            slot += 1
+        return out
+
+    def duplicates(self):
+        """Number of entries whose file an earlier entry already uses."""
+        return sum(map(len, self._dups.values()))
+
+    def with_runtime(self, runtime):
+        """Files of all entries with the given runtime."""
+        return frozenset(self._by_runtime.get(runtime, ()))
+
+    def with_image(self, image):
+        """Files of all entries referencing the given image."""
+        return frozenset(self._by_image.get(image, ()))
+
+    def at_slots(self, slots):
+        """Entries at the given slots (see add_index), in catalog order."""
+        return list(map(self._slots.__getitem__, sorted(slots)))
+
+    # ---------- Mutations ----------
+    def append(self, entry):
+        """Add the entry at the end, also if its file is already used (loading). Returns its index."""
+        slot = len(self._slots)
+        self._slots.append(entry)
+        self._live.append(1)
+        self._claim(entry["file"], slot)
+        self._count += 1
+        self._index(slot, entry)
+        self.version += 1
+        return self._count - 1
+
+    def upsert(self, entry):
+        """Add or replace the (first) entry with the same `file`. Returns (index, created)."""
+        slot = self._slot_of.get(entry["file"])
+        if slot is None:
+            return self.append(entry), True
+        self._unindex(slot, self._slots[slot])
+        self._slots[slot] = entry
+        self._index(slot, entry)
+        self.version += 1
+        return self._live.prefix(slot), False
+
+    def insert(self, index, entry):
+        """
+        Insert a new entry at index (also next to an entry with the same file: undo of
+        removing a duplicate). Reuses the former slot of a removed entry (undo of a remove)
+        or the tombstone in front of the entry now at index, otherwise linear.
+        """
+        if index >= self._count:
+            return self.append(entry)
+        index = max(index, 0)
+        graves = self._graves.get(entry["file"])
+        slot = graves.pop() if graves else None
+        if graves == []:
+            del self._graves[entry["file"]]
+        if slot is None or self._slots[slot] is not None or self._live.prefix(slot) != index:
+            slot = self._slot_at(index) - 1
+        if slot >= 0 and self._slots[slot] is None:
+            self._slots[slot] = entry
+            self._live.add(slot, 1)
+            self._claim(entry["file"], slot)
+            self._count += 1
+            self._index(slot, entry)
+            self.version += 1
+            return index
+        entries = self.to_list()
+        entries.insert(index, entry)
+        self.load(entries)
+        return index
+
+    def remove(self, file):
+        """Remove the (first) entry for file. Returns its former index."""
+        slot = self._slot_of.get(file)
+        if slot is None:
+            raise KeyError(file)
+        index = self._live.prefix(slot)
+        self._remove_slot(slot)
+        return index
+
+    def remove_at(self, index):
+        """Remove the entry at index and return it."""
+        slot = self._slot_at(index)
+        entry = self._slots[slot]
+        self._remove_slot(slot)
+        return entry
+
+    def swap(self, i, j):
+        si, sj = self._slot_at(i), self._slot_at(j)
+        a, b = self._slots[si], self._slots[sj]
+        self._slots[si], self._slots[sj] = b, a
+        if a["file"] != b["file"]:
+            self._release(a["file"], si)
+            self._release(b["file"], sj)
+            self._claim(a["file"], sj)
+            self._claim(b["file"], si)
+        for index in self._indexes:
+            index.discard(si, a)
+            index.discard(sj, b)
+            index.add(sj, a)
+            index.add(si, b)
+        self.version += 1
+
+    def move(self, index, delta):
+        """Move the entry at index by delta (±1) positions. Returns the new index or None."""
+        new_index = index + delta
+        if index < 0 or index >= self._count or new_index < 0 or new_index >= self._count:
+            return None
+        self.swap(index, new_index)
+        return new_index
+
+    # ---------- Internal helpers ----------
+    def _slot_at(self, index):
+        if index < 0:
+            index += self._count
+        if index < 0 or index >= self._count:
+            raise IndexError("Katalog-Index außerhalb des Bereichs")
+        return self._live.find(index)
+
+    def _remove_slot(self, slot):
+        entry = self._slots[slot]
+        self._unindex(slot, entry)
+        self._release(entry["file"], slot)
+        self._count -= 1
+        self.version += 1
+        if slot == len(self._slots) - 1:
+            # newest slot (e.g. undoing an add): drop it as if it had never been appended
+            self._slots.pop()
+            self._live.pop()
+            return
+        self._slots[slot] = None
+        self._live.add(slot, -1)
+        self._graves.setdefault(entry["file"], []).append(slot)
+        dead = len(self._slots) - self._count
+        if dead >= _COMPACT_MIN and dead * 2 > len(self._slots):
+            self.load(self.to_list())
+
+    def _claim(self, file, slot):
+        """slot now holds an entry for file."""
+        first = self._slot_of.get(file)
+        if first is None:
+            self._slot_of[file] = slot
+            return
+        if slot < first:
+            self._slot_of[file], slot = slot, first
+        bisect.insort(self._dups.setdefault(file, []), slot)
+
+    def _release(self, file, slot):
+        """slot no longer holds an entry for file; a further entry of the file moves up."""
+        dups = self._dups.get(file)
+        if self._slot_of[file] != slot:
+            dups.remove(slot)
+        elif dups:
+            self._slot_of[file] = dups.pop(0)
+        else:
+            del self._slot_of[file]
+        if dups == []:
+            del self._dups[file]
+
+    def _index(self, slot, entry):
+        _count_in(self._by_runtime, entry.get("runtime", ""), entry["file"], 1)
+        image = entry.get("image")
+        if image:
+            _count_in(self._by_image, image, entry["file"], 1)
+        for index in self._indexes:
+            index.add(slot, entry)
+
+    def _unindex(self, slot, entry):
+        _count_in(self._by_runtime, entry.get("runtime", ""), entry["file"], -1)
+        image = entry.get("image")
+        if image:
+            _count_in(self._by_image, image, entry["file"], -1)
+        for index in self._indexes:
+            index.discard(slot, entry)
+
+
+def _count_in(groups, key, file, delta):
+    """Count an entry of file in groups[key] ({file: entries}); empty groups are dropped."""
+    files = groups.setdefault(key, {})
+    n = files.get(file, 0) + delta
+    if n > 0:
+        files[file] = n
+    else:
+        files.pop(file, None)
+        if not files:
+            del groups[key]
+
+
+# ---------- Undo / redo ----------
+class EditHistory:
+    """
+    Undo/redo for edits of a CatalogStore, recorded as operation deltas.
+
+    Each step keeps only references to the (immutable) entries it replaced or removed,
+    so the history grows with the edits, not with catalog size times depth. Edits go
+    through upsert()/remove_at()/move() instead of the store; undo() and redo() return
+    what changed for the view:
+        ("inserted", index, entry)   ("updated", index, entry)
+        ("deleted", index, entry)    ("moved", old_index, new_index)
+        ("batch", None, None)        several edits recorded with batch() (redraw everything)
+    """
+
+    def __init__(self, store, limit=1000):
+        self.store = store
+        self._undo = deque(maxlen=limit)
+        self._redo = []
+        self._batch = None  # ops collected by an open batch()
+
+    @property
+    def can_undo(self):
+        return bool(self._undo)
+
+    @property
+    def can_redo(self):
+        return bool(self._redo)
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Edits made inside the with block are undone/redone as one step."""
+        self._batch = []
+        try:
+            yield self
+        finally:
+            ops, self._batch = self._batch, None
+            if ops:
+                self._push(("batch", ops, None))
+
+    # ---------- Recorded edits ----------
+    def upsert(self, entry):
+        old = self.store.get(entry["file"])
+        result = self.store.upsert(entry)
+        self._push(("upsert", old, entry))
+        return result
+
+    def remove_at(self, index):
+        entry = self.store.remove_at(index)
+        self._push(("remove", index, entry))
+        return entry
+
+    def move(self, index, delta):
+        new_index = self.store.move(index, delta)
+        if new_index is not None:
+            self._push(("move", index, new_index))
+        return new_index
+
+    def undo(self):
+        """Revert the newest edit. Returns the change, or None if there is nothing to undo."""
+        if not self._undo:
+            return None
+        op = self._undo.pop()
+        self._redo.append(op)
+        return self._apply(op, undo=True)
+
+    def redo(self):
+        if not self._redo:
+            return None
+        op = self._redo.pop()
+        self._undo.append(op)
+        return self._apply(op, undo=False)
+
+    # ---------- Internal helpers ----------
+    def _push(self, op):
+        if self._batch is not None:
+            self._batch.append(op)
+            return
+        self._undo.append(op)
+        self._redo.clear()
+
+    def _apply(self, op, undo):
+        store = self.store
+        kind, a, b = op
+        if kind == "batch":
+            for sub in (reversed(a) if undo else a):
+                self._apply(sub, undo)
+            return ("batch", None, None)
+        if kind == "upsert":
+            old, new = a, b
+            if undo and old is None:
+                return ("deleted", store.remove(new["file"]), new)
+            entry = old if undo else new
+            index, created = store.upsert(entry)
+            return ("inserted" if created else "updated", index, entry)
+        if kind == "remove":
+            index, entry = a, b
+            if undo:
+                return ("inserted", store.insert(index, entry), entry)
+            return ("deleted", index, store.remove_at(index))
+        old_index, new_index = (b, a) if undo else (a, b)
+        store.move(old_index, new_index - old_index)
+        return ("moved", old_index, new_index)
+
+
+# ---------- Streaming load ----------
+class _Scanner:
+    """Incremental view on a binary JSON stream (text buffer refilled block by block)."""
+
+    _decoder = json.JSONDecoder()
+
+    def __init__(self, fp, block_size):
+        self.fp = fp
+        self.block_size = block_size
+        self.utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.bytes_read = 0
+        self.eof = False
+
+    def fill(self):
+        if self.eof:
+            return False
+        block = self.fp.read(self.block_size)
+        self.bytes_read += len(block)
+        if not block:
+            self.eof = True
+        # drop the consumed prefix so the buffer stays about one block large
+        self.buf = self.buf[self.pos:] + self.utf8.decode(block, final=self.eof)
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character ('' at end of input)."""
+        while True:
+            buf, pos = self.buf, self.pos
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            self.pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, ch):
+        if self.peek() != ch:
+            raise ValueError(f"Ungültiges JSON: '{ch}' erwartet (Byte ~{self.bytes_read}).")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = self._decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # a number cut off at the block boundary (e.g. "-7e" of "-7e5") decodes
+            # early; only accept a value once a delimiter follows it
+            if not self.eof and (end == len(self.buf) or self.buf[end] not in " \t\r\n,:]}"):
+                self.fill()
+                continue
+            self.pos = end
+            return obj
+
+
+def iter_examples(fp, block_size=1 << 16):
+    """
+    Yield (item, bytes_read) for every element of the top-level "examples" array
+    of a binary file object, without parsing the whole document at once.
+    """
+    sc = _Scanner(fp, block_size)
+    sc.expect("{")
+    if sc.peek() == "}":
+        return
+    while True:
+        key = sc.value()
+        sc.expect(":")
+        if key == "examples":
+            if sc.peek() != "[":
+                raise ValueError("Ungültiges Format: 'examples' muss ein Array sein.")
+            sc.pos += 1
+            if sc.peek() == "]":
+                sc.pos += 1
+            else:
+                while True:
+                    yield sc.value(), sc.bytes_read
+                    if sc.peek() == ",":
+                        sc.pos += 1
+                        continue
+                    sc.expect("]")
+                    break
+        else:
+            sc.value()
+        if sc.peek() == ",":
+            sc.pos += 1
+            continue
+        sc.expect("}")
+        return
+
+
+def read_examples(path):
+    """All raw items of the "examples" array of a catalog file."""
+    with open(path, "rb") as f:
+        return [item for item, _ in iter_examples(f)]
+
+
+class CatalogLoader:
+    """
+    Parses and normalizes a catalog file on a worker thread.
+
+    Results arrive in `queue` as (kind, payload, bytes_done) tuples:
+        ("chunk", [entries...], n)  normalized entries, in file order
+        ("done", None, n)           file completely read
+        ("cancelled", None, n)      cancel() was called
+        ("error", exception, n)     reading or parsing failed
+    """
+
+    def __init__(self, path, normalize, chunk_size=2000):
+        self.path = path
+        self.normalize = normalize
+        self.chunk_size = chunk_size
+        self.total = 0
+        self.queue = queue.Queue()
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="catalog-loader", daemon=True)
+
+    def start(self):
+        self.total = os.path.getsize(self.path)
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def _run(self):
+        done = 0
+        try:
+            with perf_trace.span("load_file", "io", bytes=self.total), open(self.path, "rb") as f:
+                chunk = []
+                for item, done in iter_examples(f):
+                    if self._cancel.is_set():
+                        self.queue.put(("cancelled", None, done))
+                        return
+                    chunk.append(item)
+                    if len(chunk) >= self.chunk_size:
+                        self.queue.put(("chunk", self.normalize(chunk), done))
+                        chunk = []
+                if chunk:
+                    self.queue.put(("chunk", self.normalize(chunk), done))
+            self.queue.put(("done", None, self.total))
+        except Exception as e:
+            self.queue.put(("error", e, done))
+
+
+# ---------- Saving ----------
+def _json_default(obj):
+    if isinstance(obj, Entry):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dump_catalog(entries, fp):
+    """Write entries (dicts or Entry) in the examples.json layout used by the web IDE."""
+    json.dump({"examples": entries}, fp, ensure_ascii=False, indent=2, default=_json_default)
+
+
+def dump_catalog_stream(entries, fp):
+    """
+    Same bytes as dump_catalog() from any iterable (e.g. a database cursor), written
+    entry by entry, so the catalog is never held in memory as a whole. Returns the count.
+    """
+    fp.write('{\n  "examples": [')
+    n = 0
+    for e in entries:
+        fp.write(",\n    " if n else "\n    ")
+        fp.write(_entry_text(e.to_dict() if isinstance(e, Entry) else e))
+        n += 1
+    fp.write("\n  ]\n}" if n else "]\n}")
+    return n
+
+
+_encode = json.JSONEncoder(ensure_ascii=False, indent=2, default=_json_default).encode
+_encode_str = json.encoder.encode_basestring  # C-accelerated, keeps non-ASCII like ensure_ascii=False
+
+
+def _entry_text(d):
+    """An entry as json.dump(indent=2) writes it two levels deep; strings skip the slow indenting encoder."""
+    if not d:
+        return "{}"
+    fields = []
+    for key, value in d.items():
+        # encoded strings never contain a raw newline, so every line break is indentation
+        text = _encode_str(value) if isinstance(value, str) else _encode(value).replace("\n", "\n      ")
+        fields.append(f"{_encode_str(key)}: {text}")
+    return "{\n      " + ",\n      ".join(fields) + "\n    }"
+
+
+def atomic_write(path, write, binary=False):
+    """
+    Call write(fp) on a temp file next to path and rename it into place,
+    so readers (e.g. the web IDE) never see a half-written file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix="." + os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with (os.fdopen(fd, "wb") if binary else os.fdopen(fd, "w", encoding="utf-8")) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            mode = os.stat(path).st_mode & 0o7777
+        except FileNotFoundError:
+            mode = 0o644  # mkstemp creates 0600, the web server must be able to read it
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def write_catalog_atomic(path, entries):
+    """Write the catalog atomically (see atomic_write)."""
+    atomic_write(path, lambda f: dump_catalog(entries, f))
+
+
+class CatalogWriter:
+    """
+    Saves catalog snapshots on a background thread.
+
+    Only the newest pending snapshot per path is written: a burst of submit()
+    calls while a write is running results in a single further write. Results arrive in
+    `queue` as ("saved", path, version) or ("error", path, exception).
+    """
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self._cond = threading.Condition()
+        self._pending = {}     # path -> (entries, version), oldest first
+        self._busy = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="catalog-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, path, entries, version):
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("CatalogWriter ist geschlossen.")
+            self._pending.pop(path, None)
+            self._pending[path] = (entries, version)
+            self._cond.notify()
+
+    @property
+    def busy(self):
+        with self._cond:
+            return self._busy or bool(self._pending)
+
+    def flush(self, timeout=None):
+        """Block until all submitted snapshots are written. Returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._busy and not self._pending, timeout)
+
+    def close(self, timeout=None):
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                path = next(iter(self._pending))
+                entries, version = self._pending.pop(path)
+                self._busy = True
+            try:
+                with perf_trace.span("write_catalog", "io", entries=len(entries)):
+                    write_catalog_atomic(path, entries)
+                self.queue.put(("saved", path, version))
+            except Exception as e:
+                self.queue.put(("error", path, e))
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Examples JSON CLI (headless, no Tk)
+- validate / normalize / merge / stats / dedup for examples.json catalogs
+- Same load rules as the GUI editor (examples_catalog.normalize_entries)
+- Several catalog files are processed in parallel worker processes
+- db-import / db-export: convert between examples.json and an SQLite catalog
+  (examples_db.py), streamed; the export is byte-identical to what the editor saves
+
+Run:
+    python3 examples_json_editor.py validate data/examples.json examples.json
+    python3 examples_json_editor.py validate --paths data/examples.json
+    python3 examples_json_editor.py validate --syntax data/examples.json
+    python3 examples_json_editor.py normalize data/examples.json -o data/examples.json
+    python3 examples_json_editor.py merge a.json b.json -o merged.json
+    python3 examples_json_editor.py stats data/examples.json
+    python3 examples_json_editor.py dedup data/examples.json examples.json [--apply]
+    python3 examples_json_editor.py db-import data/examples.json -o data/examples.sqlite
+    python3 examples_json_editor.py db-export data/examples.sqlite -o data/examples.json
+
+Every command prints a JSON report on stdout (on stderr when the catalog
+itself is written to stdout, i.e. `-o -` or normalize/db-export without -o/--in-place).
+
+Exit codes:
+    0  everything fine
+    1  validation found errors
+    2  usage error, or a file could not be read/parsed/written
+"""
+import argparse
+import json
+import os
+import sys
+from functools import partial
+
+from examples_catalog import EXTRA_FIELDS, RUNTIMES, CatalogStore, normalize_entries, read_examples, write_catalog_atomic
+
+EXIT_OK = 0
+EXIT_INVALID = 1
+EXIT_ERROR = 2
+
+KNOWN_KEYS = ("file", "name", "image", "runtime") + EXTRA_FIELDS
+
+
+# ---------- Per-file workers (run in worker processes) ----------
+def validate_items(items):
+    """Problems the editor would silently fix or the web IDE would trip over."""
+    issues = []
+    seen = {}
+
+    def issue(i, level, msg, file=None):
+        issues.append({"index": i, "file": file, "level": level, "message": msg})
+
+    for i, it in enumerate(items):
+        if not isinstance(it, dict):
+            issue(i, "error", "Eintrag ist kein Objekt")
+            continue
+        file = it.get("file")
+        if not isinstance(file, str) or not file.strip():
+            issue(i, "error", "'file' fehlt oder ist leer")
+            continue
+        file = file.strip()
+        if file in seen:
+            issue(i, "error", f"'file' doppelt (zuerst bei Index {seen[file]})", file)
+        else:
+            seen[file] = i
+        runtime = it.get("runtime")
+        if not isinstance(runtime, str) or runtime.strip().lower() not in RUNTIMES:
+            issue(i, "error", f"ungültige runtime {runtime!r} (erlaubt: {', '.join(RUNTIMES)})", file)
+        elif runtime != runtime.strip().lower():
+            issue(i, "warning", f"runtime {runtime!r} nicht normalisiert", file)
+        name = it.get("name")
+        if not isinstance(name, str) or not name.strip():
+            issue(i, "warning", "'name' fehlt, wird aus dem Dateinamen abgeleitet", file)
+        if "image" in it and not (isinstance(it["image"], str) and it["image"].strip()):
+            issue(i, "warning", "'image' ist leer", file)
+        for key in it:
+            if key not in KNOWN_KEYS:
+                issue(i, "warning", f"unbekanntes Feld {key!r}", file)
+    return issues
+
+
+def _validate_file(path, check_paths=False, root=None, check_syntax=False):
+    items = read_examples(path)
+    issues = validate_items(items)
+    if check_paths:
+        issues.extend(validate_paths(path, items, root))
+    if check_syntax:
+        issues.extend(validate_syntax(path, items, root))
+    errors = sum(1 for x in issues if x["level"] == "error")
+    return {
+        "path": path,
+        "entries": len(items),
+        "valid": errors == 0,
+        "errors": errors,
+        "warnings": len(issues) - errors,
+        "issues": issues,
+    }
+
+
+def validate_paths(path, items, root=None):
+    """Missing code files are errors, missing images warnings (the IDE shows a placeholder)."""
+    from examples_paths import PathValidator, guess_root
+    entries = normalize_entries(items)
+    index = {}
+    for i, it in enumerate(items):
+        if isinstance(it, dict):
+            index.setdefault(str(it.get("file", "")).strip(), i)
+    validator = PathValidator(root or guess_root(path, entries))
+    issues = []
+    for file, problems in validator.check(entries).items():
+        for msg in problems:
+            level = "warning" if msg.startswith("Bild") else "error"
+            issues.append({"index": index.get(file), "file": file, "level": level, "message": msg})
+    return issues
+
+
+def validate_syntax(path, items, root=None):
+    """Syntax errors and MicroPython incompatibilities of every entry's script."""
+    from examples_paths import guess_root
+    from examples_syntax import SyntaxChecker, format_issue
+    entries = normalize_entries(items)
+    index = {}
+    for i, it in enumerate(items):
+        if isinstance(it, dict):
+            file = str(it.get("file", "")).strip()
+            index.setdefault((file, str(it.get("runtime", "")).strip()), i)
+            index.setdefault(file, i)
+    checker = SyntaxChecker(root or guess_root(path, entries))
+    issues = []
+    for (file, runtime), found in checker.check(entries).items():
+        for x in found:
+            issues.append({"index": index.get((file, runtime), index.get(file)), "file": file, "runtime": runtime,
+                           "level": x["level"], "message": format_issue(x)})
+    return issues
+
+
+def _normalize_file(path):
+    items = read_examples(path)
+    return {"path": path, "items": len(items), "entries": CatalogStore(normalize_entries(items)).to_list()}
+
+
+def _stats_file(path):
+    items = read_examples(path)
+    store = CatalogStore(normalize_entries(items))
+    entries = store.to_list()
+    runtimes = {rt: 0 for rt in RUNTIMES}
+    for e in entries:
+        runtimes[e["runtime"]] += 1
+    with_image = sum(1 for e in entries if "image" in e)
+    return {
+        "path": path,
+        "bytes": os.path.getsize(path),
+        "items": len(items),
+        "entries": len(entries),
+        "dropped_or_duplicate": len(items) - len(entries) + store.duplicates(),
+        "duplicates": store.duplicates(),
+        "runtimes": runtimes,
+        "with_image": with_image,
+        "without_image": len(entries) - with_image,
+        "directories": len({os.path.dirname(e["file"]) for e in entries}),
+    }
+
+
+def _guarded(func, path):
+    try:
+        return func(path)
+    except Exception as e:
+        return {"path": path, "error": f"{type(e).__name__}: {e}"}
+
+
+def map_files(func, paths, jobs=None):
+    """Run func(path) for every path, in worker processes when there is more than one file."""
+    if jobs is None:
+        jobs = min(len(paths), os.cpu_count() or 1)
+    if len(paths) <= 1 or jobs <= 1:
+        return [_guarded(func, p) for p in paths]
+    # imported lazily: keeps single-file runs free of the multiprocessing start-up cost
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(partial(_guarded, func), paths))
+
+
+# ---------- Commands ----------
+def _write_output(out, entries):
+    if out == "-":
+        json.dump({"examples": entries}, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    else:
+        write_catalog_atomic(out, entries)
+
+
+def cmd_validate(args):
+    func = partial(_validate_file, check_paths=args.paths, root=args.root, check_syntax=args.syntax)
+    results = map_files(func, args.files, args.jobs)
+    report = {"command": "validate", "files": results}
+    if any("error" in r for r in results):
+        return report, EXIT_ERROR
+    if any(not r["valid"] for r in results):
+        return report, EXIT_INVALID
+    return report, EXIT_OK
+
+
+def cmd_normalize(args):
+    if args.output and len(args.files) > 1:
+        return {"command": "normalize", "error": "-o/--output geht nur mit einer Eingabedatei (sonst --in-place)"}, EXIT_ERROR
+    if not (args.output or args.in_place) and len(args.files) > 1:
+        return {"command": "normalize", "error": "mehrere Eingabedateien gehen nur mit --in-place (stdout nimmt nur einen Katalog)"}, EXIT_ERROR
+    results = map_files(_normalize_file, args.files, args.jobs)
+    files = []
+    code = EXIT_OK
+    for r in results:
+        if "error" in r:
+            files.append(r)
+            code = EXIT_ERROR
+            continue
+        out = args.output or (r["path"] if args.in_place else "-")
+        try:
+            _write_output(out, r["entries"])
+        except Exception as e:
+            files.append({"path": r["path"], "error": f"{type(e).__name__}: {e}"})
+            code = EXIT_ERROR
+            continue
+        files.append({"path": r["path"], "output": out, "items": r["items"], "entries": len(r["entries"])})
+    return {"command": "normalize", "files": files}, code
+
+
+def cmd_merge(args):
+    results = map_files(_normalize_file, args.files, args.jobs)
+    failed = [r for r in results if "error" in r]
+    if failed:
+        return {"command": "merge", "files": failed}, EXIT_ERROR
+    # later files win for the same `file`, the position of the first occurrence is kept
+    store = CatalogStore()
+    for r in results:
+        for e in r["entries"]:
+            store.upsert(e)
+    try:
+        _write_output(args.output, store.to_list())
+    except Exception as e:
+        return {"command": "merge", "output": args.output, "error": f"{type(e).__name__}: {e}"}, EXIT_ERROR
+    return {
+        "command": "merge",
+        "output": args.output,
+        "inputs": [{"path": r["path"], "entries": len(r["entries"])} for r in results],
+        "entries": len(store),
+    }, EXIT_OK
+
+
+def cmd_dedup(args):
+    """Duplicate code/images across the catalogs; --apply rewrites each catalog deduplicated."""
+    from examples_dedup import FileHasher, apply_plan, find_duplicates, plan_dedup
+    from examples_paths import guess_root
+    catalogs, files = [], []
+    for path in args.files:
+        try:
+            entries = CatalogStore(normalize_entries(read_examples(path))).to_list()
+        except Exception as e:
+            return {"command": "dedup", "path": path, "error": f"{type(e).__name__}: {e}"}, EXIT_ERROR
+        catalogs.append((path, args.root or guess_root(path, entries), entries))
+    hasher = FileHasher(jobs=args.jobs)
+    report = {"command": "dedup", **find_duplicates(catalogs, hasher)}
+    code = EXIT_OK
+    for path, root, entries in catalogs:
+        plan = plan_dedup(root, entries, hasher)
+        info = {"path": path, "entries": len(entries), "remove": [entries[i]["file"] for i in plan["remove"]],
+                "relink": [{"file": entries[i]["file"], "from": old, "to": new} for i, old, new in plan["relink"]],
+                "bytes_saved": plan["bytes_saved"]}
+        if args.apply and (plan["remove"] or plan["relink"]):
+            try:
+                write_catalog_atomic(path, apply_plan(entries, plan))
+                info["written"] = True
+            except Exception as e:
+                info["error"] = f"{type(e).__name__}: {e}"
+                code = EXIT_ERROR
+        files.append(info)
+    report["files"] = files
+    report["hashed"] = hasher.hashed
+    return report, code
+
+
+def cmd_db_import(args):
+    from examples_db import import_json
+    try:
+        n = import_json(args.file, args.output)
+    except Exception as e:
+        return {"command": "db-import", "path": args.file, "error": f"{type(e).__name__}: {e}"}, EXIT_ERROR
+    return {"command": "db-import", "path": args.file, "output": args.output, "entries": n}, EXIT_OK
+
+
+def cmd_db_export(args):
+    from examples_catalog import dump_catalog_stream
+    from examples_db import CatalogDB
+    report = {"command": "db-export", "path": args.database, "output": args.output}
+    if not os.path.isfile(args.database):
+        # CatalogDB would create an empty database
+        return {**report, "error": "Datenbank nicht gefunden"}, EXIT_ERROR
+    try:
+        with CatalogDB(args.database) as db:
+            if args.output == "-":
+                report["entries"] = dump_catalog_stream(iter(db), sys.stdout)
+                sys.stdout.write("\n")
+            else:
+                report["entries"] = db.export(args.output)
+    except Exception as e:
+        return {**report, "error": f"{type(e).__name__}: {e}"}, EXIT_ERROR
+    return report, EXIT_OK
+
+
+def cmd_stats(args):
+    results = map_files(_stats_file, args.files, args.jobs)
+    code = EXIT_ERROR if any("error" in r for r in results) else EXIT_OK
+    return {"command": "stats", "files": results}, code
+
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--jobs", "-j", type=int, default=None,
+                        help="worker processes for several files (default: CPU count)")
+    common.add_argument("--compact", action="store_true", help="report as a single JSON line")
+
+    parser = argparse.ArgumentParser(
+        prog="examples_json_editor.py",
+        description="Headless tools for examples.json catalogs (JSON report on stdout).",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("validate", parents=[common], help="check catalogs without changing them")
+    p.add_argument("files", nargs="+")
+    p.add_argument("--paths", action="store_true", help="also check that every file/image exists")
+    p.add_argument("--syntax", action="store_true",
+                   help="also parse every script (syntax errors, MicroPython incompatibilities)")
+    p.add_argument("--root", help="directory the entry paths are relative to (default: guessed)")
+    p.set_defaults(func=cmd_validate)
+
+    p = sub.add_parser("normalize", parents=[common], help="apply the editor's load rules and write the result")
+    p.add_argument("files", nargs="+")
+    g = p.add_mutually_exclusive_group()
+    g.add_argument("--output", "-o", help="output file ('-' = stdout; default: stdout, one input file only)")
+    g.add_argument("--in-place", action="store_true", help="rewrite the input files atomically")
+    p.set_defaults(func=cmd_normalize)
+
+    p = sub.add_parser("merge", parents=[common], help="merge catalogs in order, later files win per `file`")
+    p.add_argument("files", nargs="+")
+    p.add_argument("--output", "-o", required=True, help="output file ('-' = stdout)")
+    p.set_defaults(func=cmd_merge)
+
+    p = sub.add_parser("dedup", parents=[common],
+                       help="find entries with byte-identical code/images (across catalogs); --apply fixes each catalog")
+    p.add_argument("files", nargs="+")
+    p.add_argument("--apply", action="store_true",
+                   help="remove later entries with identical code+runtime, point identical images to one path")
+    p.add_argument("--root", help="directory the entry paths are relative to (default: guessed per catalog)")
+    p.set_defaults(func=cmd_dedup)
+
+    p = sub.add_parser("db-import", parents=[common],
+                       help="replace the entries of an SQLite catalog (created if missing) by a JSON catalog")
+    p.add_argument("file")
+    p.add_argument("--output", "-o", required=True, help="SQLite catalog (.sqlite)")
+    p.set_defaults(func=cmd_db_import)
+
+    p = sub.add_parser("db-export", parents=[common], help="write an SQLite catalog as examples.json")
+    p.add_argument("database")
+    p.add_argument("--output", "-o", default="-", help="output file ('-' = stdout, default)")
+    p.set_defaults(func=cmd_db_export)
+
+    p = sub.add_parser("stats", parents=[common], help="entry counts per runtime, images, duplicates")
+    p.add_argument("files", nargs="+")
+    p.set_defaults(func=cmd_stats)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    report, code = args.func(args)
+    catalog_on_stdout = getattr(args, "output", None) == "-" or (
+        args.command == "normalize" and not args.output and not args.in_place)
+    stream = sys.stderr if catalog_on_stdout else sys.stdout
+    json.dump(report, stream, ensure_ascii=False, indent=None if args.compact else 2)
+    stream.write("\n")
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,508 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite catalog storage for shared catalogs
+- CatalogDB keeps the entries of a catalog in one SQLite table and has the read/write
+  API of CatalogStore, so the editor, EditHistory and the search index work on it unchanged
+- Indexed columns file, name and runtime; entries sharing a file stay separate rows, as
+  in CatalogStore (lookups by file address the first of them); the catalog order is the sortable
+  integer column `pos`, numbered with gaps, so inserting or moving an entry writes that
+  one row (neighbouring rows are spread out again when a gap is used up)
+- Every edit is one short transaction (WAL mode: readers are never blocked, a second
+  editor sees the change right away); refresh() notices commits of other connections
+- Rows are read lazily: the view asks for its visible window only, remembered
+  (index, pos) anchors turn scrolling and index lookups into short index range scans
+- load_json()/import_json() stream an examples.json into the database, export()/
+  export_json() stream it back out, byte for byte what the editor saves for the same
+  entries (dump_catalog_stream)
+
+The database has to live on a local disk (WAL needs shared memory, not a network share).
+
+Used by examples_json_editor.py (Datei → Öffnen… of a .sqlite file) and
+`examples_json_editor.py db-import|db-export` (examples_cli.py).
+
+Complexity (n = number of entries, d = distance to the nearest anchor):
+    lookup by file ........ O(log n)
+    entry at / window ..... O(log n + d)
+    index of file ......... O(log n + d)
+    upsert / delete ....... O(log n + d), one row written
+    insert / move by one .. O(log n + d), one row written (amortized, see _spread)
+"""
+import bisect
+import contextlib
+import json
+import os
+import sqlite3
+
+import perf_trace
+from examples_catalog import EXTRA_FIELDS, Entry, atomic_write, dump_catalog_stream, iter_examples, normalize_entries
+
+SCHEMA_VERSION = 2  # 2: file no longer unique
+DB_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+
+STEP = 1 << 20       # gap between neighbouring positions after (re)numbering
+MIN_GAP = 64         # _spread() leaves at least this much room between rows
+ANCHORS_MAX = 512    # remembered (index, pos) pairs; thinned out beyond that
+PAGE_ROWS = 1000     # rows fetched per round trip when iterating
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS examples (
+        id      INTEGER PRIMARY KEY,
+        pos     INTEGER NOT NULL UNIQUE,
+        file    TEXT NOT NULL,
+        name    TEXT NOT NULL,
+        runtime TEXT NOT NULL,
+        image   TEXT NOT NULL DEFAULT '',
+        extra   TEXT
+    )""",
+    "CREATE INDEX IF NOT EXISTS examples_file ON examples(file, pos)",
+    "CREATE INDEX IF NOT EXISTS examples_name ON examples(name)",
+    "CREATE INDEX IF NOT EXISTS examples_runtime ON examples(runtime)",
+)
+# version 1 -> 2: rebuild the table without the unique constraint on file (rows and ids are kept)
+_MIGRATE_1 = (
+    "DROP INDEX IF EXISTS examples_name",
+    "DROP INDEX IF EXISTS examples_runtime",
+    "ALTER TABLE examples RENAME TO examples_v1",
+    *_SCHEMA,
+    "INSERT INTO examples SELECT id, pos, file, name, runtime, image, extra FROM examples_v1",
+    "DROP TABLE examples_v1",
+)
+_COLUMNS = "file, name, runtime, image, extra"
+_FIRST = "WHERE file = ? ORDER BY pos LIMIT 1"  # first entry of a file
+_INSERT = f"INSERT INTO examples (pos, {_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)"
+
+
+def is_db_path(path):
+    return str(path).lower().endswith(DB_SUFFIXES)
+
+
+def _row(entry):
+    """Column values (file, name, runtime, image, extra) of an entry (dict or Entry)."""
+    if isinstance(entry, Entry):
+        file, name, runtime, image, extra = entry.file, entry.name, entry.runtime, entry.image, entry.extra
+    else:
+        file, name, runtime, image = entry["file"], entry.get("name", ""), entry.get("runtime", ""), entry.get("image")
+        extra = {k: entry[k] for k in EXTRA_FIELDS if k in entry}
+    return (file, name, runtime, image or "",
+            json.dumps(extra, ensure_ascii=False, separators=(",", ":")) if extra else None)
+
+
+def _entry(file, name, runtime, image, extra):
+    return Entry(file, name, runtime, image, json.loads(extra) if extra else None)
+
+
+def iter_catalog(path, chunk_size=2000):
+    """Normalized entries of a catalog file, read and normalized chunk by chunk."""
+    with open(path, "rb") as f:
+        chunk = []
+        for item, _ in iter_examples(f):
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                yield from normalize_entries(chunk)
+                chunk = []
+        yield from normalize_entries(chunk)
+
+
+class CatalogDB:
+    """Ordered catalog entries in an SQLite database, keyed by `file`; same API as CatalogStore."""
+
+    def __init__(self, path, timeout=5.0):
+        self.path = path
+        self.version = 0  # change counter, bumped by every mutation (own or, after refresh(), foreign)
+        self._indexes = []
+        self._external = False  # foreign commit noticed inside one of our transactions
+        # autocommit: every read sees the newest commit, writes open their own transaction
+        self._conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        try:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._init_schema()
+        except BaseException:
+            self._conn.close()
+            raise
+        self._data_version = self._pragma("data_version")
+        self._reset()
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    # ---------- Bulk ----------
+    def load(self, entries):
+        """Replace the content in one transaction. Entries sharing a file are all kept."""
+        with self._write() as conn:
+            conn.execute("DELETE FROM examples")
+            conn.executemany(_INSERT, ((n * STEP, *_row(e)) for n, e in enumerate(entries, 1)))
+        self._reload()
+
+    def load_json(self, path):
+        """Replace the content by a catalog file (streamed, editor load rules). Returns the entry count."""
+        with perf_trace.span("db_import", "io", path=path) as s:
+            self.load(iter_catalog(path))
+            s.set(entries=self._count)
+        return self._count
+
+    def export(self, path):
+        """Write the catalog as examples.json (atomically, streamed). Returns the entry count."""
+        written = []
+        with perf_trace.span("db_export", "io", path=path) as s:
+            # one SELECT statement reads one consistent snapshot, even while others commit
+            atomic_write(path, lambda f: written.append(dump_catalog_stream(iter(self), f)))
+            s.set(entries=written[0])
+        return written[0]
+
+    def clear(self):
+        self.load(())
+
+    def add_index(self, index):
+        """Register a secondary index (see CatalogStore.add_index); slots are row ids."""
+        self._fill(index)
+        self._indexes.append(index)
+
+    def to_list(self):
+        return list(self)
+
+    def refresh(self):
+        """
+        Pick up commits of other connections (other editors). Returns True if the catalog
+        changed since the last call; secondary indexes have been rebuilt then.
+        """
+        changed, self._external = self._external, False
+        version = self._pragma("data_version")
+        if version != self._data_version:
+            self._data_version = version
+            self._reload()
+            changed = True
+        return changed
+
+    # ---------- Queries ----------
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        cur = self._conn.execute(f"SELECT {_COLUMNS} FROM examples ORDER BY pos")
+        for rows in iter(lambda: cur.fetchmany(PAGE_ROWS), []):
+            for r in rows:
+                yield _entry(*r)
+
+    def __contains__(self, file):
+        return self._conn.execute("SELECT 1 FROM examples WHERE file = ?", (file,)).fetchone() is not None
+
+    def get(self, file, default=None):
+        r = self._conn.execute(f"SELECT {_COLUMNS} FROM examples {_FIRST}", (file,)).fetchone()
+        return default if r is None else _entry(*r)
+
+    def index_of(self, file):
+        r = self._conn.execute(f"SELECT pos FROM examples {_FIRST}", (file,)).fetchone()
+        return None if r is None else self._index_of_pos(r[0])
+
+    def entry_at(self, index):
+        return _entry(*self._rows_at(self._check_index(index), 1)[0][2:])
+
+    def window(self, start, count):
+        """Up to count entries in catalog order, beginning at index start."""
+        if count <= 0 or start >= self._count:
+            return []
+        return [_entry(*r[2:]) for r in self._rows_at(max(start, 0), count)]
+
+    def duplicates(self):
+        """Number of entries whose file an earlier entry already uses."""
+        return self._conn.execute("SELECT COUNT(*) - COUNT(DISTINCT file) FROM examples").fetchone()[0]
+
+    def with_runtime(self, runtime):
+        rows = self._conn.execute("SELECT file FROM examples WHERE runtime = ?", (runtime,))
+        return frozenset(r[0] for r in rows)
+
+    def with_image(self, image):
+        rows = self._conn.execute("SELECT file FROM examples WHERE image = ?", (image,))
+        return frozenset(r[0] for r in rows)
+
+    def at_slots(self, slots):
+        """Entries with the given row ids (see add_index), in catalog order."""
+        if not slots:
+            return []
+        rows = self._conn.execute(
+            f"SELECT {_COLUMNS} FROM examples WHERE id IN (SELECT value FROM json_each(?)) ORDER BY pos",
+            (json.dumps(list(slots)),))
+        return [_entry(*r) for r in rows]
+
+    # ---------- Mutations (one transaction each) ----------
+    def append(self, entry):
+        """Add the entry at the end, also if its file is already used. Returns its index."""
+        with self._write() as conn:
+            rowid = self._append(conn, _row(entry))
+        self._count += 1
+        self._index(rowid, entry)
+        return self._count - 1
+
+    def upsert(self, entry):
+        """Add or replace the (first) entry with the same `file`. Returns (index, created)."""
+        row = _row(entry)
+        with self._write() as conn:
+            old = conn.execute(f"SELECT id, pos, {_COLUMNS} FROM examples {_FIRST}", (row[0],)).fetchone()
+            if old is None:
+                rowid = self._append(conn, row)
+            else:
+                conn.execute("UPDATE examples SET name = ?, runtime = ?, image = ?, extra = ? WHERE id = ?",
+                             (*row[1:], old[0]))
+        if old is None:
+            self._count += 1
+            self._index(rowid, entry)
+            return self._count - 1, True
+        self._unindex(old[0], _entry(*old[2:]))
+        self._index(old[0], entry)
+        return self._index_of_pos(old[1]), False
+
+    def insert(self, index, entry):
+        """Insert a new entry at index (between the positions of its new neighbours)."""
+        if index >= self._count:
+            return self.append(entry)
+        index = max(index, 0)
+        with self._write() as conn:
+            pos = self._free_pos(conn, index)
+            rowid = conn.execute(_INSERT, (pos, *_row(entry))).lastrowid
+        self._count += 1
+        self._shift(pos, +1)
+        self._index(rowid, entry)
+        return index
+
+    def remove(self, file):
+        """Remove the (first) entry for file. Returns its former index."""
+        with self._write() as conn:
+            old = conn.execute(f"SELECT id, pos, {_COLUMNS} FROM examples {_FIRST}", (file,)).fetchone()
+            if old is None:
+                raise KeyError(file)
+            index = self._index_of_pos(old[1])
+            conn.execute("DELETE FROM examples WHERE id = ?", (old[0],))
+        self._removed(old)
+        return index
+
+    def remove_at(self, index):
+        """Remove the entry at index and return it."""
+        with self._write() as conn:
+            old = self._rows_at(self._check_index(index), 1)[0]
+            conn.execute("DELETE FROM examples WHERE id = ?", (old[0],))
+        self._removed(old)
+        return _entry(*old[2:])
+
+    def swap(self, i, j):
+        with self._write() as conn:
+            a = self._rows_at(self._check_index(i), 1)[0]
+            b = self._rows_at(self._check_index(j), 1)[0]
+            # pos is unique: park a outside the numbering (positions are >= 1) while b takes its place
+            conn.execute("UPDATE examples SET pos = -1 WHERE id = ?", (a[0],))
+            conn.execute("UPDATE examples SET pos = ? WHERE id = ?", (a[1], b[0]))
+            conn.execute("UPDATE examples SET pos = ? WHERE id = ?", (b[1], a[0]))
+
+    def move(self, index, delta):
+        """Move the entry at index by delta (±1) positions. Returns the new index or None."""
+        new_index = index + delta
+        if index < 0 or index >= self._count or new_index < 0 or new_index >= self._count:
+            return None
+        with self._write() as conn:
+            rowid = self._rows_at(index, 1)[0][0]
+            # the rows passed over keep their positions; the moved row gets one behind/in front of them
+            pos = self._free_pos(conn, new_index + 1 if delta > 0 else new_index)
+            old_pos = conn.execute("SELECT pos FROM examples WHERE id = ?", (rowid,)).fetchone()[0]
+            conn.execute("UPDATE examples SET pos = ? WHERE id = ?", (pos, rowid))
+        self._drop_anchor(old_pos)
+        self._shift(old_pos, -1)
+        self._shift(pos, +1)
+        return new_index
+
+    # ---------- Internal helpers ----------
+    def _append(self, conn, row):
+        tail = conn.execute("SELECT MAX(pos) FROM examples").fetchone()[0] or 0
+        return conn.execute(_INSERT, (tail + STEP, *row)).lastrowid
+
+    def _pragma(self, name):
+        return self._conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+    def _init_schema(self):
+        version = self._pragma("user_version")
+        if version > SCHEMA_VERSION:
+            raise ValueError(f"Katalog-Datenbank hat ein neueres Format ({version}) als dieses Programm "
+                             f"({SCHEMA_VERSION}).")
+        if version == SCHEMA_VERSION:
+            return
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = self._pragma("user_version")  # another connection may have upgraded meanwhile
+            if version < SCHEMA_VERSION:
+                for statement in (_MIGRATE_1 if version == 1 else _SCHEMA):
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @contextlib.contextmanager
+    def _write(self):
+        """Transaction for one edit; the in-memory state is only touched after the commit."""
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = self._pragma("data_version")
+            if version != self._data_version:
+                # another editor committed since our last look: counts and anchors are stale
+                self._data_version = version
+                self._reload()
+                self._external = True
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            self._reset()  # anchors may describe the rolled-back numbering
+            raise
+        self.version += 1
+
+    def _reset(self):
+        self._count = self._conn.execute("SELECT COUNT(*) FROM examples").fetchone()[0]
+        self._anchor_idx = []  # (index, pos) pairs known to be true, ascending in both
+        self._anchor_pos = []
+
+    def _reload(self):
+        self._reset()
+        self.version += 1
+        for index in self._indexes:
+            self._fill(index)
+
+    def _fill(self, index):
+        index.clear()
+        cur = self._conn.execute(f"SELECT id, {_COLUMNS} FROM examples ORDER BY pos")
+        for rows in iter(lambda: cur.fetchmany(PAGE_ROWS), []):
+            for r in rows:
+                index.add(r[0], _entry(*r[1:]))
+
+    def _check_index(self, index):
+        if index < 0:
+            index += self._count
+        if index < 0 or index >= self._count:
+            raise IndexError("Katalog-Index außerhalb des Bereichs")
+        return index
+
+    def _rows_at(self, start, count):
+        """Rows (id, pos, file, name, runtime, image, extra) from index start on, via the nearest anchor."""
+        i = bisect.bisect_right(self._anchor_idx, start) - 1
+        if i < 0:
+            rows = self._conn.execute(f"SELECT id, pos, {_COLUMNS} FROM examples ORDER BY pos LIMIT ? OFFSET ?",
+                                      (count, start)).fetchall()
+        else:
+            rows = self._conn.execute(
+                f"SELECT id, pos, {_COLUMNS} FROM examples WHERE pos >= ? ORDER BY pos LIMIT ? OFFSET ?",
+                (self._anchor_pos[i], count, start - self._anchor_idx[i])).fetchall()
+        if rows and (i < 0 or self._anchor_idx[i] != start):
+            self._remember(start, rows[0][1])
+        return rows
+
+    def _index_of_pos(self, pos):
+        i = bisect.bisect_right(self._anchor_pos, pos) - 1
+        if i < 0:
+            index = self._conn.execute("SELECT COUNT(*) FROM examples WHERE pos < ?", (pos,)).fetchone()[0]
+        else:
+            index = self._anchor_idx[i] + self._conn.execute(
+                "SELECT COUNT(*) FROM examples WHERE pos >= ? AND pos < ?", (self._anchor_pos[i], pos)).fetchone()[0]
+        self._remember(index, pos)
+        return index
+
+    def _remember(self, index, pos):
+        i = bisect.bisect_left(self._anchor_idx, index)
+        if i < len(self._anchor_idx) and self._anchor_idx[i] == index:
+            self._anchor_pos[i] = pos
+            return
+        self._anchor_idx.insert(i, index)
+        self._anchor_pos.insert(i, pos)
+        if len(self._anchor_idx) > ANCHORS_MAX:
+            # keep every other anchor: still spread over the catalog, half the upkeep
+            del self._anchor_idx[::2], self._anchor_pos[::2]
+
+    def _drop_anchor(self, pos):
+        i = bisect.bisect_left(self._anchor_pos, pos)
+        if i < len(self._anchor_pos) and self._anchor_pos[i] == pos:
+            del self._anchor_idx[i], self._anchor_pos[i]
+
+    def _shift(self, pos, delta):
+        """A row was inserted (+1) or removed (-1) at pos: anchors behind it change their index."""
+        idx = self._anchor_idx
+        for i in range(bisect.bisect_right(self._anchor_pos, pos), len(idx)):
+            idx[i] += delta
+
+    def _removed(self, row):
+        self._count -= 1
+        self._drop_anchor(row[1])
+        self._shift(row[1], -1)
+        self._unindex(row[0], _entry(*row[2:]))
+
+    def _free_pos(self, conn, index):
+        """Unused position between the rows at index - 1 and index (spreading rows out if needed)."""
+        if index >= self._count:
+            return (conn.execute("SELECT MAX(pos) FROM examples").fetchone()[0] or 0) + STEP
+        prev = self._rows_at(index - 1, 2) if index > 0 else [(None, 0)] + self._rows_at(index, 1)
+        lo, hi = prev[0][1], prev[1][1]
+        if hi - lo < 2:
+            self._spread(conn, index)
+            lo, hi = self._rows_at(index - 1, 2)[0][1] if index > 0 else 0, self._rows_at(index, 1)[0][1]
+        return (lo + hi) // 2
+
+    def _spread(self, conn, index):
+        """
+        Renumber the rows around index evenly between their outer neighbours. The window
+        doubles until it leaves MIN_GAP between rows (order maintenance), so repeated
+        inserts at one place rewrite a few rows at a time and only rarely all of them.
+        """
+        k = 16
+        while True:
+            first, stop = max(index - k, 0), min(index + k, self._count)
+            left = self._rows_at(first - 1, 1)[0][1] if first > 0 else 0
+            if stop < self._count:
+                right = self._rows_at(stop, 1)[0][1]
+            else:
+                right = left + (stop - first + 1) * STEP  # nothing behind: any room needed
+            gap = (right - left) // (stop - first + 1)
+            if gap >= MIN_GAP:
+                break
+            k *= 2
+        if stop < self._count:
+            rows = conn.execute("SELECT id FROM examples WHERE pos > ? AND pos < ? ORDER BY pos", (left, right))
+        else:
+            rows = conn.execute("SELECT id FROM examples WHERE pos > ? ORDER BY pos", (left,))
+        ids = [r[0] for r in rows]
+        # pos is unique: move the rows to negative positions first, then to their new places
+        conn.executemany("UPDATE examples SET pos = ? WHERE id = ?", ((-n, rowid) for n, rowid in enumerate(ids, 1)))
+        conn.executemany("UPDATE examples SET pos = ? WHERE id = ?",
+                         ((left + gap * n, rowid) for n, rowid in enumerate(ids, 1)))
+        for i, a in enumerate(self._anchor_idx):
+            if first <= a < stop:
+                self._anchor_pos[i] = left + gap * (a - first + 1)
+
+    def _index(self, slot, entry):
+        for index in self._indexes:
+            index.add(slot, entry)
+
+    def _unindex(self, slot, entry):
+        for index in self._indexes:
+            index.discard(slot, entry)
+
+
+# ---------- JSON import / export ----------
+def import_json(json_path, db_path):
+    """Replace the entries of db_path (created if missing) by the catalog file. Returns the count."""
+    os.stat(json_path)  # a missing catalog must not leave an empty database behind
+    with CatalogDB(db_path) as db:
+        return db.load_json(json_path)
+
+
+def export_json(db_path, json_path):
+    """Write the database as examples.json. Returns the count."""
+    with CatalogDB(db_path) as db:
+        return db.export(json_path)
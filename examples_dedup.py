@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Duplicate detection for catalogs and example folders
+- Hashes every referenced script (first existing code candidate, as in scripts.js) and
+  image of one or more catalogs; files are hashed in parallel threads straight from
+  mmap, so large files are never read into memory
+- Hashes are cached in build/hash-cache.json by (size, mtime): an unchanged file is
+  not hashed again
+- Groups entries pointing at byte-identical code, and image paths with byte-identical
+  content, across all given catalogs
+- plan_dedup(): what to change in one catalog: later entries with the same code and
+  runtime as an earlier one are removed, image references are moved to the first path
+  of their content, so duplicate files drop out of manifests, hex builds and downloads
+
+Used by `examples_json_editor.py dedup` (examples_cli.py) and the editor
+(Bearbeiten → Duplikate entfernen…).
+"""
+import hashlib
+import json
+import mmap
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from examples_catalog import atomic_write
+from examples_manifest import ROOT, code_candidates
+
+HASH_VERSION = 1
+DEFAULT_CACHE = os.path.join(ROOT, "build", "hash-cache.json")
+POOL_MIN = 8  # fewer files to hash are done in this thread
+
+
+def hash_file(path):
+    """sha256 hex digest of a file, streamed through mmap (hashlib releases the GIL)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m, memoryview(m) as view:
+                h.update(view)
+    return h.hexdigest()
+
+
+# ---------- Cached hasher ----------
+class FileHasher:
+    """Thread-safe content hashes of files, cached by (size, mtime)."""
+
+    def __init__(self, cache_path=DEFAULT_CACHE, jobs=None):
+        self.cache_path = cache_path
+        self.jobs = jobs
+        self._lock = threading.Lock()
+        self._files = None  # abs path -> [size, mtime_ns, digest]
+        self.hashed = 0     # files actually hashed (cache misses)
+
+    def hashes(self, paths):
+        """{abs path: (digest, size)} for every path that exists."""
+        with self._lock:
+            self._load()
+            result, todo = {}, []
+            for path in set(paths):
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                known = self._files.get(path)
+                if known and known[0] == st.st_size and known[1] == st.st_mtime_ns:
+                    result[path] = (known[2], st.st_size)
+                else:
+                    todo.append((path, st))
+            if todo:
+                for (path, st), digest in zip(todo, self._run([p for p, _ in todo])):
+                    if digest is None:
+                        continue
+                    self._files[path] = [st.st_size, st.st_mtime_ns, digest]
+                    result[path] = (digest, st.st_size)
+                self.hashed += len(todo)
+                self._save()
+            return result
+
+    def _run(self, paths):
+        if len(paths) < POOL_MIN or self.jobs == 1:
+            return [_hash_or_none(p) for p in paths]
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            return list(pool.map(_hash_or_none, paths))
+
+    def _load(self):
+        if self._files is not None:
+            return
+        self._files = {}
+        if not self.cache_path:
+            return
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == HASH_VERSION:
+                self._files = data["files"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def _save(self):
+        if not self.cache_path:
+            return
+        data = {"version": HASH_VERSION, "files": self._files}
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            atomic_write(self.cache_path, lambda f: json.dump(data, f, separators=(",", ":")))
+        except OSError:
+            pass  # read-only checkout: hashes stay in memory
+
+
+def _hash_or_none(path):
+    try:
+        return hash_file(path)
+    except (OSError, ValueError):
+        return None
+
+
+# ---------- Grouping ----------
+def resolve(root, entry):
+    """(code path, image path) of an entry relative to root; None for what does not exist."""
+    code = None
+    for cand in code_candidates(entry["file"]):
+        if os.path.isfile(os.path.join(root, cand)):
+            code = cand
+            break
+    image = entry.get("image") or None
+    if image and not os.path.isfile(os.path.join(root, image)):
+        image = None
+    return code, image
+
+
+def find_duplicates(catalogs, hasher=None):
+    """
+    catalogs: list of (name, root, entries). Returns the duplicate groups:
+        {"code":   [{"hash", "size", "paths": [...], "entries": [{"catalog", "index", "file", "name", "runtime"}]}],
+         "images": [{"hash", "size", "paths": [...], "entries": [...]}],
+         "hashed": n}
+    A code group has at least two entries; an image group at least two different paths.
+    """
+    hasher = hasher or FileHasher()
+    refs = []  # (catalog, index, entry, root, code, image)
+    for name, root, entries in catalogs:
+        for i, e in enumerate(entries):
+            code, image = resolve(root, e)
+            refs.append((name, i, e, root, code, image))
+    paths = [os.path.join(r[3], p) for r in refs for p in r[4:6] if p]
+    known = hasher.hashes(paths)
+
+    def group(kind):
+        col = 4 if kind == "code" else 5
+        groups = {}
+        for ref in refs:
+            rel = ref[col]
+            if rel is None:
+                continue
+            digest, size = known.get(os.path.join(ref[3], rel), (None, 0))
+            if digest is None:
+                continue
+            g = groups.setdefault(digest, {"hash": digest[:16], "size": size, "paths": [], "entries": []})
+            if rel not in g["paths"]:
+                g["paths"].append(rel)
+            name, index, e = ref[0], ref[1], ref[2]
+            g["entries"].append({"catalog": name, "index": index, "file": e["file"], "name": e.get("name", ""),
+                                 "runtime": e.get("runtime", "")})
+        if kind == "code":
+            return [g for g in groups.values() if len(g["entries"]) > 1]
+        return [g for g in groups.values() if len(g["paths"]) > 1]
+
+    return {"code": group("code"), "images": group("images"), "hashed": hasher.hashed}
+
+
+def plan_dedup(root, entries, hasher=None):
+    """
+    Changes that deduplicate one catalog (entries are not modified):
+        {"remove": [index, ...],                       later entries with the same code and runtime
+         "relink": [(index, old image, new image)],   image references moved to the first path of their content
+         "bytes_saved": n}                            duplicate script/image bytes no longer referenced
+    """
+    hasher = hasher or FileHasher()
+    resolved = [resolve(root, e) for e in entries]
+    known = hasher.hashes(os.path.join(root, p) for pair in resolved for p in pair if p)
+
+    def digest(rel):
+        return known.get(os.path.join(root, rel), (None, 0)) if rel else (None, 0)
+
+    remove, relink = [], []
+    first_code = {}   # (digest, runtime) -> index
+    first_image = {}  # digest -> image path
+    kept_paths, dropped_paths = set(), {}
+    for i, (e, (code, image)) in enumerate(zip(entries, resolved)):
+        code_digest, code_size = digest(code)
+        if code_digest is not None:
+            key = (code_digest, e.get("runtime", ""))
+            if key in first_code:
+                remove.append(i)
+                if code not in kept_paths:
+                    dropped_paths[code] = code_size
+                if image and image not in kept_paths:
+                    dropped_paths[image] = digest(image)[1]
+                continue
+            first_code[key] = i
+            kept_paths.add(code)
+        image_digest, image_size = digest(image)
+        if image_digest is not None:
+            canonical = first_image.setdefault(image_digest, image)
+            if canonical != image:
+                relink.append((i, image, canonical))
+                dropped_paths[image] = image_size
+            kept_paths.add(canonical)
+    saved = sum(size for path, size in dropped_paths.items() if path not in kept_paths)
+    return {"remove": remove, "relink": relink, "bytes_saved": saved}
+
+
+def apply_plan(entries, plan):
+    """New entry list with the plan applied."""
+    relinked = {i: new for i, _, new in plan["relink"]}
+    removed = set(plan["remove"])
+    out = []
+    for i, e in enumerate(entries):
+        if i in removed:
+            continue
+        if i in relinked:
+            # same picture bytes, so a (content-named) thumbnail stays valid
+            e = dict(e)
+            e["image"] = relinked[i]
+        out.append(e)
+    return out
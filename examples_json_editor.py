@@ -4,6 +4,15 @@
 Examples JSON Editor
 - Create and edit a JSON file with entries: file, name, image (optional), runtime (python|micropython)
 - Simple Tkinter GUI: add/edit/remove entries, load/save JSON.
+- Undo/redo (Ctrl+Z / Ctrl+Y) for add, update, remove and move.
+- Search box (Ctrl+F) over name and file with runtime filter, backed by an incremental index.
+- Bearbeiten → Duplikate entfernen…: entries with byte-identical code, identical images.
+- Extras → Zeitmessung: records open/save/normalize/list rebuilds as a Chrome trace
+  (perf_trace.py; also CALLIOPE_TRACE=<file.json> to trace from the start).
+- SQLite catalogs (.sqlite/.db, examples_db.py) for catalogs shared by several editors:
+  rows are read as they scroll into view, every edit is committed at once, changes of
+  other editors show up within a second. "Speichern unter…" a .sqlite file converts the
+  open catalog, a .json file exports the database.
 
 Run:
     python3 examples_json_editor.py
@@ -14,26 +23,229 @@ JSON schema produced:
     {"file": "path/to/file.py", "name": "My Program", "image": "assets/pic.png", "runtime": "python"}
   ]
 }
+
+Headless (no Tk import, for build scripts and servers):
+    python3 examples_json_editor.py validate|normalize|merge|stats|db-import|db-export …   (see examples_cli.py)
 """
-import json
 import os
 import sys
+
+if __name__ == "__main__" and len(sys.argv) > 1:
+    # Dispatch before tkinter is imported, so the CLI starts in milliseconds
+    from examples_cli import main as cli_main
+    sys.exit(cli_main(sys.argv[1:]))
+
+import queue
+import threading
+import time
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 
+import perf_trace
+from examples_catalog import (EXTRA_FIELDS, RUNTIMES, CatalogLoader, CatalogStore, CatalogWriter, EditHistory, Entry,
+                              normalize_entries)
+from examples_db import DB_SUFFIXES, CatalogDB, export_json, is_db_path
+from examples_dedup import FileHasher, plan_dedup
+from examples_paths import PathValidator, guess_root
+from examples_search import FilteredView, SearchIndex
+from examples_syntax import SyntaxChecker, format_issue
+
 APP_TITLE = "Examples JSON Editor"
 DEFAULT_JSON_NAME = "examples.json"
+RUNTIME_FILTERS = {"Alle": None, "Python": "python", "MicroPython": "micropython"}
+CATALOG_FILETYPES = [("JSON", "*.json"), ("SQLite-Katalog", " ".join("*" + s for s in DB_SUFFIXES)),
+                     ("Alle Dateien", "*.*")]
 
-RUNTIMES = ("python", "micropython")
+def _row_values(entry):
+    return (entry.get("name",""), entry.get("runtime",""), entry.get("file",""), entry.get("image",""))
 
-def file_exists_or_warn(path: str) -> bool:
-    if not path:
-        return False
-    ok = os.path.exists(path)
-    if not ok:
-        # not fatal, just warn
-        pass
-    return ok
+def _problem_key(entry):
+    # the same script can be listed for both runtimes; its syntax check differs per runtime
+    return entry["file"], entry.get("runtime", "")
+
+class VirtualTree:
+    """
+    Shows a scrolling window of a CatalogStore in a ttk.Treeview.
+
+    Only the rows that fit into the widget exist as tree items. Scrolling and
+    catalog changes re-target those items, and an item is only reconfigured when
+    its displayed values actually change, so redraw cost and memory stay flat
+    however large the catalog grows.
+    """
+
+    WHEEL_ROWS = 3
+
+    def __init__(self, tree, vsb, store, on_select=None):
+        self.tree = tree
+        self.vsb = vsb
+        self.store = store
+        self.on_select = on_select
+        self.first = 0         # catalog index of the top row
+        self.rows = 20         # rows that fit into the widget
+        self.selected = None   # catalog index of the selected row
+        self._iids = []        # materialized items, top to bottom
+        self._shown = []       # values + tags currently displayed per item
+        self.problems = {}     # (file, runtime) -> path/syntax problems; such rows are marked "broken"
+
+        tree.tag_configure("broken", foreground="#b00020")
+        vsb.configure(command=self.yview)
+        tree.configure(yscrollcommand="")
+        tree.bind("<<TreeviewSelect>>", self._on_tree_select)
+        tree.bind("<Configure>", self._on_configure)
+        tree.bind("<MouseWheel>", self._on_wheel)
+        tree.bind("<Button-4>", self._on_wheel)
+        tree.bind("<Button-5>", self._on_wheel)
+        for key in ("<Up>", "<Down>", "<Prior>", "<Next>", "<Home>", "<End>"):
+            tree.bind(key, self._on_key)
+
+    # ---------- Catalog changes ----------
+    def reset(self):
+        self.first = 0
+        self.selected = None
+        self.problems.clear()
+        self.render()
+
+    def inserted(self, index):
+        if self.selected is not None and index <= self.selected:
+            self.selected += 1
+        self.see(index)
+
+    def updated(self, index):
+        if self.first <= index < self.first + len(self._iids):
+            self._render_row(index - self.first, self.store.entry_at(index))
+
+    def deleted(self, index):
+        if self.selected == index:
+            self.selected = None
+        elif self.selected is not None and self.selected > index:
+            self.selected -= 1
+        self.render()
+
+    def moved(self, old, new):
+        if self.selected == old:
+            self.selected = new
+        elif self.selected == new:
+            self.selected = old
+        self.see(new)
+
+    # ---------- Selection / scrolling ----------
+    def select(self, index):
+        if not len(self.store):
+            return
+        index = max(0, min(index, len(self.store) - 1))
+        self.selected = index
+        self.see(index)
+        if self.on_select:
+            self.on_select(index)
+
+    def see(self, index):
+        if index < self.first:
+            self.first = index
+        elif index >= self.first + self.rows:
+            self.first = index - self.rows + 1
+        self.render()
+
+    def scroll_to(self, first):
+        self.first = first
+        self.render()
+
+    def yview(self, *args):
+        n = len(self.store)
+        if not n or not args:
+            return
+        if args[0] == "moveto":
+            self.scroll_to(int(round(float(args[1]) * n)))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if str(args[2]).startswith("page"):
+                step *= max(1, self.rows - 1)
+            self.scroll_to(self.first + step)
+
+    # ---------- Rendering ----------
+    @perf_trace.traced("VirtualTree.render", "ui")
+    def render(self):
+        n = len(self.store)
+        self.first = max(0, min(self.first, n - self.rows))
+        entries = self.store.window(self.first, self.rows)
+        count = len(entries)
+
+        # grow/shrink the item pool to the visible row count
+        while len(self._iids) < count:
+            self._iids.append(self.tree.insert("", "end"))
+            self._shown.append(None)
+        while len(self._iids) > count:
+            self.tree.delete(self._iids.pop())
+            self._shown.pop()
+
+        for slot, entry in enumerate(entries):
+            self._render_row(slot, entry)
+        self._sync_selection()
+
+        if n:
+            self.vsb.set(self.first / n, (self.first + count) / n)
+        else:
+            self.vsb.set(0.0, 1.0)
+
+    def _render_row(self, slot, entry):
+        vals = _row_values(entry)
+        tags = ("broken",) if _problem_key(entry) in self.problems else ()
+        if (vals, tags) != self._shown[slot]:
+            self.tree.item(self._iids[slot], values=vals, tags=tags)
+            self._shown[slot] = (vals, tags)
+
+    def _sync_selection(self):
+        want = ()
+        if self.selected is not None and self.first <= self.selected < self.first + len(self._iids):
+            want = (self._iids[self.selected - self.first],)
+        if tuple(self.tree.selection()) != want:
+            self.tree.selection_set(want)
+        if want:
+            self.tree.focus(want[0])
+
+    # ---------- Events ----------
+    def _on_tree_select(self, event=None):
+        sel = self.tree.selection()
+        if not sel or sel[0] not in self._iids:
+            return
+        index = self.first + self._iids.index(sel[0])
+        if index == self.selected:
+            return  # selection restored by render()
+        self.selected = index
+        if self.on_select:
+            self.on_select(index)
+
+    def _on_configure(self, event):
+        rowheight = 20
+        header = rowheight + 4
+        if self._iids:
+            bbox = self.tree.bbox(self._iids[0])
+            if bbox:
+                header, rowheight = bbox[1], bbox[3]
+        rows = max(1, (event.height - header) // max(1, rowheight))
+        if rows != self.rows:
+            self.rows = rows
+            self.render()
+
+    def _on_wheel(self, event):
+        up = event.num == 4 or getattr(event, "delta", 0) > 0
+        self.scroll_to(self.first + (-self.WHEEL_ROWS if up else self.WHEEL_ROWS))
+        return "break"
+
+    def _on_key(self, event):
+        n = len(self.store)
+        if not n:
+            return "break"
+        cur = self.first if self.selected is None else self.selected
+        target = {
+            "Up": cur - 1,
+            "Down": cur + 1,
+            "Prior": cur - max(1, self.rows - 1),
+            "Next": cur + max(1, self.rows - 1),
+            "Home": 0,
+            "End": n - 1,
+        }.get(event.keysym, cur)
+        self.select(target)
+        return "break"
 
 class ExamplesEditor(tk.Tk):
     def __init__(self):
@@ -43,15 +255,34 @@ class ExamplesEditor(tk.Tk):
         self.minsize(760, 440)
 
         # State
-        self.examples = []  # list of dicts
+        self.examples = CatalogStore()  # ordered entries, indexed by file
+        self.history = EditHistory(self.examples)  # edits go through here, so they can be undone
+        self.search = SearchIndex()  # follows every store mutation
+        self.examples.add_index(self.search)
+        self._search_ready = True  # False: a database is open, the index is built on the first search
+        self._db = None  # open CatalogDB (self.examples), if any
+        self._filtered = None  # FilteredView while a search/runtime filter is active
         self.current_json_path = None
+        self._loader = None  # running CatalogLoader, if any
+        self._load_started = 0  # perf_trace timestamp of the running load
+        self._writer = CatalogWriter()
+        self._saved_version = self.examples.version  # store version on disk
+        self._validator = PathValidator(os.getcwd())
+        self._syntax = SyntaxChecker(os.getcwd())
+        self._path_results = queue.Queue()
+        self._hasher = FileHasher()
+        self._dedup_results = queue.Queue()
+        self._export_results = queue.Queue()
+        self._path_jobs = 0
 
         # Build UI
         self._build_menu()
         self._build_form()
         self._build_list()
         self._build_actions()
+        self._build_status()
         self._layout()
+        self.protocol("WM_DELETE_WINDOW", self.cmd_quit)
 
     # ---------- UI Builders ----------
     def _build_menu(self):
@@ -63,15 +294,30 @@ class ExamplesEditor(tk.Tk):
         filemenu.add_command(label="Speichern", command=self.cmd_save, accelerator="Ctrl+S")
         filemenu.add_command(label="Speichern unter…", command=self.cmd_save_as)
         filemenu.add_separator()
-        filemenu.add_command(label="Beenden", command=self.destroy, accelerator="Ctrl+Q")
+        filemenu.add_command(label="Beenden", command=self.cmd_quit, accelerator="Ctrl+Q")
         menubar.add_cascade(label="Datei", menu=filemenu)
+        editmenu = tk.Menu(menubar, tearoff=0)
+        editmenu.add_command(label="Rückgängig", command=self.cmd_undo, accelerator="Ctrl+Z")
+        editmenu.add_command(label="Wiederholen", command=self.cmd_redo, accelerator="Ctrl+Y")
+        editmenu.add_separator()
+        editmenu.add_command(label="Duplikate entfernen…", command=self.cmd_dedup)
+        menubar.add_cascade(label="Bearbeiten", menu=editmenu)
+        toolsmenu = tk.Menu(menubar, tearoff=0)
+        self.varTrace = tk.BooleanVar(value=perf_trace.enabled())
+        toolsmenu.add_checkbutton(label="Zeitmessung aufzeichnen", variable=self.varTrace, command=self.cmd_toggle_trace)
+        toolsmenu.add_command(label="Zeitmessung exportieren…", command=self.cmd_export_trace)
+        menubar.add_cascade(label="Extras", menu=toolsmenu)
         self.config(menu=menubar)
 
         # Shortcuts
         self.bind_all("<Control-n>", lambda e: self.cmd_new())
         self.bind_all("<Control-o>", lambda e: self.cmd_open())
         self.bind_all("<Control-s>", lambda e: self.cmd_save())
-        self.bind_all("<Control-q>", lambda e: self.destroy())
+        self.bind_all("<Control-q>", lambda e: self.cmd_quit())
+        self.bind_all("<Control-z>", lambda e: self.cmd_undo())
+        self.bind_all("<Control-y>", lambda e: self.cmd_redo())
+        self.bind_all("<Control-Z>", lambda e: self.cmd_redo())  # Ctrl+Shift+Z
+        self.bind_all("<Control-f>", lambda e: self.entSearch.focus_set())
 
     def _build_form(self):
         self.frmForm = ttk.LabelFrame(self, text="Neuer/zu bearbeitender Eintrag")
@@ -101,6 +347,16 @@ class ExamplesEditor(tk.Tk):
 
     def _build_list(self):
         self.frmList = ttk.LabelFrame(self, text="Einträge")
+        # Search bar: filters as you type (word prefixes of name and file)
+        self.frmSearch = ttk.Frame(self.frmList)
+        self.varSearch = tk.StringVar()
+        self.entSearch = ttk.Entry(self.frmSearch, textvariable=self.varSearch, width=40)
+        self.varFilterRuntime = tk.StringVar(value="Alle")
+        self.cbFilterRuntime = ttk.Combobox(self.frmSearch, textvariable=self.varFilterRuntime,
+                                            values=list(RUNTIME_FILTERS), state="readonly", width=12)
+        self.varSearch.trace_add("write", lambda *a: self.apply_filter())
+        self.varFilterRuntime.trace_add("write", lambda *a: self.apply_filter())
+        self.entSearch.bind("<Escape>", lambda e: self.varSearch.set(""))
         # List with columns: name, runtime, file, image
         self.tree = ttk.Treeview(self.frmList, columns=("name","runtime","file","image"), show="headings", selectmode="browse")
         self.tree.heading("name", text="Name")
@@ -113,23 +369,32 @@ class ExamplesEditor(tk.Tk):
         self.tree.column("file", width=360, anchor="w")
         self.tree.column("image", width=220, anchor="w")
 
-        self.tree.bind("<<TreeviewSelect>>", self.on_select_row)
         self.tree.bind("<Double-1>", self.on_double_click_row)
 
         # Scrollbars
-        vsb = ttk.Scrollbar(self.frmList, orient="vertical", command=self.tree.yview)
+        vsb = ttk.Scrollbar(self.frmList, orient="vertical")
         hsb = ttk.Scrollbar(self.frmList, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
+        self.tree.configure(xscrollcommand=hsb.set)
 
         self.vsb = vsb
         self.hsb = hsb
 
+        # Only the visible rows are materialized; the view drives the vertical scrollbar
+        self.view = VirtualTree(self.tree, vsb, self.examples, on_select=self.on_select_row)
+
     def _build_actions(self):
         self.frmActions = ttk.Frame(self)
         self.btnRemove = ttk.Button(self.frmActions, text="Ausgewählten entfernen", command=self.remove_selected)
         self.btnUp = ttk.Button(self.frmActions, text="▲ Nach oben", command=lambda: self.move_selected(-1))
         self.btnDown = ttk.Button(self.frmActions, text="▼ Nach unten", command=lambda: self.move_selected(+1))
 
+    def _build_status(self):
+        self.frmStatus = ttk.Frame(self)
+        self.varStatus = tk.StringVar(value="")
+        self.lblStatus = ttk.Label(self.frmStatus, textvariable=self.varStatus, anchor="w")
+        self.pbLoad = ttk.Progressbar(self.frmStatus, mode="determinate", length=220)
+        self.btnCancelLoad = ttk.Button(self.frmStatus, text="Abbrechen", command=self.cancel_load)
+
     def _layout(self):
         pad = dict(padx=8, pady=8)
 
@@ -137,6 +402,7 @@ class ExamplesEditor(tk.Tk):
         self.frmForm.grid(row=0, column=0, sticky="nsew", **pad)
         self.frmList.grid(row=1, column=0, sticky="nsew", **pad)
         self.frmActions.grid(row=2, column=0, sticky="ew", **pad)
+        self.frmStatus.grid(row=3, column=0, sticky="ew", padx=8, pady=(0,8))
 
         # Grid weights
         self.grid_columnconfigure(0, weight=1)
@@ -165,11 +431,16 @@ class ExamplesEditor(tk.Tk):
         self.btnClear.grid(row=r, column=2, sticky="w", padx=(8,0))
         self.frmForm.grid_columnconfigure(1, weight=1)
 
-        # List + scrollbars
-        self.tree.grid(row=0, column=0, sticky="nsew")
-        self.vsb.grid(row=0, column=1, sticky="ns")
-        self.hsb.grid(row=1, column=0, sticky="ew")
-        self.frmList.grid_rowconfigure(0, weight=1)
+        # Search bar, list + scrollbars
+        self.frmSearch.grid(row=0, column=0, columnspan=2, sticky="ew", pady=(0, 4))
+        ttk.Label(self.frmSearch, text="Suche").grid(row=0, column=0, sticky="w")
+        self.entSearch.grid(row=0, column=1, sticky="ew", padx=(8, 0))
+        self.cbFilterRuntime.grid(row=0, column=2, padx=(8, 0))
+        self.frmSearch.grid_columnconfigure(1, weight=1)
+        self.tree.grid(row=1, column=0, sticky="nsew")
+        self.vsb.grid(row=1, column=1, sticky="ns")
+        self.hsb.grid(row=2, column=0, sticky="ew")
+        self.frmList.grid_rowconfigure(1, weight=1)
         self.frmList.grid_columnconfigure(0, weight=1)
 
         # Actions
@@ -178,6 +449,14 @@ class ExamplesEditor(tk.Tk):
         self.btnDown.grid(row=0, column=2, padx=4)
         self.frmActions.grid_columnconfigure(3, weight=1)
 
+        # Status bar (progress + cancel only while loading)
+        self.lblStatus.grid(row=0, column=0, sticky="ew")
+        self.pbLoad.grid(row=0, column=1, padx=4)
+        self.btnCancelLoad.grid(row=0, column=2, padx=4)
+        self.pbLoad.grid_remove()
+        self.btnCancelLoad.grid_remove()
+        self.frmStatus.grid_columnconfigure(0, weight=1)
+
     # ---------- Commands ----------
     def choose_file(self):
         path = filedialog.askopenfilename(title="Quelldatei auswählen",
@@ -193,22 +472,21 @@ class ExamplesEditor(tk.Tk):
                 name = os.path.splitext(base)[0].replace("_", " ").title()
                 self.varName.set(name)
 
-def choose_image(self):
-    try:
-        # Wichtig: Tupel von Mustern, keine Semikolons!
-        img_types = ("*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp")
-        path = filedialog.askopenfilename(
-            title="Bild auswählen",
-            filetypes=[("Bilder", img_types), ("Alle Dateien", "*.*")]
-        )
-    except Exception as e:
-        messagebox.showerror(APP_TITLE, f"Bildwahl-Dialog Fehler:\n{e}")
-        return
-    if path:
-        rel = self._try_make_relative(path)
-        self.varImage.set(rel)
-
-        
+    def choose_image(self):
+        try:
+            # Wichtig: Tupel von Mustern, keine Semikolons!
+            img_types = ("*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp")
+            path = filedialog.askopenfilename(
+                title="Bild auswählen",
+                filetypes=[("Bilder", img_types), ("Alle Dateien", "*.*")]
+            )
+        except Exception as e:
+            messagebox.showerror(APP_TITLE, f"Bildwahl-Dialog Fehler:\n{e}")
+            return
+        if path:
+            rel = self._try_make_relative(path)
+            self.varImage.set(rel)
+
     def add_or_update_entry(self):
         file = self.varFile.get().strip()
         name = self.varName.get().strip()
@@ -227,19 +505,26 @@ def choose_image(self):
             base = os.path.basename(file)
             name = os.path.splitext(base)[0].replace("_", " ").title()
 
-        # Entry dict (omit empty image)
-        entry = {"file": file, "name": name, "runtime": runtime}
-        if image:
-            entry["image"] = image
+        # Keep build-stage data of the previous version; a thumbnail only while the image is the same
+        extra = {}
+        old = self.examples.get(file)
+        if old is not None:
+            for key in EXTRA_FIELDS:
+                if key in old and not (key == "thumbnail" and old.get("image", "") != image):
+                    extra[key] = old[key]
+        entry = Entry(file, name, runtime, image, extra)
 
         # Update if file already exists, else add
-        idx = self._find_index_by_file(file)
-        if idx is None:
-            self.examples.append(entry)
-            self._tree_insert(entry)
+        idx, created = self.history.upsert(entry)
+        if old is not None:
+            self.view.problems.pop(_problem_key(old), None)
+        if self._filtered is not None:
+            self.apply_filter(keep=file)
+        elif created:
+            self.view.inserted(idx)
         else:
-            self.examples[idx] = entry
-            self._tree_update(idx, entry)
+            self.view.updated(idx)
+        self._check_paths([entry])
 
         self.clear_form(keep_runtime=True)
 
@@ -251,40 +536,196 @@ def choose_image(self):
             self.varRuntime.set("python")
 
     def remove_selected(self):
-        sel = self.tree.selection()
-        if not sel:
+        index = self._selected_index()
+        if index is None:
             return
-        item_id = sel[0]
-        index = self.tree.index(item_id)
-        self.tree.delete(item_id)
-        del self.examples[index]
+        entry = self.history.remove_at(index)
+        self.view.problems.pop(_problem_key(entry), None)
+        if self._filtered is not None:
+            self.apply_filter()
+        else:
+            self.view.deleted(index)
 
     def move_selected(self, delta):
-        sel = self.tree.selection()
-        if not sel:
+        index = self._selected_index()
+        if index is None:
             return
-        item_id = sel[0]
-        index = self.tree.index(item_id)
-        new_index = index + delta
-        if new_index < 0 or new_index >= len(self.examples):
+        # swap in data (neighbours in the catalog, also while a filter hides them)
+        new_index = self.history.move(index, delta)
+        if new_index is None:
             return
-        # swap in data
-        self.examples[index], self.examples[new_index] = self.examples[new_index], self.examples[index]
-        # rebuild tree to reflect new order
-        self._rebuild_tree()
-        # reselect moved row
-        self.tree.selection_set(self.tree.get_children()[new_index])
+        if self._filtered is not None:
+            self.apply_filter(keep=self.examples.entry_at(new_index)["file"])
+            return
+        # only the two swapped rows change on screen; selection follows the moved row
+        self.view.moved(index, new_index)
 
-    def on_select_row(self, event=None):
-        sel = self.tree.selection()
-        if not sel:
+    @perf_trace.traced("apply_filter", "editor")
+    def apply_filter(self, keep=None):
+        """Show the entries matching the search box and runtime filter; keep=file stays selected."""
+        if keep is None and self.view.selected is not None and self.view.selected < len(self.view.store):
+            keep = self.view.store.entry_at(self.view.selected)["file"]
+        query, runtime = self.varSearch.get(), RUNTIME_FILTERS.get(self.varFilterRuntime.get())
+        if not self._search_ready and (query.strip() or runtime):
+            # database: the first search reads all rows once, the index then follows every edit
+            self.examples.add_index(self.search)
+            self._search_ready = True
+        slots = self.search.search(query, runtime)
+        if slots is None:
+            if self._filtered is not None:
+                self.varStatus.set(f"{len(self.examples)} Einträge")
+            self._filtered = None
+            self.view.store = self.examples
+        else:
+            self._filtered = FilteredView(self.examples.at_slots(slots))
+            self.view.store = self._filtered
+            self.varStatus.set(f"{len(self._filtered)} von {len(self.examples)} Einträgen")
+        index = self.view.store.index_of(keep) if keep is not None else None
+        self.view.selected = index
+        if index is None:
+            self.view.render()
+        else:
+            self.view.see(index)
+
+    def _selected_index(self):
+        """Catalog index of the selected row (rows are numbered differently while filtered)."""
+        index = self.view.selected
+        if index is None or self._filtered is None:
+            return index
+        return self.examples.index_of(self._filtered.entry_at(index)["file"])
+
+    def cmd_undo(self):
+        if self._loader is None:
+            self._apply_change(self.history.undo())
+
+    def cmd_redo(self):
+        if self._loader is None:
+            self._apply_change(self.history.redo())
+
+    def _apply_change(self, change):
+        """Show an undone/redone edit: only the affected rows are touched."""
+        if change is None:
+            return
+        kind, a, b = change
+        if kind == "batch":
+            self.view.selected = None
+            self._render_list()
+            return
+        if self._filtered is not None:
+            file = self.examples.entry_at(b)["file"] if kind == "moved" else b["file"]
+            if kind == "deleted":
+                self.view.problems.pop(_problem_key(b), None)
+            elif kind != "moved":
+                self._check_paths([b])
+            self.apply_filter(keep=None if kind == "deleted" else file)
+            return
+        if kind == "moved":
+            self.view.moved(a, b)
+            self.view.select(b)
+        elif kind == "deleted":
+            self.view.problems.pop(_problem_key(b), None)
+            self.view.deleted(a)
+        else:
+            if kind == "inserted":
+                self.view.inserted(a)
+            else:
+                self.view.updated(a)
+            self.view.select(a)
+            self._check_paths([b])
+
+    def cmd_dedup(self):
+        """Hash the catalog's scripts/images on a worker thread, then offer to deduplicate."""
+        if self._loader is not None or not len(self.examples):
+            return
+        entries, version = self.examples.to_list(), self.examples.version
+        root, hasher = self._validator.root, self._hasher
+
+        def work():
+            try:
+                result = plan_dedup(root, entries, hasher)
+            except Exception as e:
+                result = e
+            self._dedup_results.put((entries, version, result))
+
+        threading.Thread(target=work, name="dedup", daemon=True).start()
+        self.varStatus.set("Suche Duplikate…")
+        self.after(self.PATH_POLL_MS, self._poll_dedup)
+
+    def _poll_dedup(self):
+        try:
+            entries, version, plan = self._dedup_results.get_nowait()
+        except queue.Empty:
+            self.after(self.PATH_POLL_MS, self._poll_dedup)
+            return
+        if isinstance(plan, Exception):
+            self.varStatus.set("")
+            messagebox.showerror(APP_TITLE, f"Duplikatsuche fehlgeschlagen:\n{plan}")
+            return
+        if version != self.examples.version:
+            self.varStatus.set("Katalog wurde inzwischen geändert – Duplikatsuche bitte wiederholen")
+            return
+        removed, relinked = plan["remove"], plan["relink"]
+        if not removed and not relinked:
+            self.varStatus.set("Keine Duplikate gefunden")
             return
-        idx = self.tree.index(sel[0])
-        entry = self.examples[idx]
+        names = [entries[i].get("name", "") for i in removed[:10]]
+        text = (f"{len(removed)} Einträge mit identischem Code (gleiche Runtime) wie ein früherer Eintrag"
+                + (":\n  " + "\n  ".join(names) + ("\n  …" if len(removed) > 10 else "") if removed else "")
+                + f"\n\n{len(relinked)} Bildverweise auf inhaltsgleiche Bilder"
+                + f"\n\nEinsparung: {plan['bytes_saved'] / 1024:.1f} kB"
+                + "\n\nEinträge entfernen und Bildverweise zusammenführen? (Rückgängig mit Ctrl+Z)")
+        if not messagebox.askyesno(APP_TITLE, text):
+            self.varStatus.set("")
+            return
+        with self.history.batch():
+            for i, _, image in relinked:
+                e = entries[i]
+                self.history.upsert(Entry(e["file"], e["name"], e["runtime"], image, e.extra))
+            for i in reversed(removed):  # back to front: earlier indexes stay valid
+                self.history.remove_at(i)
+        for i in removed:
+            self.view.problems.pop(_problem_key(entries[i]), None)
+        self.view.selected = None
+        self._render_list()
+        self.varStatus.set(f"{len(removed)} Duplikate entfernt, {len(relinked)} Bildverweise zusammengeführt")
+
+    def cmd_toggle_trace(self):
+        if self.varTrace.get():
+            perf_trace.enable()
+            self.varStatus.set("Zeitmessung läuft")
+        else:
+            perf_trace.disable()
+            self.varStatus.set(f"Zeitmessung angehalten ({len(perf_trace.TRACER)} Ereignisse)")
+
+    def cmd_export_trace(self):
+        """Write the recorded spans as Chrome trace JSON (open in https://ui.perfetto.dev)."""
+        if not len(perf_trace.TRACER):
+            messagebox.showinfo(APP_TITLE, "Noch keine Zeitmessung aufgezeichnet (Extras → Zeitmessung aufzeichnen).")
+            return
+        path = filedialog.asksaveasfilename(
+            title="Zeitmessung exportieren",
+            defaultextension=".json",
+            filetypes=[("Chrome Trace", "*.json"), ("Alle Dateien", "*.*")],
+            initialfile="editor-trace.json"
+        )
+        if not path:
+            return
+        try:
+            n = perf_trace.export(path)
+        except OSError as e:
+            messagebox.showerror(APP_TITLE, f"Konnte Zeitmessung nicht schreiben:\n{e}")
+            return
+        self.varStatus.set(f"Zeitmessung exportiert: {n} Ereignisse in {path}")
+
+    def on_select_row(self, idx):
+        entry = self.view.store.entry_at(idx)
         self.varName.set(entry.get("name", ""))
         self.varFile.set(entry.get("file", ""))
         self.varImage.set(entry.get("image", ""))
         self.varRuntime.set(entry.get("runtime", "python"))
+        problems = self.view.problems.get(_problem_key(entry))
+        if problems:
+            self.varStatus.set("⚠ " + "; ".join(problems))
 
     def on_double_click_row(self, event=None):
         # Double-click behaves same as select + focus form (already handled)
@@ -293,108 +734,392 @@ def choose_image(self):
     def cmd_new(self):
         if self._maybe_discard_changes() is False:
             return
-        self.examples = []
+        self.cancel_load()
+        if self._db is not None:
+            self._use_store(CatalogStore())
+        self.examples.clear()
+        self.history.clear()
+        self._saved_version = self.examples.version
+        self._validator = PathValidator(os.getcwd())
+        self._syntax = SyntaxChecker(os.getcwd())
         self.current_json_path = None
         self._rebuild_tree()
         self.clear_form()
         self.title(f"{APP_TITLE}")
 
+    @perf_trace.traced("cmd_open", "editor")
     def cmd_open(self):
         if self._maybe_discard_changes() is False:
             return
         path = filedialog.askopenfilename(
             title="JSON öffnen",
-            filetypes=[("JSON", "*.json"), ("Alle Dateien", "*.*")],
+            filetypes=CATALOG_FILETYPES,
             initialfile=DEFAULT_JSON_NAME
         )
         if not path:
             return
+        if is_db_path(path):
+            return self._open_db(path)
+        self.cancel_load()
+        # Parse + normalize on a worker thread; entries are streamed in via _poll_load()
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            items = data.get("examples", [])
-            if not isinstance(items, list):
-                raise ValueError("Ungültiges Format: 'examples' muss ein Array sein.")
-            self.examples = self._normalize_on_load(items)
-            self.current_json_path = path
-            self._rebuild_tree()
-            self.title(f"{APP_TITLE} — {os.path.basename(path)}")
+            self._loader = CatalogLoader(path, self._normalize_on_load).start()
+            self._load_started = perf_trace.now()
         except Exception as e:
             messagebox.showerror(APP_TITLE, f"Konnte JSON nicht laden:\n{e}")
+            return
+        if self._db is not None:
+            self._use_store(CatalogStore())
+        self.examples.clear()
+        self.history.clear()
+        self.current_json_path = None
+        self._rebuild_tree()
+        self.clear_form()
+        self.title(f"{APP_TITLE} — {os.path.basename(path)} (lädt…)")
+        self.pbLoad.configure(maximum=max(self._loader.total, 1), value=0)
+        self.pbLoad.grid()
+        self.btnCancelLoad.grid()
+        self.varStatus.set("Lade…")
+        self.after(self.LOAD_POLL_MS, self._poll_load, self._loader)
+
+    def cancel_load(self):
+        loader = self._loader
+        if loader is not None:
+            loader.cancel()
+            self._finish_load(loader, "cancelled", None)
 
+    @perf_trace.traced("cmd_save", "editor")
     def cmd_save(self):
+        if self._loader is not None:
+            messagebox.showwarning(APP_TITLE, "Die Datei wird noch geladen.")
+            return
+        if self._db is not None:
+            self.varStatus.set(f"Alle Änderungen sind in {os.path.basename(self._db.path)} gespeichert")
+            return True
         if not self.current_json_path:
             return self.cmd_save_as()
-        try:
-            payload = {"examples": self.examples}
-            with open(self.current_json_path, "w", encoding="utf-8") as f:
-                json.dump(payload, f, ensure_ascii=False, indent=2)
-            messagebox.showinfo(APP_TITLE, f"Gespeichert:\n{self.current_json_path}")
-        except Exception as e:
-            messagebox.showerror(APP_TITLE, f"Fehler beim Speichern:\n{e}")
+        # Snapshot on the UI thread (entries are replaced, never mutated), write in the background
+        busy = self._writer.busy
+        self._writer.submit(self.current_json_path, self.examples.to_list(), self.examples.version)
+        self.varStatus.set(f"Speichere {os.path.basename(self.current_json_path)}…")
+        if not busy:
+            self.after(self.SAVE_POLL_MS, self._poll_save)
+        return True
 
     def cmd_save_as(self):
         path = filedialog.asksaveasfilename(
             title="JSON speichern unter…",
             defaultextension=".json",
-            filetypes=[("JSON", "*.json"), ("Alle Dateien", "*.*")],
+            filetypes=CATALOG_FILETYPES,
             initialfile=DEFAULT_JSON_NAME
         )
         if not path:
-            return
+            return False
+        if is_db_path(path):
+            return self._save_as_db(path)
+        if self._db is not None:
+            return self._export_db(path)
         self.current_json_path = path
-        self.cmd_save()
+        self.title(f"{APP_TITLE} — {os.path.basename(path)}")
+        return self.cmd_save()
+
+    def cmd_quit(self):
+        if self._maybe_discard_changes() is False:
+            return
+        self.cancel_load()
+        # pending saves must reach the disk before the process goes away
+        self._writer.close()
+        if self._db is not None:
+            self._db.close()
+        self.destroy()
 
     # ---------- Internal helpers ----------
-    def _find_index_by_file(self, file_path: str):
-        for i, e in enumerate(self.examples):
-            if e.get("file") == file_path:
-                return i
-        return None
+    LOAD_POLL_MS = 15     # pause between two _poll_load() slices
+    LOAD_SLICE_MS = 40    # UI time spent per slice on adding entries
+    SAVE_POLL_MS = 50     # interval for picking up CatalogWriter results
 
-    def _normalize_on_load(self, items):
-        norm = []
-        for it in items:
-            if not isinstance(it, dict):
-                continue
-            file = str(it.get("file", "")).strip()
-            if not file:
+    def _poll_save(self):
+        while True:
+            try:
+                kind, path, result = self._writer.queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "saved":
+                if path == self.current_json_path:
+                    self._saved_version = result
+                self.varStatus.set(f"Gespeichert: {path}")
+            else:
+                self.varStatus.set("")
+                messagebox.showerror(APP_TITLE, f"Fehler beim Speichern:\n{result}")
+        if self._writer.busy or not self._writer.queue.empty():
+            self.after(self.SAVE_POLL_MS, self._poll_save)
+
+    # ---------- SQLite catalogs ----------
+    DB_POLL_MS = 1000     # interval for picking up commits of other editors
+
+    def _use_store(self, store):
+        """Edit store (CatalogStore or CatalogDB) from now on; a previously open database is closed."""
+        old = self.examples
+        self.examples = store
+        self.history = EditHistory(store)
+        self.search = SearchIndex()
+        self._search_ready = not isinstance(store, CatalogDB)
+        if self._search_ready:
+            store.add_index(self.search)
+        self._saved_version = store.version
+        self._db = store if isinstance(store, CatalogDB) else None
+        if isinstance(old, CatalogDB) and old is not store:
+            old.close()
+
+    def _open_db(self, path, db=None):
+        """Show a database (db: already open and filled from the current catalog); rows are read as they scroll into view."""
+        self.cancel_load()
+        converted = db is not None
+        if db is None:
+            try:
+                db = CatalogDB(path)
+            except Exception as e:
+                messagebox.showerror(APP_TITLE, f"Konnte Datenbank nicht öffnen:\n{e}")
+                return False
+        self._use_store(db)
+        self.current_json_path = None
+        self._rebuild_tree()
+        self.clear_form()
+        self.title(f"{APP_TITLE} — {os.path.basename(path)} (Datenbank)")
+        self.varStatus.set(f"{len(db)} Einträge – Änderungen werden sofort gespeichert")
+        self.after(self.DB_POLL_MS, self._poll_db, db)
+        if converted:
+            return True  # same entries as before: paths stay relative to the same root
+        root = guess_root(path, db.window(0, 20))
+        self._validator = PathValidator(root)
+        self._syntax = SyntaxChecker(root)
+
+        def read_all():
+            # worker thread: a connection of its own (sqlite3 connections stay on their thread)
+            with CatalogDB(path) as reader:
+                return reader.to_list()
+
+        self._check_paths(read_all)
+        return True
+
+    def _save_as_db(self, path):
+        """Copy the open catalog into the database at path and continue editing there."""
+        if self._loader is not None:
+            messagebox.showwarning(APP_TITLE, "Die Datei wird noch geladen.")
+            return False
+        if self._db is not None and os.path.abspath(path) == os.path.abspath(self._db.path):
+            return self.cmd_save()
+        try:
+            db = CatalogDB(path)
+        except Exception as e:
+            messagebox.showerror(APP_TITLE, f"Konnte Datenbank nicht öffnen:\n{e}")
+            return False
+        try:
+            db.load(iter(self.examples))
+        except Exception as e:
+            db.close()
+            messagebox.showerror(APP_TITLE, f"Fehler beim Speichern:\n{e}")
+            return False
+        return self._open_db(path, db)
+
+    def _export_db(self, path):
+        """Write the open database as examples.json on a worker thread (own connection, one snapshot)."""
+        source = self._db.path
+
+        def work():
+            try:
+                result = export_json(source, path)
+            except Exception as e:
+                result = e
+            self._export_results.put((path, result))
+
+        threading.Thread(target=work, name="db-export", daemon=True).start()
+        self.varStatus.set(f"Exportiere {os.path.basename(path)}…")
+        self.after(self.SAVE_POLL_MS, self._poll_export)
+        return True
+
+    def _poll_export(self):
+        try:
+            path, result = self._export_results.get_nowait()
+        except queue.Empty:
+            self.after(self.SAVE_POLL_MS, self._poll_export)
+            return
+        if isinstance(result, Exception):
+            self.varStatus.set("")
+            messagebox.showerror(APP_TITLE, f"Fehler beim Exportieren:\n{result}")
+            return
+        self.varStatus.set(f"{result} Einträge exportiert: {path}")
+
+    def _poll_db(self, db):
+        if db is not self._db:
+            return  # database closed or replaced
+        if db.refresh():
+            # recorded undo steps address rows by index, which another editor may have shifted
+            self.history.clear()
+            self.view.selected = None
+            self._render_list()
+            self.varStatus.set(f"Katalog wurde von anderer Stelle geändert – {len(db)} Einträge")
+        self.after(self.DB_POLL_MS, self._poll_db, db)
+
+    @perf_trace.traced("_poll_load", "editor")
+    def _poll_load(self, loader):
+        if loader is not self._loader:
+            return  # superseded by a newer load
+        deadline = time.monotonic() + self.LOAD_SLICE_MS / 1000
+        done = 0
+        kind = None
+        while time.monotonic() < deadline:
+            try:
+                kind, payload, done = loader.queue.get_nowait()
+            except queue.Empty:
+                kind = None
+                break
+            if kind == "chunk":
+                for entry in payload:
+                    self.examples.append(entry)
                 continue
-            name = str(it.get("name", "")).strip()
-            runtime = str(it.get("runtime", "")).strip().lower()
-            image = str(it.get("image", "")).strip() if it.get("image") else ""
+            break
 
-            if not name:
-                base = os.path.basename(file)
-                name = os.path.splitext(base)[0].replace("_", " ").title()
-            if runtime not in RUNTIMES:
-                runtime = "python"  # fallback
+        if kind in ("chunk", None):
+            if done:
+                self.pbLoad.configure(value=done)
+            perf_trace.counter("catalog", "editor", entries=len(self.examples))
+            self.varStatus.set(f"Lade… {len(self.examples)} Einträge")
+            self._render_list()
+            self.after(self.LOAD_POLL_MS, self._poll_load, loader)
+            return
+        self._finish_load(loader, kind, payload)
 
-            entry = {"file": file, "name": name, "runtime": runtime}
-            if image:
-                entry["image"] = image
-            norm.append(entry)
-        return norm
+    def _finish_load(self, loader, kind, payload):
+        # detach first: chunks still queued by the worker are dropped by _poll_load()
+        self._loader = None
+        perf_trace.complete("load", self._load_started, "editor", result=kind, entries=len(self.examples),
+                            bytes=loader.total)
+        self.pbLoad.grid_remove()
+        self.btnCancelLoad.grid_remove()
+        if kind == "error":
+            self.examples.clear()
+        self._render_list()
+        name = os.path.basename(loader.path)
+        if kind == "done":
+            self.current_json_path = loader.path
+            self._saved_version = self.examples.version
+            self.title(f"{APP_TITLE} — {name}")
+            self.varStatus.set(f"{len(self.examples)} Einträge geladen")
+            dups = self.examples.duplicates()
+            if dups:
+                self.varStatus.set(f"{len(self.examples)} Einträge geladen – {dups} mit bereits verwendeter Datei "
+                                   "(Bearbeiten/Entfernen betrifft den ersten Eintrag)")
+            entries = self.examples.to_list()
+            root = guess_root(loader.path, entries)
+            self._validator = PathValidator(root)
+            self._syntax = SyntaxChecker(root)
+            self._check_paths(entries)
+        elif kind == "cancelled":
+            # partial catalog stays visible but is not tied to the file, so saving cannot truncate it
+            self.title(f"{APP_TITLE} — {name} (unvollständig)")
+            self.varStatus.set(f"Laden abgebrochen – {len(self.examples)} Einträge übernommen")
+        else:
+            self.title(APP_TITLE)
+            self.varStatus.set("")
+            messagebox.showerror(APP_TITLE, f"Konnte JSON nicht laden:\n{payload}")
+
+    def _find_index_by_file(self, file_path: str):
+        return self.examples.index_of(file_path)
+
+    @perf_trace.traced("_normalize_on_load", "editor")
+    def _normalize_on_load(self, items):
+        return normalize_entries(items, compact=True)
 
+    def _render_list(self):
+        # a running filter is re-evaluated, its result list is a snapshot
+        if self._filtered is not None:
+            self.apply_filter()
+        else:
+            self.view.render()
+
+    @perf_trace.traced("_rebuild_tree", "editor")
     def _rebuild_tree(self):
-        # clear
-        for iid in self.tree.get_children():
-            self.tree.delete(iid)
-        # refill
-        for e in self.examples:
-            self._tree_insert(e)
-
-    def _tree_insert(self, entry):
-        vals = (entry.get("name",""), entry.get("runtime",""), entry.get("file",""), entry.get("image",""))
-        self.tree.insert("", "end", values=vals)
-
-    def _tree_update(self, index, entry):
-        iid = self.tree.get_children()[index]
-        vals = (entry.get("name",""), entry.get("runtime",""), entry.get("file",""), entry.get("image",""))
-        self.tree.item(iid, values=vals)
+        # scroll to top and re-render the visible window (filters are reset with the catalog)
+        self._filtered = None
+        self.view.store = self.examples
+        self.view.reset()
+        self.varSearch.set("")
+        self.varFilterRuntime.set("Alle")
+
+    PATH_POLL_MS = 100    # interval for picking up path check results
+
+    def _check_paths(self, entries):
+        """
+        Check file/image paths and script syntax on a worker thread; broken rows get marked
+        when done. entries may also be a function returning them, called on the worker.
+        """
+        validator, syntax = self._validator, self._syntax
+
+        def work():
+            nonlocal entries
+            if callable(entries):
+                try:
+                    entries = entries()
+                except Exception:
+                    entries = []
+            try:
+                paths = validator.check(entries)
+            except Exception:
+                paths = {}
+            try:
+                issues = syntax.check(entries)
+            except Exception:
+                issues = {}
+            keys = [_problem_key(e) for e in entries]
+            broken = {}
+            for key in set(keys):
+                problems = paths.get(key[0], []) + [format_issue(x) for x in issues.get(key, ())]
+                if problems:
+                    broken[key] = problems
+            self._path_results.put((validator, keys, broken))
+
+        threading.Thread(target=work, name="path-check", daemon=True).start()
+        self._path_jobs += 1
+        if self._path_jobs == 1:
+            self.after(self.PATH_POLL_MS, self._poll_paths)
+
+    def _poll_paths(self):
+        changed = False
+        while True:
+            try:
+                validator, keys, broken = self._path_results.get_nowait()
+            except queue.Empty:
+                break
+            self._path_jobs -= 1
+            if validator is not self._validator:
+                continue  # result for a catalog that has been replaced
+            for key in keys:
+                self.view.problems.pop(key, None)
+            for key, problems in broken.items():
+                if key[0] in self.examples:
+                    self.view.problems[key] = problems
+            changed = True
+        if changed:
+            self.view.render()
+            if self.view.problems:
+                self.varStatus.set(f"{len(self.examples)} Einträge, {len(self.view.problems)} mit Problemen")
+        if self._path_jobs:
+            self.after(self.PATH_POLL_MS, self._poll_paths)
+
+    def _is_dirty(self):
+        # entries streamed in by a running load are not edits; a database commits every edit
+        return self._loader is None and self._db is None and self.examples.version != self._saved_version
 
     def _maybe_discard_changes(self):
-        # Could add dirty-check; for simplicity, always OK
+        if not self._is_dirty():
+            return True
+        answer = messagebox.askyesnocancel(APP_TITLE, "Es gibt ungespeicherte Änderungen.\nJetzt speichern?")
+        if answer is None:
+            return False
+        if answer:
+            # the snapshot is taken synchronously, so the catalog may be replaced right after
+            return bool(self.cmd_save())
         return True
 
     @staticmethod
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Examples manifest compiler
+- Resolves every `file` and `image` of data/examples.json against disk ahead of time
+  (same candidates as loadExamplesFromJson in scripts.js)
+- Splits the entries by runtime and inlines the code text
+- Adds content hashes and byte sizes
+- Writes one compact manifest per device mode, so the examples dialog needs one request:
+
+    data/examples.manifest.none.json   python (turtle) examples, no device selected
+    data/examples.manifest.c12.json    micropython examples, Calliope mini 1/2
+    data/examples.manifest.c3.json     micropython examples, Calliope mini 3
+
+Run (after every catalog/script/image change):
+    python3 examples_manifest.py [data/examples.json] [--root .]
+
+Prints a JSON report; exit code 2 if the catalog cannot be read.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from examples_catalog import atomic_write, normalize_entries, read_examples
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CATALOG = os.path.join("data", "examples.json")
+# all catalogs of this tree; they share the example folders (and their previews/thumbs)
+CATALOGS = ("examples.json", DEFAULT_CATALOG, os.path.join("Examples_JSON_Editor_Package", "examples.json"))
+
+# device mode -> runtime shown in that mode (see currentDevice() in scripts.js)
+DEVICE_MODES = {"none": "python", "c12": "micropython", "c3": "micropython"}
+
+IMAGE_EXTS = ("png", "jpg", "jpeg", "webp", "PNG", "JPG", "JPEG", "WEBP")
+
+MANIFEST_VERSION = 1
+
+
+def manifest_path(catalog, mode):
+    """data/examples.json -> data/examples.manifest.<mode>.json"""
+    stem, ext = os.path.splitext(catalog)
+    return f"{stem}.manifest.{mode}{ext or '.json'}"
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def code_candidates(file):
+    """Same order as the code candidates in loadExamplesFromJson (scripts.js)."""
+    cands = [file]
+    if file.endswith(".py"):
+        cands.append(file + ".txt")
+    if file.endswith(".py.txt"):
+        cands.append(file[:-4])
+    return cands
+
+
+def image_candidates(file):
+    """Heuristic image names for an entry without `image`: beispielX.py.txt -> beispielX.png, …"""
+    base, name = os.path.split(file)
+    for suffix in (".py.txt", ".py", ".txt"):
+        if name.lower().endswith(suffix):
+            name = name[: -len(suffix)]
+            break
+    return [f"{base}/{name}.{ext}" if base else f"{name}.{ext}" for ext in IMAGE_EXTS]
+
+
+def referenced_files(root, catalogs):
+    """
+    Absolute paths of all images and thumbnails the catalogs reference (paths relative to
+    root), so --prune never deletes a file another catalog still uses. Missing catalogs
+    are skipped; an unreadable one raises instead of letting its files look unused.
+    """
+    found = set()
+    for catalog in catalogs:
+        try:
+            items = read_examples(catalog)
+        except FileNotFoundError:
+            continue
+        for e in normalize_entries(items):
+            for rel in (e.get("image"), (e.get("thumbnail") or {}).get("file")):
+                if rel:
+                    found.add(os.path.join(root, rel))
+    return found
+
+
+def _read(root, rel):
+    try:
+        with open(os.path.join(root, rel), "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _size(root, rel):
+    try:
+        return os.path.getsize(os.path.join(root, rel))
+    except OSError:
+        return None
+
+
+def compile_entry(root, entry):
+    """Manifest record for one normalized entry, or (None, reason) if it cannot be shown."""
+    code = used = None
+    for cand in code_candidates(entry["file"]):
+        code = _read(root, cand)
+        if code is not None:
+            used = cand
+            break
+    if code is None:
+        return None, "code nicht gefunden"
+    try:
+        text = code.decode("utf-8")
+    except UnicodeDecodeError:
+        return None, "code ist kein UTF-8"
+
+    calliope = entry["runtime"] == "micropython"
+    rec = {
+        "name": entry["name"],
+        "file": used,
+        "runtime": entry["runtime"],
+        "kind": "calliope" if calliope else "turtle",
+        "description": f"Calliope: {entry['name']}" if calliope else f"Python-Programm: {entry['name']}",
+        "code": text,
+        "hash": content_hash(code),
+        "bytes": len(code),
+        "image": None,
+    }
+    if not calliope:
+        cands = [entry["image"]] if entry.get("image") else image_candidates(entry["file"])
+        for cand in cands:
+            data = _read(root, cand)
+            if data is not None:
+                rec["image"] = cand
+                rec["image_hash"] = content_hash(data)
+                rec["image_bytes"] = len(data)
+                break
+        thumb = entry.get("thumbnail")
+        if rec["image"] and thumb and _size(root, thumb.get("file", "")) is not None:
+            rec["thumb"] = thumb["file"]
+            rec["thumb_width"] = thumb.get("width")
+            rec["thumb_height"] = thumb.get("height")
+    return rec, None
+
+
+def compile_catalog(catalog, root=ROOT, jobs=8):
+    """Returns ({mode: manifest}, report)."""
+    entries = normalize_entries(read_examples(catalog))
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        results = list(pool.map(lambda e: compile_entry(root, e), entries))
+
+    skipped = []
+    by_runtime = {"python": [], "micropython": []}
+    for entry, (rec, reason) in zip(entries, results):
+        if rec is None:
+            skipped.append({"file": entry["file"], "reason": reason})
+        else:
+            by_runtime[rec["runtime"]].append(rec)
+
+    with open(catalog, "rb") as f:
+        source_hash = content_hash(f.read())
+    manifests = {
+        mode: {
+            "version": MANIFEST_VERSION,
+            "device": mode,
+            "source": os.path.relpath(catalog, root).replace(os.sep, "/"),
+            "source_hash": source_hash,
+            "examples": by_runtime[runtime],
+        }
+        for mode, runtime in DEVICE_MODES.items()
+    }
+    report = {
+        "catalog": catalog,
+        "entries": len(entries),
+        "python": len(by_runtime["python"]),
+        "micropython": len(by_runtime["micropython"]),
+        "skipped": skipped,
+        "missing_images": [r["file"] for r in by_runtime["python"] if r["image"] is None],
+    }
+    return manifests, report
+
+
+def write_manifests(catalog, manifests):
+    written = {}
+    for mode, manifest in manifests.items():
+        path = manifest_path(catalog, mode)
+        atomic_write(path, lambda f: json.dump(manifest, f, ensure_ascii=False, separators=(",", ":")))
+        written[mode] = {"path": path, "bytes": os.path.getsize(path), "examples": len(manifest["examples"])}
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile examples.json into one manifest per device mode.")
+    parser.add_argument("catalog", nargs="?", default=None, help=f"catalog (default: <root>/{DEFAULT_CATALOG})")
+    parser.add_argument("--root", default=ROOT, help="web root the catalog paths are relative to")
+    parser.add_argument("--jobs", "-j", type=int, default=8, help="threads for reading files")
+    args = parser.parse_args(argv)
+
+    catalog = args.catalog or os.path.join(args.root, DEFAULT_CATALOG)
+    try:
+        manifests, report = compile_catalog(catalog, args.root, args.jobs)
+        report["manifests"] = write_manifests(catalog, manifests)
+    except Exception as e:
+        json.dump({"catalog": catalog, "error": f"{type(e).__name__}: {e}"}, sys.stdout, ensure_ascii=False)
+        sys.stdout.write("\n")
+        return 2
+    json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Path validation for catalog entries
+- Checks every referenced `file` (with the .py/.py.txt candidates of scripts.js) and `image`
+- Stats run concurrently in a thread pool (slow network shares)
+- Results are cached per path together with the mtime of its directory: a file can
+  only appear or vanish when its directory changes, so re-validation after edits
+  stats each directory once and only re-checks paths in changed directories
+
+Used by the editor (background thread, broken rows are marked) and by
+`examples_json_editor.py validate --paths`.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from examples_manifest import code_candidates
+
+
+def _dir_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def guess_root(catalog_path, entries, sample=20):
+    """
+    Directory the entry paths are relative to: the working directory, the
+    catalog's directory or its parent (data/examples.json), whichever resolves most.
+    """
+    cwd = os.getcwd()
+    if not catalog_path:
+        return cwd
+    cat_dir = os.path.dirname(os.path.abspath(catalog_path))
+    candidates = [cwd, cat_dir, os.path.dirname(cat_dir)]
+    files = [e["file"] for e in entries[:sample]]
+    best, best_hits = cwd, -1
+    for root in candidates:
+        hits = sum(1 for f in files if any(os.path.exists(os.path.join(root, c)) for c in code_candidates(f)))
+        if hits > best_hits:
+            best, best_hits = root, hits
+    return best
+
+
+class PathValidator:
+    """Thread-safe, cached existence checks for catalog paths below root."""
+
+    def __init__(self, root, jobs=16):
+        self.root = root
+        self.jobs = jobs
+        self._lock = threading.Lock()
+        self._cache = {}  # abs path -> (dir mtime_ns, exists)
+        self.stats_done = 0  # file stats actually performed (cache misses)
+
+    def check(self, entries):
+        """Returns {file: [problem, ...]} for entries with broken paths."""
+        wanted = {}  # entry file -> (code candidate paths, image path or None)
+        for e in entries:
+            code = [os.path.join(self.root, c) for c in code_candidates(e["file"])]
+            image = os.path.join(self.root, e["image"]) if e.get("image") else None
+            wanted[e["file"]] = (code, image)
+
+        paths = set()
+        for code, image in wanted.values():
+            paths.update(code)
+            if image:
+                paths.add(image)
+        exists = self._exists_many(paths)
+
+        broken = {}
+        for e in entries:
+            code, image = wanted[e["file"]]
+            problems = []
+            if not any(exists[p] for p in code):
+                problems.append(f"Datei fehlt: {e['file']}")
+            if image and not exists[image]:
+                problems.append(f"Bild fehlt: {e['image']}")
+            if problems:
+                broken[e["file"]] = problems
+        return broken
+
+    def invalidate(self):
+        with self._lock:
+            self._cache.clear()
+
+    def _exists_many(self, paths):
+        dirs = {os.path.dirname(p) for p in paths}
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            mtimes = dict(zip(dirs, pool.map(_dir_mtime, dirs)))
+
+            result, todo = {}, []
+            with self._lock:
+                for p in paths:
+                    mtime = mtimes[os.path.dirname(p)]
+                    if mtime is None:
+                        result[p] = False  # directory gone: nothing to stat
+                        continue
+                    hit = self._cache.get(p)
+                    if hit is not None and hit[0] == mtime:
+                        result[p] = hit[1]
+                    else:
+                        todo.append(p)
+
+            found = list(pool.map(os.path.isfile, todo))
+
+        with self._lock:
+            self.stats_done += len(todo)
+            for p, ok in zip(todo, found):
+                result[p] = ok
+                self._cache[p] = (mtimes[os.path.dirname(p)], ok)
+        return result
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Incremental search over the examples catalog
+- Word-prefix index over `name` and `file`: both are split into lower-case words
+  ("turtlebeispiele/Stern_5.py" -> turtlebeispiele, stern, 5, py), every query word
+  must be the beginning of a word of the entry ("stern tur" finds the entry above)
+- Registered as a secondary index of a CatalogStore (store.add_index), so it follows
+  every upsert/delete without rescanning the catalog; it records store slots, which
+  come back in catalog order almost without sorting
+- Optional runtime filter (python / micropython)
+- FilteredView: the matching entries in catalog order, with the read API VirtualTree
+  uses (len, window, entry_at), so the Treeview shows search results like the catalog
+
+Used by examples_json_editor.py; has no Tk dependency.
+
+Complexity (t = distinct words, m = matching entries):
+    add / discard entry ... O(words per entry), new words O(t) (sorted word list)
+    search ................ O(log t + postings of the matched words)
+    results in order ...... O(m) for the usual nearly sorted slots (store.at_slots)
+"""
+import bisect
+import re
+
+_WORD = re.compile(r"[^\W_]+")
+
+# New words are kept unsorted up to this many; beyond that (bulk loads) the sorted
+# word list is rebuilt once on the next search instead of inserting word by word
+_PENDING_MAX = 64
+
+
+def words(text):
+    """Lower-case words of a name or path (underscores and punctuation separate words)."""
+    return _WORD.findall(text.lower())
+
+
+class SearchIndex:
+    """Word-prefix index over name and file of catalog entries."""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._postings = {}   # word -> set of slots
+        self._runtimes = {}   # runtime -> set of slots
+        self._sorted = []     # all words, sorted (None: rebuild on next search)
+        self._pending = []    # words not yet in _sorted
+
+    def __len__(self):
+        return len(self._postings)
+
+    # ---------- Secondary index protocol (CatalogStore) ----------
+    def add(self, slot, entry):
+        self._runtimes.setdefault(entry.get("runtime", ""), set()).add(slot)
+        for word in set(words(entry.get("name", "")) + words(entry["file"])):
+            slots = self._postings.get(word)
+            if slots is None:
+                self._postings[word] = {slot}
+                self._new_word(word)
+            else:
+                slots.add(slot)
+
+    def discard(self, slot, entry):
+        self._runtimes.get(entry.get("runtime", ""), set()).discard(slot)
+        for word in set(words(entry.get("name", "")) + words(entry["file"])):
+            slots = self._postings.get(word)
+            if slots is None:
+                continue
+            slots.discard(slot)
+            if not slots:
+                del self._postings[word]
+                self._drop_word(word)
+
+    # ---------- Queries ----------
+    def search(self, query, runtime=None):
+        """
+        Slots of the entries matching every word of query and the runtime (None: any),
+        or None if there is nothing to filter (no words, no runtime).
+        """
+        wanted = words(query)
+        hits = None
+        if runtime is not None:
+            hits = set(self._runtimes.get(runtime, ()))
+        if not wanted:
+            return hits
+        self._sync()
+        # longest words first: they usually match the fewest entries
+        for prefix in sorted(set(wanted), key=len, reverse=True):
+            hits = self._prefix_slots(prefix, hits)
+            if not hits:
+                return set()
+        return hits
+
+    def _prefix_slots(self, prefix, within):
+        """Slots having a word that starts with prefix (restricted to within, if given)."""
+        sorted_words = self._sorted
+        lo = bisect.bisect_left(sorted_words, prefix)
+        hi = bisect.bisect_left(sorted_words, prefix + "\uffff", lo)
+        found = set()
+        for word in sorted_words[lo:hi]:
+            slots = self._postings[word]
+            found.update(slots if within is None else slots & within)
+        return found
+
+    # ---------- Internal helpers ----------
+    def _new_word(self, word):
+        if self._sorted is None:
+            return
+        if len(self._pending) < _PENDING_MAX:
+            self._pending.append(word)
+        else:
+            self._sorted, self._pending = None, []
+
+    def _drop_word(self, word):
+        if self._sorted is None:
+            return
+        if word in self._pending:
+            self._pending.remove(word)
+            return
+        i = bisect.bisect_left(self._sorted, word)
+        if i < len(self._sorted) and self._sorted[i] == word:
+            del self._sorted[i]
+
+    def _sync(self):
+        if self._sorted is None:
+            self._sorted = sorted(self._postings)
+        else:
+            for word in self._pending:
+                bisect.insort(self._sorted, word)
+        self._pending = []
+
+
+class FilteredView:
+    """Entries matching a search, in catalog order; read-only, same API as CatalogStore for VirtualTree."""
+
+    def __init__(self, entries):
+        self._entries = entries
+        self._index = None  # file -> position, built on first index_of()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __contains__(self, file):
+        return self.index_of(file) is not None
+
+    def entry_at(self, index):
+        return self._entries[index]
+
+    def window(self, start, count):
+        if count <= 0:
+            return []
+        return self._entries[max(start, 0):max(start, 0) + count]
+
+    def index_of(self, file):
+        if self._index is None:
+            self._index = {e["file"]: i for i, e in enumerate(self._entries)}
+        return self._index.get(file)
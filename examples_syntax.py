@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Syntax pre-check for catalog scripts
+- Parses every entry's code file with ast (first existing code candidate, as in scripts.js);
+  runtime "python" scripts get the IDE's `repeat n:` extension first (extendPythonCode)
+- For runtime "micropython" also flags what MicroPython cannot run: match statements,
+  except*, positional-only parameters, CPython-only modules; f-strings as a warning
+  (missing on older firmware such as Calliope mini 1/2)
+- Results are cached by content hash in build/syntax-cache.json; files whose size and
+  mtime did not change are not even read again, so a re-check only parses what changed
+- Many uncached scripts are parsed in worker processes
+
+Used by the editor (together with the path check) and by
+`examples_json_editor.py validate --syntax`.
+"""
+import ast
+import hashlib
+import json
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from examples_catalog import atomic_write
+from examples_manifest import ROOT, code_candidates
+
+CHECK_VERSION = 1
+DEFAULT_CACHE = os.path.join(ROOT, "build", "syntax-cache.json")
+POOL_MIN = 32  # fewer uncached scripts are parsed in this process
+
+# imported by scripts, but not part of MicroPython
+CPYTHON_ONLY_MODULES = frozenset({
+    "abc", "asyncio", "dataclasses", "datetime", "enum", "multiprocessing", "numpy", "pathlib",
+    "pygame", "requests", "sqlite3", "subprocess", "threading", "tkinter", "turtle", "typing",
+})
+
+
+_REPEAT_BLOCK = re.compile(r"^repeat\s+(.+?)\s*:\s*(#.*)?$")
+_REPEAT_INLINE = re.compile(r"^repeat\s+(.+?)\s+(?!#)(.+)$")
+_REPEAT_BARE = re.compile(r"^repeat\s+(.+?)\s*(#.*)?$")
+
+
+# ---------- Checks (run in worker processes) ----------
+def extend_repeat(code):
+    """`repeat n:` / `repeat n stmt` -> `for _ in range(n):`, line by line like extendPythonCode (scripts.js)."""
+    out = []
+    for line in re.split(r"\r?\n", code):
+        trimmed = line.lstrip()
+        indent = line[:len(line) - len(trimmed)]
+        if not trimmed or trimmed.startswith("#"):
+            out.append(line)
+            continue
+        m = _REPEAT_BLOCK.match(trimmed)
+        if m:
+            comment = " " + m.group(2).strip() if m.group(2) else ""
+            out.append(f"{indent}for _ in range({m.group(1).strip()}):{comment}")
+            continue
+        m = _REPEAT_INLINE.match(trimmed)
+        if m:
+            out.append(f"{indent}for _ in range({m.group(1).strip()}): {m.group(2).strip()}")
+            continue
+        m = _REPEAT_BARE.match(trimmed)
+        if m:
+            comment = " " + m.group(2).strip() if m.group(2) else ""
+            out.append(f"{indent}for _ in range({m.group(1).strip()}):{comment}")
+            continue
+        out.append(line)
+    return "\n".join(out)
+
+
+def _issue(level, line, message):
+    return {"level": level, "line": line, "message": message}
+
+
+def _micropython_issues(tree):
+    issues = []
+    for node in ast.walk(tree):
+        line = getattr(node, "lineno", None)
+        if isinstance(node, ast.Match):
+            issues.append(_issue("error", line, "match-Anweisung gibt es in MicroPython nicht"))
+        elif type(node).__name__ == "TryStar":
+            issues.append(_issue("error", line, "except* gibt es in MicroPython nicht"))
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)) and node.args.posonlyargs:
+            issues.append(_issue("error", line, "Nur-Positions-Parameter (/) gibt es in MicroPython nicht"))
+        elif isinstance(node, ast.JoinedStr):
+            issues.append(_issue("warning", line, "f-String: nicht auf jeder MicroPython-Firmware (Calliope mini 1/2)"))
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            names = [a.name for a in node.names] if isinstance(node, ast.Import) else \
+                [node.module or ""] if not node.level else []
+            for name in names:
+                if name.split(".")[0] in CPYTHON_ONLY_MODULES:
+                    issues.append(_issue("warning", line, f"Modul {name!r} gibt es in MicroPython nicht"))
+    # ast.walk is breadth-first; report in source order
+    issues.sort(key=lambda x: x["line"] or 0)
+    return issues
+
+
+def check_source(data, runtime="python"):
+    """Issues of one script (bytes): a syntax error, or MicroPython incompatibilities."""
+    try:
+        if runtime == "python":
+            data = extend_repeat(data.decode("utf-8-sig"))
+        tree = ast.parse(data)
+    except SyntaxError as e:
+        return [_issue("error", e.lineno, f"Syntaxfehler: {e.msg}")]
+    except ValueError as e:  # null bytes, undecodable text (UnicodeDecodeError)
+        return [_issue("error", None, f"nicht lesbar: {e}")]
+    if runtime == "micropython":
+        return _micropython_issues(tree)
+    return []
+
+
+def _check_job(job):
+    key, data, runtime = job
+    return key, check_source(data, runtime)
+
+
+def format_issue(issue):
+    return f"Zeile {issue['line']}: {issue['message']}" if issue["line"] else issue["message"]
+
+
+# ---------- Cached checker ----------
+class SyntaxChecker:
+    """Thread-safe, content-hash cached syntax checks for catalog scripts below root."""
+
+    def __init__(self, root, cache_path=DEFAULT_CACHE, jobs=None):
+        self.root = root
+        self.cache_path = cache_path
+        self.jobs = jobs
+        self._lock = threading.Lock()
+        self._files = None    # abs path -> [size, mtime_ns, content hash]
+        self._results = None  # "hash:runtime" -> issues
+        self._dirty = False
+        self.parsed = 0       # scripts actually parsed (cache misses)
+
+    def check(self, entries):
+        """
+        Returns {(file, runtime): [issue, ...]} for entries with issues (missing files are
+        skipped); a script listed for both runtimes is checked once per runtime.
+        """
+        with self._lock:
+            self._load()
+            keys, todo = {}, {}
+            for e in entries:
+                found = self._content_key(e["file"])
+                if found is None:
+                    continue
+                digest, path = found
+                key = f"{digest}:{e['runtime']}"
+                keys[e["file"], e["runtime"]] = key
+                if key not in self._results and key not in todo:
+                    todo[key] = (path, e["runtime"])
+
+            if todo:
+                jobs = []
+                for key, (path, runtime) in todo.items():
+                    try:
+                        with open(path, "rb") as f:
+                            jobs.append((key, f.read(), runtime))
+                    except OSError:
+                        continue
+                for key, issues in self._run(jobs):
+                    self._results[key] = issues
+                self.parsed += len(jobs)
+                self._dirty = True
+            if self._dirty:
+                self._save()
+
+            report = {}
+            for entry_key, key in keys.items():
+                issues = self._results.get(key)
+                if issues:
+                    report[entry_key] = issues
+            return report
+
+    def invalidate(self):
+        with self._lock:
+            self._files, self._results = {}, {}
+            self._dirty = True
+
+    def _run(self, jobs):
+        if len(jobs) < POOL_MIN or self.jobs == 1:
+            return list(map(_check_job, jobs))
+        with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+            return list(pool.map(_check_job, jobs, chunksize=max(1, len(jobs) // 64)))
+
+    def _content_key(self, file):
+        """(content hash, path) of the first existing code candidate, or None."""
+        for cand in code_candidates(file):
+            path = os.path.join(self.root, cand)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            known = self._files.get(path)
+            if known and known[0] == st.st_size and known[1] == st.st_mtime_ns:
+                return known[2], path
+            try:
+                with open(path, "rb") as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()[:16]
+            except OSError:
+                continue
+            self._files[path] = [st.st_size, st.st_mtime_ns, digest]
+            self._dirty = True
+            return digest, path
+        return None
+
+    def _load(self):
+        if self._files is not None:
+            return
+        self._files, self._results = {}, {}
+        if not self.cache_path:
+            return
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == CHECK_VERSION:
+                self._files, self._results = data["files"], data["results"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def _save(self):
+        self._dirty = False
+        if not self.cache_path:
+            return
+        data = {"version": CHECK_VERSION, "files": self._files, "results": self._results}
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            atomic_write(self.cache_path, lambda f: json.dump(data, f, separators=(",", ":")))
+        except OSError:
+            pass  # read-only checkout: results stay in memory
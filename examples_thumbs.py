@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Example thumbnails
+- Creates a downscaled thumbnail for every catalog `image` in worker processes
+- Thumbnails are named after the content hash of the source image, so only new or
+  changed images are processed again (identical images share one thumbnail)
+- Writes {"file", "width", "height"} into the entry's `thumbnail` field, so the IDE
+  can load small images and reserve layout space up front
+
+Uses Pillow when installed (all formats); otherwise PNG only via png_image.py.
+
+Run:
+    python3 examples_thumbs.py [data/examples.json] [--size 240x160] [--prune [--catalog OTHER.json ...]]
+
+Thumbnails go to a `thumbs/` folder next to each image, e.g.
+turtlebeispiele/thumbs/beispiel1.<hash>.240x160.png. --prune keeps every thumbnail that
+this catalog or one of the --catalog catalogs (default: all catalogs of the tree,
+examples_manifest.CATALOGS) references.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from examples_catalog import atomic_write, normalize_entries, read_examples, write_catalog_atomic
+from examples_manifest import CATALOGS, DEFAULT_CATALOG, ROOT, referenced_files
+from png_image import downscale, encode_png, fit_size, png_size, read_png
+
+try:
+    from PIL import Image
+except ImportError:  # optional
+    Image = None
+
+THUMB_DIR = "thumbs"
+DEFAULT_SIZE = (240, 160)  # 2x the 80 px card height in the examples dialog
+
+
+def thumb_name(image, digest, size):
+    stem = os.path.splitext(os.path.basename(image))[0]
+    return os.path.join(os.path.dirname(image), THUMB_DIR, f"{stem}.{digest}.{size[0]}x{size[1]}.png")
+
+
+def make_thumbnail(src, dst, size):
+    """Render src into dst (PNG) fitting into size. Returns (width, height). Runs in a worker."""
+    if Image is not None:
+        with Image.open(src) as im:
+            im = im.convert("RGBA")
+            im.thumbnail(size, Image.LANCZOS)
+            atomic_write(dst, lambda f: im.save(f, "PNG", optimize=True), binary=True)
+            return im.size
+    with open(src, "rb") as f:
+        data = f.read()
+    w, h, rgba = read_png(data)
+    nw, nh = fit_size(w, h, *size)
+    small = downscale(w, h, rgba, nw, nh) if (nw, nh) != (w, h) else rgba
+    png = encode_png(nw, nh, small)
+    atomic_write(dst, lambda f: f.write(png), binary=True)
+    return nw, nh
+
+
+def _thumb_job(job):
+    src, dst, size = job
+    try:
+        return dst, make_thumbnail(src, dst, size), None
+    except Exception as e:
+        return dst, None, f"{type(e).__name__}: {e}"
+
+
+def _existing_size(path):
+    try:
+        with open(path, "rb") as f:
+            return png_size(f.read(24))
+    except (OSError, ValueError):
+        return None
+
+
+def build_thumbnails(entries, root=ROOT, size=DEFAULT_SIZE, jobs=None):
+    """
+    Adds/updates `thumbnail` on entries (in place). Returns a report dict with
+    generated/cached/failed thumbnails and the set of thumbnail files in use.
+    """
+    todo = {}      # abs dst -> (abs src, dst rel)
+    planned = []   # (entry, dst rel)
+    report = {"generated": [], "cached": 0, "failed": [], "missing": []}
+    used = set()
+    for e in entries:
+        image = e.get("image")
+        if not image:
+            e.pop("thumbnail", None)
+            continue
+        src = os.path.join(root, image)
+        try:
+            with open(src, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()[:16]
+        except OSError:
+            report["missing"].append(image)
+            continue
+        if Image is None and not image.lower().endswith(".png"):
+            report["failed"].append({"image": image, "error": "ohne Pillow nur PNG"})
+            continue
+        rel = thumb_name(image, digest, size).replace(os.sep, "/")
+        used.add(os.path.join(root, rel))
+        planned.append((e, rel))
+        dst = os.path.join(root, rel)
+        if dst not in todo and _existing_size(dst) is None:
+            todo[dst] = (src, rel)
+
+    sizes = {}
+    if todo:
+        for d in {os.path.dirname(dst) for dst in todo}:
+            os.makedirs(d, exist_ok=True)
+        work = [(src, dst, size) for dst, (src, _) in todo.items()]
+        if len(work) == 1 or jobs == 1:
+            results = list(map(_thumb_job, work))
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                results = list(pool.map(_thumb_job, work))
+        for dst, dims, err in results:
+            if err:
+                report["failed"].append({"image": todo[dst][1], "error": err})
+            else:
+                sizes[dst] = dims
+                report["generated"].append(todo[dst][1])
+
+    for e, rel in planned:
+        dst = os.path.join(root, rel)
+        dims = sizes.get(dst) or _existing_size(dst)
+        if dims is None:
+            continue
+        if dst not in sizes:
+            report["cached"] += 1
+        e["thumbnail"] = {"file": rel, "width": dims[0], "height": dims[1]}
+    report["used"] = used
+    return report
+
+
+def prune(root, used, image_dirs):
+    """Remove thumbnails in the given image folders that no entry references."""
+    removed = []
+    for d in image_dirs:
+        tdir = os.path.join(root, d, THUMB_DIR)
+        if not os.path.isdir(tdir):
+            continue
+        for name in os.listdir(tdir):
+            path = os.path.join(tdir, name)
+            if name.endswith(".png") and path not in used:
+                os.remove(path)
+                removed.append(os.path.relpath(path, root).replace(os.sep, "/"))
+    return removed
+
+
+def _parse_size(text):
+    w, _, h = text.lower().partition("x")
+    return int(w), int(h or w)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create thumbnails for catalog images and record them in the catalog.")
+    parser.add_argument("catalog", nargs="?", default=None, help=f"catalog (default: <root>/{DEFAULT_CATALOG})")
+    parser.add_argument("--root", default=ROOT, help="web root the catalog paths are relative to")
+    parser.add_argument("--size", type=_parse_size, default=DEFAULT_SIZE, help="bounding box WxH (default 240x160)")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="worker processes")
+    parser.add_argument("--prune", action="store_true", help="delete thumbnails no catalog uses any more")
+    parser.add_argument("--catalog", dest="catalogs", action="append", default=None,
+                        help="further catalog whose thumbnails --prune keeps (repeatable; default: all of the tree)")
+    args = parser.parse_args(argv)
+
+    catalog = args.catalog or os.path.join(args.root, DEFAULT_CATALOG)
+    try:
+        entries = normalize_entries(read_examples(catalog))
+        before = json.dumps(entries, sort_keys=True)
+        report = build_thumbnails(entries, args.root, args.size, args.jobs)
+        used = report.pop("used")
+        changed = json.dumps(entries, sort_keys=True) != before
+        if changed:
+            write_catalog_atomic(catalog, entries)
+        if args.prune:
+            dirs = {os.path.dirname(e["image"]) for e in entries if e.get("image")}
+            others = args.catalogs or [os.path.join(args.root, c) for c in CATALOGS]
+            report["pruned"] = prune(args.root, used | referenced_files(args.root, [catalog, *others]), dirs)
+    except Exception as e:
+        json.dump({"catalog": catalog, "error": f"{type(e).__name__}: {e}"}, sys.stdout, ensure_ascii=False)
+        sys.stdout.write("\n")
+        return 2
+    report.update(catalog=catalog, catalog_updated=changed, backend="Pillow" if Image else "png_image")
+    json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Watch mode: rebuild catalog artifacts when scripts, images, firmware or the catalog change
+- Polls an mtime/size index of turtlebeispiele/, calliopebeispiele/, firmware/ and the
+  catalog; no inotify or other dependencies
+- A directory is listed again only when its own mtime changed, otherwise only its known
+  files are stat()ed; the poll interval grows while nothing changes (--interval up to
+  --max-interval), so idle CPU stays near zero on trees with thousands of files
+- Changes are debounced (an editor save or a copied folder is one build) and mapped to
+  the stages that read them:
+      micropython script, firmware .... hex       (hex_batch.py)
+      python script ................... previews  (turtle_preview.py) -> thumbs -> manifest
+      image ........................... thumbs    (examples_thumbs.py) -> manifest
+      catalog ......................... all stages
+  Each stage is content-addressed itself, so only the entries whose inputs changed are
+  built again; the hex lane and the preview/thumbnail/manifest lane run side by side,
+  each stage with its own worker processes
+- Generated files (previews/, thumbs/, firmware/.cache, build/) are not watched; catalog
+  rewrites by the stages themselves do not trigger another build
+- Stages only write their own fields (BUILD_FIELDS) back: the catalog is read again right
+  before writing and the results are merged into what is there now, so an editor save
+  during a build is kept (a field the editor changed meanwhile keeps the editor's value,
+  and the save still triggers the next build); if the file changes between that read and
+  the write, the merge is retried
+
+Prints one JSON line per build.
+
+Run:
+    python3 examples_watch.py [data/examples.json] [--root .] [--stages hex,previews,thumbs,manifest] [-j N] [--once]
+
+Exit codes (--once): 0 ok, 1 a stage failed, 2 catalog unusable.
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import perf_trace
+from examples_catalog import atomic_write, dump_catalog, iter_examples, normalize_entries, read_examples
+from examples_manifest import DEFAULT_CATALOG, ROOT, code_candidates, compile_catalog, image_candidates, write_manifests
+from examples_thumbs import THUMB_DIR, build_thumbnails
+from hex_batch import build_catalog as build_hex
+from turtle_preview import PREVIEW_DIR, build_previews
+
+WATCH_DIRS = ("turtlebeispiele", "calliopebeispiele", "firmware")
+SKIP_DIRS = {PREVIEW_DIR, THUMB_DIR, ".cache", "__pycache__", "build"}
+WATCH_EXTS = (".py", ".txt", ".hex", ".png", ".jpg", ".jpeg", ".webp", ".json")
+
+STAGES = ("hex", "previews", "thumbs", "manifest")
+BUILD_FIELDS = ("image", "thumbnail", "cost")  # catalog fields written by the stages
+MERGE_ATTEMPTS = 5
+
+DEFAULT_INTERVAL = 1.0      # seconds between polls after a change
+DEFAULT_MAX_INTERVAL = 5.0  # idle polls slow down to this
+DEFAULT_DEBOUNCE = 0.3      # quiet time before a build starts
+MAX_DEBOUNCE = 5.0          # build anyway when changes keep coming for this long
+BACKOFF = 1.5
+
+# Directory/file mtimes this close to "now" may still change within the same timestamp
+# tick; such directories are listed again on the next poll (like git's racy-clean check)
+RACY_NS = 2_000_000_000
+
+
+# ---------- Index ----------
+class TreeIndex:
+    """mtime/size index of the watched files (paths relative to root, forward slashes)."""
+
+    def __init__(self, root, dirs=WATCH_DIRS, files=()):
+        self.root = root
+        self.dirs = [os.path.join(root, d) for d in dirs]
+        self.extra = list(files)  # single files watched outside the dirs (the catalog)
+        self.files = {}           # rel path -> (size, mtime_ns)
+        self._listing = {}        # abs dir -> (mtime_ns or None, [(rel, abs) of files], [abs subdirs])
+        self.stats = 0            # stat() calls of the last scan
+
+    def scan(self):
+        """Set of rel paths added, changed or removed since the last scan."""
+        seen, changed = {}, set()
+        self.stats = 0
+        visited = set()
+        for d in self.dirs:
+            self._scan_dir(d, seen, visited)
+        for rel in self.extra:
+            self._stat(rel, os.path.join(self.root, rel), seen)
+        for rel, sig in seen.items():
+            if self.files.get(rel) != sig:
+                changed.add(rel)
+        changed.update(set(self.files) - set(seen))
+        self.files = seen
+        for d in set(self._listing) - visited:
+            del self._listing[d]
+        return changed
+
+    def refresh(self, rel):
+        """Take the current state of one file as known (after writing it ourselves)."""
+        self.files.pop(rel, None)
+        self._stat(rel, os.path.join(self.root, rel), self.files)
+
+    def _scan_dir(self, path, seen, visited):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        self.stats += 1
+        visited.add(path)
+        known = self._listing.get(path)
+        if known is None or known[0] != st.st_mtime_ns:
+            files, subdirs = [], []
+            rel_dir = os.path.relpath(path, self.root).replace(os.sep, "/")
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        if entry.name.startswith("."):
+                            continue  # hidden files, atomic_write temp files
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in SKIP_DIRS:
+                                subdirs.append(entry.path)
+                        elif entry.name.lower().endswith(WATCH_EXTS):
+                            files.append((f"{rel_dir}/{entry.name}", entry.path))
+            except OSError:
+                return
+            racy = time.time_ns() - st.st_mtime_ns < RACY_NS
+            known = (None if racy else st.st_mtime_ns, files, subdirs)
+            self._listing[path] = known
+        stat = os.stat
+        for rel, full in known[1]:
+            try:
+                st = stat(full)
+            except OSError:
+                continue
+            seen[rel] = (st.st_size, st.st_mtime_ns)
+        self.stats += len(known[1])
+        for sub in known[2]:
+            self._scan_dir(sub, seen, visited)
+
+    def _stat(self, rel, full, seen):
+        try:
+            st = os.stat(full)
+        except OSError:
+            return
+        self.stats += 1
+        seen[rel] = (st.st_size, st.st_mtime_ns)
+
+
+# ---------- Change -> stages ----------
+def stage_inputs(entries):
+    """rel path -> stages reading it, from the catalog entries."""
+    inputs = {}
+
+    def add(path, *stages):
+        inputs.setdefault(path, set()).update(stages)
+
+    for e in entries:
+        if e["runtime"] == "micropython":
+            for cand in code_candidates(e["file"]):
+                add(cand, "hex", "manifest")
+            continue
+        for cand in code_candidates(e["file"]):
+            add(cand, "previews", "manifest")
+        if e.get("image"):
+            add(e["image"], "thumbs", "manifest")
+        else:
+            for cand in image_candidates(e["file"]):
+                add(cand, "manifest")
+    return inputs
+
+
+def affected_stages(changed, catalog_rel, inputs):
+    if catalog_rel in changed:
+        return set(STAGES)
+    stages = set()
+    for rel in changed:
+        if rel.startswith("firmware/") and rel.lower().endswith(".hex"):
+            stages.add("hex")
+        stages |= inputs.get(rel, set())
+    return stages
+
+
+# ---------- Stages ----------
+def _read_catalog(catalog, parse=True):
+    """(content hash, normalized entries or None) of the catalog file."""
+    with open(catalog, "rb") as f:
+        data = f.read()
+    entries = normalize_entries([item for item, _ in iter_examples(io.BytesIO(data))]) if parse else None
+    return hashlib.sha256(data).digest(), entries
+
+
+def _occurrences(entries):
+    """(file, n) per entry: the n-th entry with that file, to match entries across two reads."""
+    seen = {}
+    keys = []
+    for e in entries:
+        n = seen[e["file"]] = seen.get(e["file"], -1) + 1
+        keys.append((e["file"], n))
+    return keys
+
+
+_MISSING = object()
+
+
+def _update_catalog(catalog, build):
+    """
+    Run build(entries) on the catalog's entries and write the BUILD_FIELDS it changed back
+    into the current catalog (see module docstring). Returns (report, content hash of the
+    catalog written or None).
+    """
+    entries = _read_catalog(catalog)[1]
+    before = [{k: e.get(k, _MISSING) for k in BUILD_FIELDS} for e in entries]
+    report = build(entries)
+    changes = {}  # (file, n) -> {field: (old, new)}
+    for key, e, old in zip(_occurrences(entries), entries, before):
+        diff = {k: (old[k], e.get(k, _MISSING)) for k in BUILD_FIELDS if e.get(k, _MISSING) != old[k]}
+        if diff:
+            changes[key] = diff
+    if not changes:
+        return report, None
+    for _ in range(MERGE_ATTEMPTS):
+        digest, entries = _read_catalog(catalog)
+        merged = False
+        for key, e in zip(_occurrences(entries), entries):
+            for k, (old, new) in changes.get(key, {}).items():
+                if e.get(k, _MISSING) != old:
+                    continue  # changed by someone else meanwhile: theirs wins
+                if new is _MISSING:
+                    e.pop(k, None)
+                else:
+                    e[k] = new
+                merged = True
+        if not merged:
+            return report, None
+        if _read_catalog(catalog, parse=False)[0] == digest:
+            buf = io.StringIO()
+            dump_catalog(entries, buf)
+            text = buf.getvalue()
+            atomic_write(catalog, lambda f: f.write(text))
+            return report, hashlib.sha256(text.encode("utf-8")).digest()
+        # saved by someone else while merging: merge into that version
+    raise RuntimeError(f"Katalog ändert sich laufend, Ergebnisse nicht gespeichert: {catalog}")
+
+
+def stage_hex(catalog, root, jobs):
+    report = build_hex(catalog, root, jobs=jobs)
+    failed = bool(report["failed"] or report["firmware_errors"])
+    summary = {"built": report["built"], "cached": report["cached"], "failed": report["failed"]}
+    if report["firmware_errors"]:
+        summary["firmware_errors"] = [e["error"] for e in report["firmware_errors"]]
+    return summary, failed, None
+
+
+def stage_previews(catalog, root, jobs):
+    report, changed = _update_catalog(catalog, lambda entries: build_previews(entries, root, jobs=jobs))
+    summary = {"rendered": len(report["rendered"]), "cached": report["cached"], "updated": report["updated"],
+               "failed": [f["file"] for f in report["failed"]]}
+    return summary, bool(report["failed"]), changed
+
+
+def stage_thumbs(catalog, root, jobs):
+    report, changed = _update_catalog(catalog, lambda entries: build_thumbnails(entries, root, jobs=jobs))
+    summary = {"generated": len(report["generated"]), "cached": report["cached"],
+               "failed": [f["image"] for f in report["failed"]], "missing": report["missing"]}
+    return summary, bool(report["failed"]), changed
+
+
+def stage_manifest(catalog, root, jobs):
+    manifests, report = compile_catalog(catalog, root)
+    write_manifests(catalog, manifests)
+    return {"python": report["python"], "micropython": report["micropython"],
+            "skipped": len(report["skipped"])}, False, None
+
+
+STAGE_FUNCS = {"hex": stage_hex, "previews": stage_previews, "thumbs": stage_thumbs, "manifest": stage_manifest}
+
+
+def _run_lane(stages, catalog, root, jobs):
+    """Run stages one after the other (each reads what the previous one wrote)."""
+    results = {}
+    for name in stages:
+        t0 = time.perf_counter()
+        try:
+            with perf_trace.span(name, "watch"):
+                summary, failed, catalog_changed = STAGE_FUNCS[name](catalog, root, jobs)
+        except Exception as e:
+            summary, failed, catalog_changed = {"error": f"{type(e).__name__}: {e}"}, True, None
+        summary["s"] = round(time.perf_counter() - t0, 3)
+        results[name] = (summary, failed, catalog_changed)
+    return results
+
+
+def run_build(stages, catalog, root, jobs=None, enabled=STAGES):
+    """
+    Runs the given stages (plus what a catalog rewrite makes necessary) in two lanes:
+    hex, and previews -> thumbs -> manifest. Returns {stage: (summary, failed, catalog_changed)};
+    catalog_changed is the content hash of the catalog the stage wrote, or None.
+    """
+    stages = set(stages) & set(enabled)
+    if {"previews", "thumbs"} & stages:
+        stages |= {"thumbs", "manifest"} & set(enabled)  # previews change images, images change thumbnails
+    lanes = [[s for s in ("hex",) if s in stages],
+             [s for s in ("previews", "thumbs", "manifest") if s in stages]]
+    lanes = [lane for lane in lanes if lane]
+    if not lanes:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(lanes)) as pool:
+        futures = [pool.submit(_run_lane, lane, catalog, root, jobs) for lane in lanes]
+        results = {}
+        for f in futures:
+            results.update(f.result())
+    return results
+
+
+# ---------- Watch loop ----------
+class Watcher:
+    def __init__(self, catalog, root=ROOT, stages=STAGES, jobs=None, interval=DEFAULT_INTERVAL,
+                 max_interval=DEFAULT_MAX_INTERVAL, debounce=DEFAULT_DEBOUNCE, out=sys.stdout):
+        self.catalog = catalog
+        self.root = root
+        self.catalog_rel = os.path.relpath(catalog, root).replace(os.sep, "/")
+        self.stages = tuple(stages)
+        self.jobs = jobs
+        self.interval = interval
+        self.max_interval = max(max_interval, interval)
+        self.debounce = debounce
+        self.out = out
+        self.index = TreeIndex(root, files=[self.catalog_rel])
+        self.builds = 0
+
+    def _inputs(self):
+        try:
+            return stage_inputs(normalize_entries(read_examples(self.catalog)))
+        except (OSError, ValueError):
+            return {}
+
+    def build(self, stages, changed=()):
+        t0 = time.perf_counter()
+        results = run_build(stages, self.catalog, self.root, self.jobs, self.stages)
+        # files the stages wrote themselves (the catalog) must not trigger the next build,
+        # an editor save after the stage's write must
+        written = {r[2] for r in results.values() if r[2]}
+        if written:
+            try:
+                current = _read_catalog(self.catalog, parse=False)[0]
+            except OSError:
+                current = None
+            if current in written:
+                self.index.refresh(self.catalog_rel)
+        self.builds += 1
+        record = {
+            "build": self.builds,
+            "time": time.strftime("%H:%M:%S"),
+            "changed": sorted(changed)[:20] + (["…"] if len(changed) > 20 else []),
+            "stages": {name: r[0] for name, r in sorted(results.items())},
+            "failed": sorted(name for name, r in results.items() if r[1]),
+            "total_s": round(time.perf_counter() - t0, 3),
+        }
+        json.dump(record, self.out, ensure_ascii=False)
+        self.out.write("\n")
+        self.out.flush()
+        return record
+
+    def wait_quiet(self, changed):
+        """Debounce: keep collecting changes until a poll finds none (at most MAX_DEBOUNCE)."""
+        deadline = time.monotonic() + MAX_DEBOUNCE
+        while time.monotonic() < deadline:
+            time.sleep(self.debounce)
+            more = self.index.scan()
+            if not more:
+                break
+            changed |= more
+        return changed
+
+    def run(self, once=False):
+        self.index.scan()
+        first = self.build(self.stages)
+        if once:
+            return first
+        print(f"Beobachte {len(self.index.files)} Dateien (Strg+C beendet)", file=sys.stderr)
+        interval = self.interval
+        while True:
+            time.sleep(interval)
+            changed = self.index.scan()
+            if not changed:
+                interval = min(interval * BACKOFF, self.max_interval)
+                continue
+            interval = self.interval
+            changed = self.wait_quiet(changed)
+            stages = affected_stages(changed, self.catalog_rel, self._inputs())
+            if stages:
+                self.build(stages, changed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild hex files, previews, thumbnails and manifests on changes.")
+    parser.add_argument("catalog", nargs="?", default=None, help=f"catalog (default: <root>/{DEFAULT_CATALOG})")
+    parser.add_argument("--root", default=ROOT, help="web root the catalog paths are relative to")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"stages to run (default {','.join(STAGES)})")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="worker processes per stage")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="poll interval in seconds")
+    parser.add_argument("--max-interval", type=float, default=DEFAULT_MAX_INTERVAL,
+                        help="poll interval while idle (default 5)")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE, help="quiet time before a build")
+    parser.add_argument("--once", action="store_true", help="build once and exit")
+    args = parser.parse_args(argv)
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unbekannte Stufe(n): {', '.join(sorted(unknown))}")
+    catalog = os.path.abspath(args.catalog or os.path.join(args.root, DEFAULT_CATALOG))
+    try:
+        read_examples(catalog)
+    except Exception as e:
+        json.dump({"catalog": catalog, "error": f"{type(e).__name__}: {e}"}, sys.stdout, ensure_ascii=False)
+        sys.stdout.write("\n")
+        return 2
+    watcher = Watcher(catalog, os.path.abspath(args.root), stages, args.jobs, args.interval, args.max_interval,
+                      args.debounce)
+    try:
+        record = watcher.run(once=args.once)
+    except KeyboardInterrupt:
+        return 0
+    return 1 if record["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
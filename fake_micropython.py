@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fake MicroPython device on a pseudo terminal (test double for serial_engine.py)
+- Opens a pty; the host talks to FakeDevice.path like to /dev/ttyACM0
+- Friendly REPL (">>> ", paste mode Ctrl-E as used by pasteExec), raw REPL (Ctrl-A),
+  raw-paste mode with window flow control (MicroPython 1.14+); raw_paste=False behaves
+  like older firmware (Calliope mini 1/2), where Ctrl-E A Ctrl-A just restarts the raw REPL
+- Received bytes are consumed at the simulated baud rate, so transfer times are realistic;
+  bytes sent beyond the raw-paste window are counted in stats["window_overruns"]
+- Code runs in-process with print()/open()/os redirected to the device: output comes back
+  with MicroPython's framing, files live in FakeDevice.files
+- reset() (or reset_after=N received bytes) simulates a board reset: buffers are dropped,
+  the boot banner is sent and the friendly REPL starts again; files survive
+
+Run (prints the pty path, Ctrl-C stops):
+    python3 fake_micropython.py [--baud 115200] [--window 128] [--no-raw-paste]
+"""
+import argparse
+import builtins
+import io
+import os
+import select
+import struct
+import sys
+import threading
+import time
+import traceback
+import tty
+import types
+
+BANNER = b"MicroPython v1.20.0 on 2023-04-26; Calliope mini (fake) with nRF52833\r\nType \"help()\" for more information.\r\n"
+RAW_BANNER = b"raw REPL; CTRL-B to exit\r\n>"
+PASTE_BANNER = b"\r\npaste mode; Ctrl-C to cancel, Ctrl-D to finish\r\n=== "
+PROMPT = b">>> "
+
+# ---------- Device side of print/open/os ----------
+class _File:
+    def __init__(self, files, name, mode):
+        self._files, self._name = files, name
+        self._binary = "b" in mode
+        self._writing = mode[0] in "wa"
+        if mode[0] == "w":
+            files[name] = bytearray()
+        elif mode[0] == "a":
+            files.setdefault(name, bytearray())
+        elif name not in files:
+            raise OSError(2, "ENOENT")
+        self._pos = 0
+
+    def write(self, data):
+        if not self._writing:
+            raise OSError(1, "EPERM")
+        data = data if self._binary else data.encode("utf-8")
+        self._files[self._name].extend(data)
+        return len(data)
+
+    def read(self, size=-1):
+        data = bytes(self._files[self._name])
+        chunk = data[self._pos:] if size is None or size < 0 else data[self._pos:self._pos + size]
+        self._pos += len(chunk)
+        return chunk if self._binary else chunk.decode("utf-8")
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _device_os(files):
+    def stat(name):
+        if name not in files:
+            raise OSError(2, "ENOENT")
+        return (0x8000, 0, 0, 0, 0, 0, len(files[name]), 0, 0, 0)
+
+    def remove(name):
+        if files.pop(name, None) is None:
+            raise OSError(2, "ENOENT")
+
+    mod = types.ModuleType("os")
+    mod.stat, mod.remove = stat, remove
+    mod.listdir = lambda *a: sorted(files)
+    mod.size = lambda name: stat(name)[6]  # micro:bit/Calliope mini 1/2 API
+    return mod
+
+
+class FakeDevice:
+    def __init__(self, baudrate=115200, window=128, raw_paste=True, reset_after=None):
+        self.baudrate = baudrate
+        self.window = window
+        self.raw_paste = raw_paste
+        self.reset_after = reset_after  # simulate one reset after that many received bytes
+        self.files = {}
+        self.stats = {"received": 0, "sent": 0, "executed": 0, "window_overruns": 0, "resets": 0}
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)  # keeps the pty alive and raw while the host reopens it
+        os.set_blocking(self._master, False)
+        self.path = os.ttyname(self._slave)
+        self._stop = threading.Event()
+        self._reset = threading.Event()
+        self._thread = None
+        self._boot()
+
+    # ---------- Lifecycle ----------
+    def start(self):
+        self._thread = threading.Thread(target=self._serve, name="fake-micropython", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(2)
+        for fd in (self._master, self._slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def reset(self):
+        """Board reset (reset button, watchdog): handled by the device thread."""
+        self._reset.set()
+
+    # ---------- Device loop ----------
+    def _boot(self):
+        self._mode = "friendly"
+        self._buf = bytearray()
+        self._credit = self._consumed = 0
+        self._globals = None
+
+    def _send(self, data):
+        self.stats["sent"] += len(data)
+        while data and not self._stop.is_set():
+            try:
+                n = os.write(self._master, data)
+            except BlockingIOError:
+                time.sleep(0.001)
+                continue
+            data = data[n:]
+
+    def _serve(self):
+        byte_time = 10 / self.baudrate  # 8N1
+        while not self._stop.is_set():
+            if self._reset.is_set():
+                self._reset.clear()
+                self.stats["resets"] += 1
+                self._boot()
+                self._drain()
+                self._send(BANNER + PROMPT)
+            ready, _, _ = select.select([self._master], [], [], 0.02)
+            if not ready:
+                continue
+            try:
+                data = os.read(self._master, 256)
+            except OSError:
+                continue  # host side closed, wait for the next open
+            time.sleep(len(data) * byte_time)
+            for b in data:
+                self.stats["received"] += 1
+                if self.reset_after is not None and self.stats["received"] >= self.reset_after:
+                    self.reset_after = None
+                    self._reset.set()
+                    break  # rest of the read is lost with the reset
+                self._feed(b)
+
+    def _drain(self):
+        while select.select([self._master], [], [], 0)[0]:
+            try:
+                os.read(self._master, 4096)
+            except OSError:
+                break
+
+    def _feed(self, b):
+        mode = self._mode
+        if mode == "raw-paste":
+            if b == 0x04:
+                self._send(b"\x04")
+                self._run_raw(bytes(self._buf), ok=b"")
+                return
+            self._buf.append(b)
+            self._credit -= 1
+            if self._credit < 0:
+                self.stats["window_overruns"] += 1
+            self._consumed += 1
+            if self._consumed >= self.window:
+                self._consumed -= self.window
+                self._credit += self.window
+                self._send(b"\x01")
+            return
+        if mode == "raw":
+            if b == 0x01:
+                if self.raw_paste and self._buf.endswith(b"\x05A"):
+                    self._mode, self._buf = "raw-paste", bytearray()
+                    self._credit, self._consumed = self.window, 0
+                    self._send(b"R\x01" + struct.pack("<H", self.window))
+                    return
+                self._buf = bytearray()
+                self._send(b"\r\n" + RAW_BANNER)
+            elif b == 0x02:
+                self._mode, self._buf = "friendly", bytearray()
+                self._send(b"\r\n" + BANNER + PROMPT)
+            elif b == 0x03:
+                self._buf = bytearray()
+            elif b == 0x04:
+                if not self._buf:  # soft reset
+                    self._globals = None
+                    self._send(b"OK\r\nMPY: soft reboot\r\n" + RAW_BANNER)
+                else:
+                    self._run_raw(bytes(self._buf), ok=b"OK")
+            else:
+                self._buf.append(b)
+            return
+        if mode == "paste":
+            if b == 0x03:
+                self._mode, self._buf = "friendly", bytearray()
+                self._send(b"\r\n" + PROMPT)
+            elif b == 0x04:
+                code, self._mode, self._buf = bytes(self._buf), "friendly", bytearray()
+                self._send(b"\r\n")
+                out, err = self._execute(code)
+                self._send(out + err + PROMPT)
+            else:
+                self._buf.append(b)
+                self._send(b"\r\n=== " if b == 0x0D else bytes([b]))
+            return
+        # friendly REPL: one line per statement
+        if b == 0x01:
+            self._mode, self._buf = "raw", bytearray()
+            self._send(b"\r\n" + RAW_BANNER)
+        elif b == 0x05:
+            self._mode, self._buf = "paste", bytearray()
+            self._send(PASTE_BANNER)
+        elif b == 0x03:
+            self._buf = bytearray()
+            self._send(b"\r\n" + PROMPT)
+        elif b == 0x04:
+            self._globals = None
+            self._send(b"\r\nMPY: soft reboot\r\n" + BANNER + PROMPT)
+        elif b == 0x0D:
+            code, self._buf = bytes(self._buf), bytearray()
+            self._send(b"\r\n")
+            out, err = self._execute(code) if code.strip() else (b"", b"")
+            self._send(out + err + PROMPT)
+        elif b != 0x0A:
+            self._buf.append(b)
+            self._send(bytes([b]))
+
+    def _run_raw(self, code, ok):
+        self._mode, self._buf = "raw", bytearray()
+        self._send(ok)
+        out, err = self._execute(code)
+        self._send(out + b"\x04" + err + b"\x04>")
+
+    # ---------- Execution ----------
+    def _execute(self, code):
+        """(stdout, stderr) of running code like the device's REPL would, CRLF line endings."""
+        self.stats["executed"] += 1
+        out = io.StringIO()
+        if self._globals is None:
+            device_os = _device_os(self.files)
+            real_import = builtins.__import__
+
+            def _import(name, *args, **kwargs):
+                if name in ("os", "uos"):
+                    return device_os
+                return real_import(name, *args, **kwargs)
+
+            env = dict(vars(builtins))
+            env.update({
+                "__import__": _import,
+                "open": lambda name, mode="r": _File(self.files, name, mode),
+                "print": lambda *a, **k: builtins.print(*a, **{**k, "file": out}),
+            })
+            self._globals = {"__name__": "__main__", "__builtins__": env}
+        self._globals["__builtins__"]["print"] = lambda *a, **k: builtins.print(*a, **{**k, "file": out})
+        err = ""
+        try:
+            source = code.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+            exec(compile(source, "<stdin>", "exec"), self._globals)
+        except SyntaxError as e:
+            err = f'Traceback (most recent call last):\n  File "<stdin>", line {e.lineno}\nSyntaxError: {e.msg}\n'
+        except BaseException as e:
+            frames = [f for f in traceback.extract_tb(e.__traceback__) if f.filename == "<stdin>"]
+            lines = ["Traceback (most recent call last):"]
+            lines += [f'  File "<stdin>", line {f.lineno}, in {f.name}' for f in frames]
+            lines.append(f"{type(e).__name__}: {e}" if str(e) else type(e).__name__)
+            err = "\n".join(lines) + "\n"
+        crlf = lambda s: s.replace("\r\n", "\n").replace("\n", "\r\n").encode("utf-8")
+        return crlf(out.getvalue()), crlf(err)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fake MicroPython device on a pseudo terminal.")
+    parser.add_argument("--baud", type=int, default=115200, help="simulated baud rate")
+    parser.add_argument("--window", type=int, default=128, help="raw-paste window size")
+    parser.add_argument("--no-raw-paste", action="store_true", help="behave like firmware without raw-paste mode")
+    args = parser.parse_args(argv)
+    with FakeDevice(args.baud, args.window, not args.no_raw_paste) as dev:
+        print(dev.path, flush=True)
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Firmware cache for hex builds
+- Each base firmware (Calliope mini 1/2 and 3) is parsed once into
+    <digest>.text   firmware hex without EOF/empty lines/CRs (strip_eof output)
+    <digest>.image  binary image: the data of all data records, contiguous runs back to back
+    <digest>.idx    record index: (address, text offset, data length, record type) per record, uint32
+  and stored content-addressed in firmware/.cache/
+- A small <pathhash>.path.json per firmware path remembers size/mtime -> digest, so later runs
+  neither read nor hash the hex again; the three files are memory-mapped
+- A build writes the mapped text plus the script records, so its cost depends on the
+  script size only, and concurrent builds share the same page-cache pages
+- derived() keeps further per-firmware artifacts next to it (e.g. the runtime part of a
+  filesystem build, micropython_fs.py), computed once and mapped afterwards
+
+Run (prints what is cached):
+    python3 firmware_cache.py firmware/calliope12-micropython.hex [firmware/calliope-v3-correct.hex]
+"""
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import sys
+import threading
+from array import array
+
+import perf_trace
+from calliope_hex import REC_DATA, script_records, strip_eof
+from examples_catalog import atomic_write
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+FIRMWARES = {
+    "c12": os.path.join(ROOT, "firmware", "calliope12-micropython.hex"),
+    "c3": os.path.join(ROOT, "firmware", "calliope-v3-correct.hex"),
+}
+DEFAULT_CACHE_DIR = os.path.join(ROOT, "firmware", ".cache")
+
+CACHE_VERSION = 2
+_FIELDS = 4  # address, text offset, data length, record type
+
+
+# ---------- Parsing ----------
+def parse_hex(text):
+    """
+    Parse stripped Intel HEX text (str) into (segments, index).
+    segments: [(start address, bytearray)] of contiguous data; index: array('I') with _FIELDS per record.
+    """
+    index = array("I")
+    segments = []
+    if not text:
+        return segments, index
+    upper = 0
+    offset = 0
+    for n, line in enumerate(text.split("\n"), 1):
+        raw = line.strip()
+        if not raw.startswith(":"):
+            raise ValueError(f"Zeile {n}: kein Intel-HEX-Record")
+        try:
+            rec = bytes.fromhex(raw[1:])
+        except ValueError:
+            raise ValueError(f"Zeile {n}: ungültige Hex-Zeichen") from None
+        if len(rec) < 5 or len(rec) != rec[0] + 5:
+            raise ValueError(f"Zeile {n}: falsche Record-Länge")
+        if sum(rec) & 0xFF:
+            raise ValueError(f"Zeile {n}: Prüfsumme falsch")
+        length, rtype, data = rec[0], rec[3], rec[4:-1]
+        addr = upper + ((rec[1] << 8) | rec[2])
+        if rtype == 0x04 and length == 2:  # extended linear address
+            upper = ((data[0] << 8) | data[1]) << 16
+        elif rtype == 0x02 and length == 2:  # extended segment address
+            upper = ((data[0] << 8) | data[1]) << 4
+        elif rtype == REC_DATA and length:
+            if segments and segments[-1][0] + len(segments[-1][1]) == addr:
+                segments[-1][1].extend(data)
+            else:
+                segments.append((addr, bytearray(data)))
+        index.extend((addr & 0xFFFFFFFF, offset, length, rtype))
+        offset += len(line) + 1
+    return _join(segments), index
+
+
+def _join(segments):
+    """Sort by address and merge adjacent runs (like MemoryMap.join in nrf-intel-hex)."""
+    joined = []
+    for start, chunk in sorted(segments, key=lambda s: s[0]):
+        if joined and joined[-1][0] + len(joined[-1][1]) == start:
+            joined[-1][1].extend(chunk)
+        elif joined and joined[-1][0] + len(joined[-1][1]) > start:
+            raise ValueError(f"überlappende Daten bei 0x{start:08X}")
+        else:
+            joined.append((start, chunk))
+    return joined
+
+
+# ---------- Cached firmware ----------
+def _map(path):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class Firmware:
+    """A parsed firmware backed by memory-mapped cache files."""
+
+    def __init__(self, path, digest, segments, text, image, index):
+        self.path = path
+        self.digest = digest
+        self.text = text      # stripped hex text (bytes-like)
+        self.image = image    # data of all segments back to back (bytes-like)
+        self.segments = segments  # [(start address, offset in image, length)], sorted by address
+        self._starts = [s[0] for s in segments]
+        self.index = index if isinstance(index, array) else memoryview(index).cast("I")
+
+    def __len__(self):
+        return len(self.index) // _FIELDS
+
+    def record(self, i):
+        """(address, text offset, data length, record type) of record i."""
+        return tuple(self.index[i * _FIELDS:(i + 1) * _FIELDS])
+
+    def read(self, addr, size, fill=0xFF):
+        """Flash contents at addr; gaps between segments read as erased (0xFF)."""
+        out = bytearray([fill]) * size
+        i = max(0, bisect.bisect_right(self._starts, addr) - 1)
+        end = addr + size
+        for start, off, length in self.segments[i:]:
+            if start >= end:
+                break
+            lo, hi = max(start, addr), min(start + length, end)
+            if lo < hi:
+                out[lo - addr:hi - addr] = self.image[off + lo - start:off + hi - start]
+        return bytes(out)
+
+    def write_v1(self, fp, python_text):
+        """Write firmware + appended script (same bytes as append_script_v1) to a binary file."""
+        tail = "\n" + "\n".join(script_records(python_text)) + "\n"
+        fp.write(self.text)
+        fp.write(tail.encode("ascii"))
+
+    def build_v1(self, python_text):
+        tail = "\n" + "\n".join(script_records(python_text)) + "\n"
+        return bytes(self.text) + tail.encode("ascii")
+
+
+class FirmwareCache:
+    """Parses each firmware once per content and maps it on later runs (thread-safe)."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._loaded = {}  # abs path -> (size, mtime_ns, Firmware)
+        self._derived = {}  # (digest, name) -> mapped bytes
+        self.parsed = 0    # firmwares parsed in this process (cache misses)
+
+    def get(self, path):
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        with self._lock:
+            hit = self._loaded.get(path)
+            if hit and hit[:2] == (st.st_size, st.st_mtime_ns):
+                return hit[2]
+            fw = self._open(path, st)
+            self._loaded[path] = (st.st_size, st.st_mtime_ns, fw)
+            return fw
+
+    def derived(self, fw, name, build):
+        """
+        Mapped bytes of an artifact computed from a firmware (e.g. the runtime part of a
+        FS build), stored as <digest>.<name>; build() -> bytes runs only on a miss.
+        """
+        key = (fw.digest, name)
+        with self._lock:
+            hit = self._derived.get(key)
+            if hit is not None:
+                return hit
+            path = os.path.join(self.cache_dir, f"{fw.digest}.{name}")
+            if not os.path.exists(path):
+                data = build()
+                os.makedirs(self.cache_dir, exist_ok=True)
+                atomic_write(path, lambda f: f.write(data), binary=True)
+            self._derived[key] = _map(path)
+            return self._derived[key]
+
+    def _files(self, digest):
+        base = os.path.join(self.cache_dir, digest)
+        return base + ".text", base + ".image", base + ".idx", base + ".json"
+
+    def _meta_path(self, path):
+        return os.path.join(self.cache_dir, hashlib.sha256(path.encode("utf-8")).hexdigest()[:16] + ".path.json")
+
+    @perf_trace.traced("firmware_open", "hex")
+    def _open(self, path, st):
+        try:
+            with open(self._meta_path(path), encoding="utf-8") as f:
+                known = json.load(f)
+            if (known["size"], known["mtime_ns"]) == (st.st_size, st.st_mtime_ns):
+                fw = self._map(path, known["digest"])
+                if fw is not None:
+                    return fw
+        except (OSError, ValueError, KeyError):
+            pass
+
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()[:16]
+        fw = self._map(path, digest)
+        if fw is None:
+            self._store(digest, data)
+            fw = self._map(path, digest)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        meta = {"path": path, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "digest": digest}
+        atomic_write(self._meta_path(path), lambda f: json.dump(meta, f))
+        return fw
+
+    @perf_trace.traced("firmware_parse", "hex")
+    def _store(self, digest, data):
+        text = strip_eof(data.decode("utf-8"))
+        segments, index = parse_hex(text)
+        self.parsed += 1
+        table, offset = [], 0
+        for start, chunk in segments:
+            table.append([start, offset, len(chunk)])
+            offset += len(chunk)
+        text_path, image_path, idx_path, info_path = self._files(digest)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        atomic_write(text_path, lambda f: f.write(text.encode("utf-8")), binary=True)
+        atomic_write(image_path, lambda f: f.writelines(chunk for _, chunk in segments), binary=True)
+        atomic_write(idx_path, lambda f: f.write(index.tobytes()), binary=True)
+        # written last: its presence marks a complete entry
+        info = {"version": CACHE_VERSION, "byteorder": sys.byteorder, "records": len(index) // _FIELDS,
+                "segments": table}
+        atomic_write(info_path, lambda f: json.dump(info, f))
+
+    def _map(self, path, digest):
+        text_path, image_path, idx_path, info_path = self._files(digest)
+        try:
+            with open(info_path, encoding="utf-8") as f:
+                info = json.load(f)
+            if info.get("version") != CACHE_VERSION or info.get("byteorder") != sys.byteorder:
+                return None
+            index = _map(idx_path)
+            if len(index) != info["records"] * _FIELDS * 4:
+                return None
+            return Firmware(path, digest, [tuple(s) for s in info["segments"]],
+                            _map(text_path), _map(image_path), index if len(index) else array("I"))
+        except (OSError, ValueError, KeyError):
+            return None
+
+
+_default = None
+
+
+def default_cache():
+    """Process-wide cache in firmware/.cache."""
+    global _default
+    if _default is None:
+        _default = FirmwareCache()
+    return _default
+
+
+def main(argv=None):
+    paths = (sys.argv[1:] if argv is None else argv) or [p for p in FIRMWARES.values() if os.path.exists(p)]
+    cache = default_cache()
+    report = []
+    for p in paths:
+        try:
+            fw = cache.get(p)
+        except (OSError, ValueError) as e:
+            report.append({"firmware": p, "error": f"{type(e).__name__}: {e}"})
+            continue
+        report.append({"firmware": p, "digest": fw.digest, "records": len(fw), "text_bytes": len(fw.text),
+                       "image_bytes": len(fw.image),
+                       "segments": [f"0x{s:08X}+{n}" for s, _, n in fw.segments]})
+    json.dump({"cache": cache.cache_dir, "parsed": cache.parsed, "firmwares": report}, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 2 if any("error" in r for r in report) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
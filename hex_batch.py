@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Batch hex builds for all micropython examples
+- Builds one hex per micropython catalog entry and target (c12 = Calliope mini 1/2,
+  c3 = Calliope mini 3, same split as calliope.hex.js)
+- Outputs are content-addressed: build/hex/<key>.hex with
+  key = sha256(target, format, firmware digest, script bytes), so unchanged entries
+  are skipped and identical scripts share one file
+- Missing outputs are built in worker processes; every worker maps the parsed
+  firmware from firmware/.cache (firmware_cache.py) instead of parsing it again
+- With --delta only the records that differ from the firmware are stored, as
+  build/hex/<key>.delta.json (hex_delta.py rebuilds the full hex on demand)
+- With --minify scripts are minified first (py_minify.py, same as the IDE does), so larger
+  programs fit the 8 KB appended-script area; the report lists the bytes saved per entry
+- Writes build/hex/report.json (entry -> hex per target, timings)
+- With --trace FILE planning and every build (firmware mapping, minify, write; also in
+  the worker processes) are recorded as a Chrome trace (perf_trace.py)
+
+Run:
+    python3 hex_batch.py [data/examples.json] [--target c12 --target c3] [--delta] [--minify] [-j N] [--trace FILE]
+
+Exit codes: 0 ok, 1 some builds failed, 2 catalog/firmware unusable.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import perf_trace
+from examples_catalog import atomic_write, normalize_entries, read_examples
+from examples_manifest import DEFAULT_CATALOG, ROOT, code_candidates
+from firmware_cache import FIRMWARES, default_cache
+from hex_delta import delta_fs, delta_v1, dump_delta
+from micropython_fs import fs_builder
+from py_minify import MINIFY_VERSION, minify_cached
+
+DEFAULT_OUT = os.path.join("build", "hex")
+DELTA_EXT = ".delta.json"
+
+# target -> output format: appended script (Calliope mini 1/2) or MicroPython filesystem (mini 3)
+FORMATS = {"c12": "v1-append", "c3": "fs"}
+
+
+def build_key(target, fw_digest, script, minify=False):
+    fmt = FORMATS[target] + (f"+min{MINIFY_VERSION}" if minify else "")
+    h = hashlib.sha256(f"{target}:{fmt}:{fw_digest}:".encode("ascii"))
+    h.update(script)
+    return h.hexdigest()[:16]
+
+
+def read_script(root, file):
+    """(path used, bytes) for the first existing code candidate, like the examples dialog."""
+    for cand in code_candidates(file):
+        try:
+            with open(os.path.join(root, cand), "rb") as f:
+                return cand, f.read()
+        except OSError:
+            continue
+    return None, None
+
+
+def write_hex(fp, fw, target, text):
+    """Write the hex for one script in the target's format to a binary file."""
+    if FORMATS[target] == "fs":
+        fs_builder(fw).write(fp, {"main.py": text})
+    else:
+        fw.write_v1(fp, text)
+
+
+def _build_job(job):
+    """Runs in a worker: build one hex (or its delta). Returns (dst, seconds, error)."""
+    target, firmware, src, dst, minify = job
+    t0 = time.perf_counter()
+    try:
+        with perf_trace.span("build", "hex", target=target, out=os.path.basename(dst)):
+            with perf_trace.span("firmware", "hex"):
+                fw = default_cache().get(firmware)
+            with open(src, "rb") as f:
+                text = f.read().decode("utf-8")
+            if minify:
+                with perf_trace.span("minify", "hex", bytes=len(text)):
+                    text = minify_cached(text)
+            with perf_trace.span("write", "io"):
+                if dst.endswith(DELTA_EXT):
+                    if FORMATS[target] == "fs":
+                        delta = delta_fs(fw, {"main.py": text})
+                    else:
+                        delta = delta_v1(fw, text)
+                    atomic_write(dst, lambda fp: dump_delta(delta, fp))
+                else:
+                    atomic_write(dst, lambda fp: write_hex(fp, fw, target, text), binary=True)
+    except (OSError, ValueError) as e:
+        return dst, time.perf_counter() - t0, f"{type(e).__name__}: {e}"
+    return dst, time.perf_counter() - t0, None
+
+
+def _traced_build_job(job):
+    """_build_job in a traced worker: also returns the worker's trace events."""
+    return _build_job(job), perf_trace.drain()
+
+
+@perf_trace.traced("plan_builds", "hex")
+def plan_builds(entries, root, out_dir, targets, firmwares, ext=".hex", minify=False):
+    """Returns (rows, jobs, errors): one row per entry, missing outputs as jobs."""
+    digests, errors = {}, []
+    for t in targets:
+        try:
+            digests[t] = default_cache().get(firmwares[t]).digest
+        except (OSError, ValueError) as e:
+            errors.append({"target": t, "firmware": firmwares[t], "error": f"{type(e).__name__}: {e}"})
+
+    rows, jobs = [], {}
+    for e in entries:
+        if e["runtime"] != "micropython":
+            continue
+        used, script = read_script(root, e["file"])
+        row = {"file": e["file"], "name": e["name"], "hex": {}}
+        rows.append(row)
+        if script is None:
+            row["error"] = "code nicht gefunden"
+            continue
+        if minify:
+            try:
+                small = minify_cached(script.decode("utf-8")).encode("utf-8")
+            except UnicodeDecodeError:
+                small = script
+            row["bytes"] = {"script": len(script), "minified": len(small), "saved": len(script) - len(small)}
+        for t, digest in digests.items():
+            rel = os.path.join(out_dir, build_key(t, digest, script, minify) + ext).replace(os.sep, "/")
+            row["hex"][t] = rel
+            dst = os.path.join(root, rel)
+            if dst not in jobs and not os.path.exists(dst):
+                jobs[dst] = (t, firmwares[t], os.path.join(root, used), dst, minify)
+    return rows, list(jobs.values()), errors
+
+
+def run_builds(jobs, max_workers=None):
+    if len(jobs) <= 1 or max_workers == 1:
+        return list(map(_build_job, jobs))
+    chunksize = max(1, len(jobs) // 64)
+    if not perf_trace.enabled():
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(_build_job, jobs, chunksize=chunksize))
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=perf_trace.worker_init) as pool:
+        results = []
+        for result, trace in pool.map(_traced_build_job, jobs, chunksize=chunksize):
+            perf_trace.merge(trace)
+            results.append(result)
+        return results
+
+
+@perf_trace.traced("build_catalog", "hex")
+def build_catalog(catalog, root=ROOT, out_dir=DEFAULT_OUT, targets=tuple(FORMATS), jobs=None, firmwares=FIRMWARES,
+                  delta=False, minify=False):
+    t0 = time.perf_counter()
+    with perf_trace.span("read_catalog", "io") as s:
+        entries = normalize_entries(read_examples(catalog))
+        s.set(entries=len(entries))
+    rows, todo, errors = plan_builds(entries, root, out_dir, targets, firmwares, DELTA_EXT if delta else ".hex",
+                                     minify)
+    t_plan = time.perf_counter() - t0
+    perf_trace.counter("hex_jobs", "hex", pending=len(todo))
+    if todo:
+        os.makedirs(os.path.join(root, out_dir), exist_ok=True)
+    with perf_trace.span("run_builds", "hex", jobs=len(todo)):
+        results = run_builds(todo, jobs)
+
+    failed = {dst: err for dst, _, err in results if err}
+    for row in rows:
+        for t, rel in list(row["hex"].items()):
+            err = failed.get(os.path.join(root, rel))
+            if err:
+                del row["hex"][t]
+                row.setdefault("errors", {})[t] = err
+    return {
+        "catalog": catalog,
+        "targets": {t: FORMATS[t] for t in targets},
+        "firmwares": {t: firmwares[t] for t in targets},
+        "stored_as": "delta" if delta else "hex",
+        "minified": minify,
+        "firmware_errors": errors,
+        "entries": rows,
+        "built": len(results) - len(failed),
+        "cached": sum(len(r["hex"]) for r in rows) - (len(results) - len(failed)),
+        "failed": len(failed) + sum(1 for r in rows if "error" in r),
+        "timings": {
+            "plan_s": round(t_plan, 4),
+            "build_cpu_s": round(sum(s for _, s, _ in results), 4),
+            "slowest_s": round(max((s for _, s, _ in results), default=0.0), 4),
+            "total_s": round(time.perf_counter() - t0, 4),
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build hex files for every micropython example (content-addressed).")
+    parser.add_argument("catalog", nargs="?", default=None, help=f"catalog (default: <root>/{DEFAULT_CATALOG})")
+    parser.add_argument("--root", default=ROOT, help="web root the catalog paths are relative to")
+    parser.add_argument("--out", default=DEFAULT_OUT, help=f"output folder below root (default {DEFAULT_OUT})")
+    parser.add_argument("--target", action="append", choices=sorted(FORMATS), help="target (repeatable, default: all)")
+    parser.add_argument("--firmware", action="append", default=[], metavar="TARGET=HEX",
+                        help="firmware for a target (default: the files in firmware/)")
+    parser.add_argument("--delta", action="store_true", help="store deltas against the firmware instead of full hex files")
+    parser.add_argument("--minify", action="store_true", help="minify scripts before embedding (py_minify.py)")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="worker processes")
+    parser.add_argument("--trace", metavar="FILE", help="record a Chrome trace of the build (perf_trace.py)")
+    args = parser.parse_args(argv)
+
+    firmwares = dict(FIRMWARES)
+    for spec in args.firmware:
+        target, sep, path = spec.partition("=")
+        if not sep or target not in FORMATS:
+            parser.error(f"--firmware erwartet TARGET=HEX mit TARGET in {', '.join(FORMATS)}")
+        firmwares[target] = path
+    catalog = args.catalog or os.path.join(args.root, DEFAULT_CATALOG)
+    if args.trace:
+        perf_trace.enable()
+    try:
+        report = build_catalog(catalog, args.root, args.out, tuple(args.target or FORMATS), args.jobs, firmwares,
+                               args.delta, args.minify)
+        path = os.path.join(args.root, args.out, "report.json")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write(path, lambda f: json.dump(report, f, ensure_ascii=False, indent=2))
+    except Exception as e:
+        json.dump({"catalog": catalog, "error": f"{type(e).__name__}: {e}"}, sys.stdout, ensure_ascii=False)
+        sys.stdout.write("\n")
+        return 2
+    summary = {k: report[k] for k in ("catalog", "targets", "firmware_errors", "built", "cached", "failed", "timings")}
+    summary["report"] = path
+    if args.trace:
+        try:
+            perf_trace.export(args.trace)
+            summary["trace"] = args.trace
+        except OSError as e:
+            summary["trace_error"] = f"{type(e).__name__}: {e}"
+    json.dump(summary, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+    if report["firmware_errors"] and len(report["firmware_errors"]) == len(report["targets"]):
+        return 2
+    return 1 if report["failed"] or report["firmware_errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
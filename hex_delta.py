@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Hex deltas against a shared base firmware
+- A built hex differs from its firmware only in a few records (the script records after
+  the 0x0003 ELA for Calliope mini 1/2). A delta stores just those records:
+
+    {"version": 1, "base": <firmware digest>, "lines": <line count of the result>,
+     "ops": [["copy", first base line, count], ["insert", [record, ...]], ...]}
+
+  Base lines are those of the stripped firmware text (firmware_cache.py), so a copy is a
+  slice of the memory-mapped text located through the record index. Filesystem builds
+  (micropython_fs.py) regenerate the runtime records, so their deltas set
+  "base_kind": "fs-runtime" and copy from that cached runtime text instead.
+- diff_hex(): minimal delta between two hex texts (common leading/trailing records kept)
+- delta_v1() / delta_fs(): deltas for appended-script and filesystem builds without diffing
+- apply_delta(): full hex again, byte-identical to the original build
+
+Run:
+    python3 hex_delta.py diff firmware/calliope12-micropython.hex main.hex -o main.delta.json
+    python3 hex_delta.py apply main.delta.json firmware/calliope12-micropython.hex -o main.hex
+"""
+import argparse
+import io
+import json
+import sys
+
+from calliope_hex import script_records
+from examples_catalog import atomic_write
+from firmware_cache import default_cache
+from micropython_fs import fs_builder
+
+DELTA_VERSION = 1
+BASE_HEX = "hex"
+BASE_FS_RUNTIME = "fs-runtime"
+
+
+def _lines(text):
+    lines = text.split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+    return lines
+
+
+def diff_lines(base, full):
+    """Ops turning the base lines into the full lines: shared head, changed middle, shared tail."""
+    head = 0
+    limit = min(len(base), len(full))
+    while head < limit and base[head] == full[head]:
+        head += 1
+    tail = 0
+    while tail < limit - head and base[-1 - tail] == full[-1 - tail]:
+        tail += 1
+    ops = []
+    if head:
+        ops.append(["copy", 0, head])
+    middle = full[head:len(full) - tail]
+    if middle:
+        ops.append(["insert", middle])
+    if tail:
+        ops.append(["copy", len(base) - tail, tail])
+    return ops
+
+
+def diff_hex(fw, full_text):
+    """Delta of a complete hex text against a cached Firmware."""
+    base = _lines(bytes(fw.text).decode("ascii"))
+    full = _lines(full_text.replace("\r", ""))
+    return {"version": DELTA_VERSION, "base": fw.digest, "lines": len(full), "ops": diff_lines(base, full)}
+
+
+def delta_v1(fw, python_text):
+    """Delta of append_script_v1(firmware, python_text): all firmware lines, then the script records."""
+    records = script_records(python_text)
+    ops = [["copy", 0, len(fw)]] if len(fw) else []
+    ops.append(["insert", records])
+    return {"version": DELTA_VERSION, "base": fw.digest, "lines": len(fw) + len(records), "ops": ops}
+
+
+def delta_fs(fw, files):
+    """Delta of a filesystem build: the cached runtime part, then the FS records."""
+    builder = fs_builder(fw)
+    runtime = builder.runtime_hex()
+    count = bytes(runtime).count(b"\n")
+    records = _lines(builder.fs_hex(files))
+    ops = [["copy", 0, count]] if count else []
+    ops.append(["insert", records])
+    return {"version": DELTA_VERSION, "base": fw.digest, "base_kind": BASE_FS_RUNTIME,
+            "lines": count + len(records), "ops": ops}
+
+
+def _base(fw, kind):
+    """(text, line start offsets) the copy ops of a delta refer to."""
+    if kind == BASE_HEX:
+        return fw.text, fw.index[1::4]  # text offset field of every record
+    if kind == BASE_FS_RUNTIME:
+        text = fs_builder(fw).runtime_hex()
+        data = bytes(text).rstrip(b"\n")
+        offsets = [0] if data else []
+        pos = data.find(b"\n")
+        while pos >= 0:
+            offsets.append(pos + 1)
+            pos = data.find(b"\n", pos + 1)
+        return data, offsets
+    raise ValueError(f"unbekannte Delta-Basis {kind!r}")
+
+
+def write_delta(fw, delta, fp):
+    """Write the full hex (binary file) described by delta; every line ends with '\\n'."""
+    if delta.get("version") != DELTA_VERSION:
+        raise ValueError(f"unbekannte Delta-Version {delta.get('version')!r}")
+    if delta["base"] != fw.digest:
+        raise ValueError(f"Delta passt nicht zur Firmware ({delta['base']} ≠ {fw.digest})")
+    text, offsets = None, None
+    for op in delta["ops"]:
+        if op[0] == "copy":
+            if text is None:
+                text, offsets = _base(fw, delta.get("base_kind", BASE_HEX))
+            start, count = op[1], op[2]
+            if start < 0 or start + count > len(offsets):
+                raise ValueError(f"copy außerhalb der Basis: {start}+{count}")
+            end = offsets[start + count] if start + count < len(offsets) else len(text) + 1
+            fp.write(text[offsets[start]:min(end, len(text))])
+            if end > len(text):
+                fp.write(b"\n")
+        elif op[0] == "insert":
+            fp.write(("\n".join(op[1]) + "\n").encode("ascii"))
+        else:
+            raise ValueError(f"unbekannte Delta-Operation {op[0]!r}")
+
+
+def apply_delta(fw, delta):
+    out = io.BytesIO()
+    write_delta(fw, delta, out)
+    return out.getvalue()
+
+
+def dump_delta(delta, fp):
+    json.dump(delta, fp, separators=(",", ":"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Store hex files as deltas against their base firmware.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("diff", help="delta of FULL against the firmware BASE")
+    p.add_argument("base")
+    p.add_argument("full")
+    p.add_argument("--output", "-o", default="-", help="delta file ('-' = stdout)")
+    p = sub.add_parser("apply", help="rebuild the full hex from a delta and its firmware")
+    p.add_argument("delta")
+    p.add_argument("base")
+    p.add_argument("--output", "-o", default="-", help="hex file ('-' = stdout)")
+    args = parser.parse_args(argv)
+
+    try:
+        fw = default_cache().get(args.base)
+        if args.command == "diff":
+            with open(args.full, encoding="utf-8", newline="") as f:
+                delta = diff_hex(fw, f.read())
+            if args.output == "-":
+                dump_delta(delta, sys.stdout)
+                sys.stdout.write("\n")
+            else:
+                atomic_write(args.output, lambda f: dump_delta(delta, f))
+        else:
+            with open(args.delta, encoding="utf-8") as f:
+                delta = json.load(f)
+            if args.output == "-":
+                write_delta(fw, delta, sys.stdout.buffer)
+            else:
+                atomic_write(args.output, lambda f: write_delta(fw, delta, f), binary=True)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Fehler: {type(e).__name__}: {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,23 +1,30 @@
 # hex_creator.py
-import os
-import subprocess
+import sys
 
-def create_hex_from_python(python_file, output_hex=None):
+from examples_catalog import atomic_write
+from firmware_cache import FIRMWARES, default_cache
+
+
+def create_hex_from_python(python_file, output_hex=None, firmware=FIRMWARES["c12"]):
     if output_hex is None:
         output_hex = python_file.replace('.py', '.hex')
-    
+
+    # Gleiche Ausgabe wie appendScriptV1 in calliope-hex-tools.js, ohne uflash;
+    # die Firmware wird nur einmal geparst (firmware/.cache) und danach gemappt
     try:
-        # Versuche uflash zu verwenden
-        result = subprocess.run(['uflash', python_file, '--output', output_hex], 
-                              capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            print(f"HEX-Datei erfolgreich erstellt: {output_hex}")
-        else:
-            print(f"Fehler: {result.stderr}")
-            
-    except FileNotFoundError:
-        print("uflash nicht gefunden. Bitte installieren: pip install uflash")
+        fw = default_cache().get(firmware)
+        with open(python_file, encoding='utf-8') as f:
+            code = f.read()
+        # atomar: ist das Skript zu groß, bleibt eine vorhandene HEX-Datei unverändert
+        atomic_write(output_hex, lambda f: fw.write_v1(f, code), binary=True)
+    except (OSError, ValueError) as e:
+        print(f"Fehler: {e}")
+        return None
+
+    print(f"HEX-Datei erfolgreich erstellt: {output_hex}")
+    return output_hex
+
 
-# Beispiel verwenden
-create_hex_from_python('main.py')
\ No newline at end of file
+if __name__ == "__main__":
+    # Beispiel verwenden
+    create_hex_from_python(sys.argv[1] if len(sys.argv) > 1 else 'main.py')
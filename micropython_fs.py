@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MicroPython filesystem packer (Calliope mini 3 and other micro:bit-style MicroPython builds)
+- Python port of the builder in microbit-fs (vendor/dist/esm/micropython-fs-builder.js):
+  finds the FS region via the UICR data (V1) or the flash regions table (V2 / Calliope mini 3),
+  writes each file as a linked list of 128-byte chunks and marks the persistent page
+- Output is the same text as MicropythonFsHex.getIntelHex() / generateHexWithFiles(),
+  including the record layout of nrf-intel-hex's asHexString()
+- Works offline on the parsed firmware from firmware_cache.py; the runtime part of the hex
+  (everything below the FS) is rendered once per firmware and cached, so a build only
+  renders the few FS records
+
+Run:
+    python3 micropython_fs.py firmware/calliope-v3-correct.hex main.py [more.py ...] [-o main.hex]
+"""
+import argparse
+import os
+import struct
+import sys
+
+from calliope_hex import APPENDED_SCRIPT_ADDR, EOF_RECORD, REC_DATA, REC_ELA, make_record
+from examples_catalog import atomic_write
+from firmware_cache import default_cache
+
+CHUNK_LEN = 128
+CHUNK_DATA_LEN = CHUNK_LEN - 2  # marker + tail
+MAX_FILENAME_LENGTH = 120
+MAX_NUMBER_OF_CHUNKS = 256 - 4  # 1-byte pointers, minus the marker values
+
+MARKER_FREED = 0x00
+MARKER_PERSISTENT = 0xFD
+MARKER_FILE_START = 0xFE
+MARKER_UNUSED = 0xFF
+
+# UICR (V1 and early V2 builds)
+UICR_UPY_START = 0x10001000 + 0x80 + 0x40
+UICR_DEVICES = {
+    0x17EEB07C: ("V1", 256 * 1024, 256 * 1024),  # magic: (device, flash size, fs end)
+    0x47EEB07C: ("V2", 512 * 1024, 0x73000),
+}
+
+# Flash regions table (V2 / Calliope mini 3), at the end of the last MicroPython page
+REGION_MAGIC_1 = 0x597F30FE
+REGION_MAGIC_2 = 0xC1B1D79D
+REGION_SCAN_PAGE = 4096
+REGION_MICROPYTHON = 2
+REGION_FS = 3
+
+RUNTIME_HEX = "fs-runtime.v1.hex"  # derived artifact name in the firmware cache
+
+
+# ---------- Intel HEX output (nrf-intel-hex MemoryMap.asHexString) ----------
+def _ela(high):
+    return make_record(0, REC_ELA, bytes(((high >> 24) & 0xFF, (high >> 16) & 0xFF)))
+
+
+def blocks_to_records(blocks, line_size=16):
+    """Records for [(address, data)] incl. EOF, with the same line breaks as asHexString()."""
+    records = []
+    high, low = -1 << 16, 0
+    for addr, data in sorted(blocks, key=lambda b: b[0]):
+        size = len(data)
+        if not size:
+            continue
+        if addr > high + 0xFFFF:
+            high, low = addr - addr % 0x10000, 0
+            records.append(_ela(high))
+        if addr < high + low:
+            raise ValueError(f"Block bei 0x{addr:08X} überlappt den vorherigen")
+        low = addr % 0x10000
+        off, end = 0, addr + size
+        while high + low < end:
+            if low > 0xFFFF:
+                high, low = high + 0x10000, 0
+                records.append(_ela(high))
+            n = min(line_size, end - high - low, 0x10000 - low)
+            records.append(make_record(low, REC_DATA, data[off:off + n]))
+            off += n
+            low += n
+    records.append(EOF_RECORD)
+    return records
+
+
+def slice_blocks(blocks, address, length=None):
+    """MemoryMap.slice(): the parts of the blocks inside [address, address + length)."""
+    end = float("inf") if length is None else address + length
+    out = []
+    for start, data in blocks:
+        lo, hi = max(address, start), min(end, start + len(data))
+        if hi > lo:
+            out.append((lo, data[lo - start:hi - start]))
+    return out
+
+
+# ---------- Device memory layout ----------
+class _Memory:
+    """Firmware image plus blocks written on top (later writes win)."""
+
+    def __init__(self, fw):
+        self.fw = fw
+        self.blocks = {}  # address -> bytes
+
+    def read(self, addr, size):
+        out = bytearray(self.fw.read(addr, size))
+        for start, data in self.blocks.items():
+            lo, hi = max(start, addr), min(start + len(data), addr + size)
+            if lo < hi:
+                out[lo - addr:hi - addr] = data[lo - start:hi - start]
+        return bytes(out)
+
+    def u8(self, addr):
+        return self.read(addr, 1)[0]
+
+    def u16(self, addr):
+        return struct.unpack("<H", self.read(addr, 2))[0]
+
+    def u32(self, addr):
+        return struct.unpack("<I", self.read(addr, 4))[0]
+
+    def all_blocks(self):
+        """Firmware segments and written blocks, as (address, bytes-like)."""
+        base = [(start, self.fw.image[off:off + n]) for start, off, n in self.fw.segments]
+        return base + list(self.blocks.items())
+
+
+def _uicr_info(mem):
+    magic = mem.u32(UICR_UPY_START)
+    if magic not in UICR_DEVICES:
+        raise ValueError("keine gültigen MicroPython-UICR-Daten")
+    device, flash_size, fs_end = UICR_DEVICES[magic]
+    page_size = 2 ** mem.u32(UICR_UPY_START + 8)
+    start = mem.u16(UICR_UPY_START + 12) * page_size
+    runtime_end = mem.u16(UICR_UPY_START + 14) * page_size
+    return {"device": device, "page_size": page_size, "flash_size": flash_size,
+            "runtime_start": start, "runtime_end": runtime_end, "fs_start": runtime_end, "fs_end": fs_end}
+
+
+def _table_end(fw):
+    """End address of the first page whose last 16 bytes hold the regions table header."""
+    pages = set()
+    for start, _, n in fw.segments:
+        pages.update(range(start // REGION_SCAN_PAGE, (start + n - 1) // REGION_SCAN_PAGE + 1))
+    for page in sorted(pages):
+        end = (page + 1) * REGION_SCAN_PAGE
+        tail = fw.read(end - 16, 16)
+        if struct.unpack("<I", tail[12:])[0] == REGION_MAGIC_2 and struct.unpack("<I", tail[:4])[0] == REGION_MAGIC_1:
+            return end
+    raise ValueError("keine Flash-Regions-Tabelle gefunden")
+
+
+def _regions_info(mem):
+    end = _table_end(mem.fw)
+    page_size = 2 ** mem.u16(end - 6)
+    count = mem.u16(end - 8)
+    table_start = end - 16
+    regions = {}
+    for i in range(count):
+        row = table_start - i * 16
+        regions[mem.u8(row - 16)] = (mem.u16(row - 14), mem.u32(row - 12))  # start page, length
+    if REGION_MICROPYTHON not in regions:
+        raise ValueError("keine MicroPython-Region in der Regions-Tabelle")
+    if REGION_FS not in regions:
+        raise ValueError("keine Dateisystem-Region in der Regions-Tabelle")
+    fs_page, fs_len = regions[REGION_FS]
+    return {"device": "V2", "page_size": page_size, "flash_size": 512 * 1024,
+            "runtime_start": 0, "runtime_end": end,
+            "fs_start": fs_page * page_size, "fs_end": fs_page * page_size + fs_len}
+
+
+def device_mem_info(mem):
+    """Memory layout from the UICR data, otherwise from the flash regions table."""
+    try:
+        return _uicr_info(mem)
+    except ValueError as e:
+        first = e
+    try:
+        return _regions_info(mem)
+    except ValueError as e:
+        raise ValueError(f"{first}; {e}") from None
+
+
+# ---------- Filesystem ----------
+def fs_file_bytes(name, data):
+    """Header (end offset, name length, name) + data + 0xFF, as stored in the chunks."""
+    name_bytes = name.encode("utf-8")
+    if not name:
+        raise ValueError("Datei braucht einen Namen")
+    if len(name_bytes) > MAX_FILENAME_LENGTH:
+        raise ValueError(f'Dateiname "{name}" ist zu lang (max. {MAX_FILENAME_LENGTH} Zeichen)')
+    if not data:
+        raise ValueError(f"Datei {name} ist leer")
+    header_size = 2 + len(name_bytes)
+    end_offset = (header_size + len(data)) % CHUNK_DATA_LEN
+    return bytes((end_offset, len(name_bytes))) + name_bytes + data + b"\xff"
+
+
+def fs_file_size(name, data):
+    """Flash bytes the file occupies (calculateFileSize)."""
+    n = len(fs_file_bytes(name, data))
+    return -(-n // CHUNK_DATA_LEN) * CHUNK_LEN
+
+
+class MicropythonFs:
+    """Builds hex files with files in the MicroPython filesystem of one firmware."""
+
+    def __init__(self, fw, cache=None):
+        self.fw = fw
+        self.cache = cache or default_cache()
+        self.info = device_mem_info(_Memory(fw))
+        page = self.info["page_size"]
+        end = self.info["fs_end"]
+        if self.info["device"] == "V1":
+            if fw.read(APPENDED_SCRIPT_ADDR, 2) == b"MP":
+                end = APPENDED_SCRIPT_ADDR
+            end -= page  # magnetometer calibration page
+        start = max(self.info["fs_start"], end - CHUNK_LEN * MAX_NUMBER_OF_CHUNKS)
+        if start % page:
+            raise ValueError("Dateisystem-Start passt nicht zur Flash-Seitengröße")
+        self.start = start
+        self.end = end
+        self.last_page = end - page  # persistent page
+        self.size = end - start - page
+        if self.files(_Memory(fw)):
+            raise ValueError("Die Firmware enthält schon Dateien im Dateisystem")
+
+    # --- runtime part, rendered once per firmware ---
+    def runtime_hex(self):
+        """Hex text (bytes) of the runtime region without EOF, as in createMpFsBuilderCache()."""
+        def build():
+            base = [(s, self.fw.image[o:o + n]) for s, o, n in self.fw.segments]
+            lo, hi = self.info["runtime_start"], self.info["runtime_end"]
+            records = blocks_to_records(slice_blocks(base, lo, hi - lo))[:-1]
+            return ("\n".join(records) + "\n").encode("ascii") if records else b""
+        return self.cache.derived(self.fw, RUNTIME_HEX, build)
+
+    # --- chunks ---
+    def _chunk_addr(self, index):
+        return self.start + (index - 1) * CHUNK_LEN
+
+    def _free_chunks(self, mem):
+        free = []
+        addr, index = self.start, 1
+        while addr < self.last_page:
+            if mem.u8(addr) in (MARKER_UNUSED, MARKER_FREED):
+                free.append(index)
+            index += 1
+            addr += CHUNK_LEN
+        return free
+
+    def _add_file(self, mem, name, data):
+        free = self._free_chunks(mem)
+        if not free:
+            raise ValueError("Kein Speicherplatz mehr im Dateisystem")
+        payload = fs_file_bytes(name, data)
+        chunks = []
+        for n, pos in enumerate(range(0, len(payload), CHUNK_DATA_LEN)):
+            if n >= len(free):
+                raise ValueError(f"Nicht genug Platz für die Datei {name}")
+            chunk = bytearray(b"\xff" * CHUNK_LEN)
+            chunk[0] = MARKER_FILE_START if n == 0 else free[n - 1]
+            part = payload[pos:pos + CHUNK_DATA_LEN]
+            chunk[1:1 + len(part)] = part
+            if n:
+                chunks[-1][CHUNK_LEN - 1] = free[n]
+            chunks.append(chunk)
+        mem.blocks[self._chunk_addr(free[0])] = b"".join(chunks)
+        mem.blocks[self.last_page] = bytes((MARKER_PERSISTENT,))
+
+    def files(self, mem=None):
+        """{name: bytes} of the files in the filesystem (getIntelHexFiles)."""
+        mem = mem or _Memory(self.fw)
+        used, starts = {}, []
+        addr, index = self.start, 1
+        while addr < self.last_page:
+            chunk = mem.read(addr, CHUNK_LEN)
+            if chunk[0] not in (MARKER_UNUSED, MARKER_FREED, MARKER_PERSISTENT):
+                used[index] = chunk
+                if chunk[0] == MARKER_FILE_START:
+                    starts.append(index)
+            index += 1
+            addr += CHUNK_LEN
+        files = {}
+        for first in starts:
+            chunk = used[first]
+            end_offset, name_len = chunk[1], chunk[2]
+            data_start = 3 + name_len
+            name = chunk[3:data_start].decode("utf-8", "replace")
+            if name in files:
+                raise ValueError(f"Mehrere Dateien mit dem Namen {name}")
+            data, current = bytearray(), first
+            for _ in range(len(used) + 1):
+                nxt = chunk[CHUNK_LEN - 1]
+                if nxt == MARKER_UNUSED:
+                    data += chunk[data_start:1 + end_offset]
+                    break
+                data += chunk[data_start:CHUNK_LEN - 1]
+                if nxt not in used:
+                    raise ValueError(f"Chunk {current} zeigt auf unbenutzten Chunk {nxt}")
+                if used[nxt][0] != current:
+                    raise ValueError(f"Chunk {nxt} zeigt nicht zurück auf Chunk {current}")
+                chunk, current, data_start = used[nxt], nxt, 1
+            else:
+                raise ValueError("Dateisystem-Chunks sind nicht korrekt verkettet")
+            files[name] = bytes(data)
+        return files
+
+    # --- build ---
+    def _encode(self, files):
+        encoded = {n: (d.encode("utf-8") if isinstance(d, str) else bytes(d)) for n, d in files.items()}
+        if sum(fs_file_size(n, d) for n, d in encoded.items()) > self.size:
+            raise ValueError("Kein Speicherplatz mehr im Dateisystem")
+        return encoded
+
+    def fs_hex(self, files):
+        """Hex text (str) of everything above the runtime incl. the files, EOF and final newline."""
+        mem = _Memory(self.fw)
+        for name, data in self._encode(files).items():
+            self._add_file(mem, name, data)
+        return "\n".join(blocks_to_records(slice_blocks(mem.all_blocks(), self.info["runtime_end"]))) + "\n"
+
+    def write(self, fp, files):
+        """Write the complete hex (binary file): cached runtime part + FS part."""
+        tail = self.fs_hex(files).encode("ascii")
+        fp.write(self.runtime_hex())
+        fp.write(tail)
+
+    def build(self, files):
+        return bytes(self.runtime_hex()) + self.fs_hex(files).encode("ascii")
+
+
+_builders = {}
+
+
+def fs_builder(fw):
+    """MicropythonFs per firmware digest (the layout scan runs once per process)."""
+    if fw.digest not in _builders:
+        _builders[fw.digest] = MicropythonFs(fw)
+    return _builders[fw.digest]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write Python files into the MicroPython filesystem of a firmware hex.")
+    parser.add_argument("firmware", help="MicroPython firmware (.hex), e.g. Calliope mini 3")
+    parser.add_argument("files", nargs="+", help="files to add; the first one is stored as main.py")
+    parser.add_argument("--output", "-o", default="-", help="output file ('-' = stdout)")
+    args = parser.parse_args(argv)
+
+    try:
+        builder = fs_builder(default_cache().get(args.firmware))
+        files = {}
+        for i, path in enumerate(args.files):
+            with open(path, "rb") as f:
+                files["main.py" if i == 0 else os.path.basename(path)] = f.read()
+        if args.output == "-":
+            builder.write(sys.stdout.buffer, files)
+        else:
+            atomic_write(args.output, lambda f: builder.write(f, files), binary=True)
+    except (OSError, ValueError) as e:
+        print(f"Fehler: {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
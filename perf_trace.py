@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lightweight timing instrumentation (spans and counters)
+- @traced decorator and span() context manager record how long a call took, on which
+  thread; complete(name, start) for work that starts and ends in different callbacks
+  (the editor's background load)
+- counter(name, key=value, …) records counter samples (entries loaded, jobs pending)
+- Off by default: a traced function then costs one flag check, span() returns a shared
+  no-op object
+- export(path) writes Chrome trace-event JSON, to be opened in Perfetto
+  (https://ui.perfetto.dev) or chrome://tracing
+- Worker processes: worker_init() as pool initializer, drain() at the end of a job,
+  merge() the result in the parent; the timestamps share one monotonic clock
+- Enabled by the environment variable CALLIOPE_TRACE=<file.json>; the main process
+  writes the trace there on exit
+
+Run:
+    CALLIOPE_TRACE=build/editor-trace.json python3 examples_json_editor.py
+    python3 hex_batch.py --trace build/hex-trace.json
+"""
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+ENV_VAR = "CALLIOPE_TRACE"
+MAX_EVENTS = 1000000  # further events are counted as dropped, so tracing cannot exhaust memory
+
+_now = time.perf_counter_ns
+
+
+class Tracer:
+    """Collects complete-span and counter events (Chrome trace-event phases X and C)."""
+
+    def __init__(self):
+        self.enabled = False
+        self.dropped = 0
+        self._events = []   # (phase, name, cat, ts_ns, dur_ns, pid, tid, args)
+        self._threads = {}  # (pid, tid) -> thread name
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        self._events = []
+        self._threads = {}
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self._events)
+
+    # ---------- Recording ----------
+    def complete(self, name, start_ns, end_ns=None, cat="app", args=None):
+        """Record a span that started at start_ns (now()) and ends now (or at end_ns)."""
+        if end_ns is None:
+            end_ns = _now()
+        self._emit("X", name, cat, start_ns, end_ns - start_ns, args)
+
+    def counter(self, name, cat="app", **values):
+        self._emit("C", name, cat, _now(), 0, values)
+
+    def _emit(self, phase, name, cat, ts, dur, args):
+        if len(self._events) >= MAX_EVENTS:
+            self.dropped += 1
+            return
+        pid, tid = os.getpid(), threading.get_native_id()
+        if (pid, tid) not in self._threads:
+            self._threads[(pid, tid)] = threading.current_thread().name
+        self._events.append((phase, name, cat, ts, dur, pid, tid, args))
+
+    # ---------- Worker processes ----------
+    def drain(self):
+        """Events and thread names recorded so far (picklable), removed from this tracer."""
+        data = {"events": self._events, "threads": list(self._threads.items()), "dropped": self.dropped}
+        self.clear()
+        return data
+
+    def merge(self, data):
+        """Add the events drain() returned in another process."""
+        if not data:
+            return
+        room = max(MAX_EVENTS - len(self._events), 0)
+        self._events.extend(data["events"][:room])
+        self.dropped += data["dropped"] + max(len(data["events"]) - room, 0)
+        for key, name in data["threads"]:
+            self._threads.setdefault(tuple(key), name)
+
+    # ---------- Export ----------
+    def to_chrome(self):
+        """Trace as a Chrome trace-event JSON object (timestamps in µs)."""
+        events = []
+        for pid, tid in sorted(self._threads):
+            events.append({"ph": "M", "name": "thread_name", "pid": pid, "tid": tid,
+                           "args": {"name": self._threads[(pid, tid)]}})
+        for phase, name, cat, ts, dur, pid, tid, args in self._events:
+            event = {"ph": phase, "name": name, "cat": cat, "ts": ts / 1000, "pid": pid, "tid": tid}
+            if phase == "X":
+                event["dur"] = dur / 1000
+            if args:
+                event["args"] = args
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms",
+                "otherData": {"clock": "perf_counter", "dropped": self.dropped}}
+
+    def export(self, path):
+        """Write the trace to path (atomically). Returns the number of recorded events."""
+        from examples_catalog import atomic_write  # examples_catalog imports this module
+
+        data = self.to_chrome()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        atomic_write(path, lambda f: json.dump(data, f, ensure_ascii=False, separators=(",", ":"), default=str))
+        return len(self._events)
+
+
+TRACER = Tracer()
+
+
+class _Span:
+    __slots__ = ("name", "cat", "args", "start")
+
+    def __init__(self, name, cat, args):
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = _now()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        TRACER.complete(self.name, self.start, cat=self.cat, args=self.args)
+        return False
+
+    def set(self, **args):
+        """Attach values known only at the end of the span (counts, sizes)."""
+        self.args.update(args)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+# ---------- Module API ----------
+def enabled():
+    return TRACER.enabled
+
+
+def now():
+    """Start timestamp for complete() (ns, monotonic, comparable across processes)."""
+    return _now()
+
+
+def span(name, cat="app", **args):
+    """Context manager timing its block: `with span("save", entries=n) as s: …; s.set(bytes=…)`."""
+    if not TRACER.enabled:
+        return _NULL_SPAN
+    return _Span(name, cat, args)
+
+
+def traced(name=None, cat="app"):
+    """Decorator recording every call of the function as a span (named after the function)."""
+
+    def decorate(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not TRACER.enabled:
+                return func(*args, **kwargs)
+            start = _now()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                TRACER.complete(label, start, cat=cat)
+
+        return wrapper
+
+    return decorate
+
+
+def complete(name, start_ns, cat="app", **args):
+    if TRACER.enabled:
+        TRACER.complete(name, start_ns, cat=cat, args=args)
+
+
+def counter(name, cat="app", **values):
+    if TRACER.enabled:
+        TRACER.counter(name, cat, **values)
+
+
+def enable():
+    TRACER.enable()
+
+
+def disable():
+    TRACER.disable()
+
+
+def worker_init():
+    """ProcessPoolExecutor initializer: trace in the worker, starting empty (a forked
+    worker would otherwise inherit, and later drain, the parent's events)."""
+    TRACER.clear()
+    TRACER.enable()
+
+
+def drain():
+    return TRACER.drain() if TRACER.enabled else None
+
+
+def merge(data):
+    TRACER.merge(data)
+
+
+def export(path):
+    return TRACER.export(path)
+
+
+def _export_at_exit(path):
+    try:
+        n = TRACER.export(path)
+        print(f"Zeitmessung: {n} Ereignisse in {path}", file=sys.stderr)
+    except OSError as e:
+        print(f"Zeitmessung konnte nicht geschrieben werden: {e}", file=sys.stderr)
+
+
+if os.environ.get(ENV_VAR):
+    import multiprocessing  # only here: importing it costs ~10 ms of start-up time
+
+    TRACER.enable()
+    # worker processes inherit the variable; only the main process writes the file
+    if multiprocessing.parent_process() is None:
+        atexit.register(_export_at_exit, os.environ[ENV_VAR])
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Minimal PNG support without third-party packages
+- read_png(): non-interlaced PNGs, all colour types, bit depth 1-16 -> 8-bit RGBA
+- write_png(): 8-bit RGBA (or RGB when fully opaque)
+- downscale(): area-average (box) filter with alpha weighting
+- png_size(): width/height from the IHDR chunk without decoding
+
+Used by the thumbnail and preview build stages when Pillow is not installed.
+"""
+import struct
+import zlib
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# channels per colour type
+_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+
+def png_size(data):
+    """(width, height) of PNG bytes; only the first 24 bytes are needed."""
+    if data[:8] != PNG_SIGNATURE or data[12:16] != b"IHDR":
+        raise ValueError("keine PNG-Datei")
+    return struct.unpack(">II", data[16:24])
+
+
+def _chunks(data):
+    pos = 8
+    while pos + 8 <= len(data):
+        length, ctype = struct.unpack(">I4s", data[pos:pos + 8])
+        yield ctype, data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+
+
+def _unfilter(raw, height, stride, bpp):
+    out = bytearray(height * stride)
+    prev = bytearray(stride)
+    pos = 0
+    for y in range(height):
+        ftype = raw[pos]
+        line = bytearray(raw[pos + 1:pos + 1 + stride])
+        pos += 1 + stride
+        if ftype == 1:  # Sub
+            for i in range(bpp, stride):
+                line[i] = (line[i] + line[i - bpp]) & 0xFF
+        elif ftype == 2:  # Up
+            line = bytearray((a + b) & 0xFF for a, b in zip(line, prev))
+        elif ftype == 3:  # Average
+            for i in range(stride):
+                left = line[i - bpp] if i >= bpp else 0
+                line[i] = (line[i] + ((left + prev[i]) >> 1)) & 0xFF
+        elif ftype == 4:  # Paeth
+            for i in range(stride):
+                a = line[i - bpp] if i >= bpp else 0
+                b = prev[i]
+                c = prev[i - bpp] if i >= bpp else 0
+                p = a + b - c
+                pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+                if pa <= pb and pa <= pc:
+                    pred = a
+                elif pb <= pc:
+                    pred = b
+                else:
+                    pred = c
+                line[i] = (line[i] + pred) & 0xFF
+        elif ftype != 0:
+            raise ValueError(f"unbekannter PNG-Filter {ftype}")
+        out[y * stride:(y + 1) * stride] = line
+        prev = line
+    return out
+
+
+def _samples(row, width, channels, depth):
+    """8-bit samples of one unfiltered scanline."""
+    if depth == 8:
+        return row[:width * channels]
+    if depth == 16:
+        return row[0:width * channels * 2:2]
+    per_byte = 8 // depth
+    mask = (1 << depth) - 1
+    out = bytearray(width * channels)
+    for i in range(width * channels):
+        shift = 8 - depth * (i % per_byte + 1)
+        out[i] = (row[i // per_byte] >> shift) & mask
+    return out
+
+
+def read_png(data):
+    """Decode PNG bytes into (width, height, RGBA bytearray)."""
+    width, height = png_size(data)
+    depth, ctype, _, _, interlace = data[24:29]
+    if interlace:
+        raise ValueError("Interlaced PNG wird nicht unterstützt")
+    channels = _CHANNELS[ctype]
+    idat, palette, trns = [], None, None
+    for name, body in _chunks(data):
+        if name == b"IDAT":
+            idat.append(body)
+        elif name == b"PLTE":
+            palette = body
+        elif name == b"tRNS":
+            trns = body
+        elif name == b"IEND":
+            break
+    stride = (width * channels * depth + 7) // 8
+    bpp = max(1, channels * depth // 8)
+    pixels = _unfilter(zlib.decompress(b"".join(idat)), height, stride, bpp)
+
+    rgba = bytearray(width * height * 4)
+    scale = 255 // ((1 << depth) - 1) if depth < 8 else 1
+    if ctype == 3:
+        pal = [tuple(palette[i:i + 3]) + (255,) for i in range(0, len(palette), 3)]
+        for i, a in enumerate(trns or b""):
+            pal[i] = pal[i][:3] + (a,)
+        lut = [bytes(p) for p in pal]
+    for y in range(height):
+        s = _samples(pixels[y * stride:(y + 1) * stride], width, channels, depth)
+        o = y * width * 4
+        if ctype == 6:
+            rgba[o:o + width * 4] = s
+        elif ctype == 2:
+            line = rgba[o:o + width * 4]
+            line[0::4], line[1::4], line[2::4] = s[0::3], s[1::3], s[2::3]
+            line[3::4] = b"\xff" * width
+            rgba[o:o + width * 4] = line
+        elif ctype == 3:
+            rgba[o:o + width * 4] = b"".join(lut[v] for v in s)
+        else:  # grey (+ alpha)
+            g = s[0::channels] if scale == 1 else bytes(v * scale for v in s[0::channels])
+            line = rgba[o:o + width * 4]
+            line[0::4] = line[1::4] = line[2::4] = g
+            line[3::4] = s[1::2] if ctype == 4 else b"\xff" * width
+            rgba[o:o + width * 4] = line
+    if trns and ctype in (0, 2):
+        # single transparent colour (16-bit values, compare against the 8-bit reduction)
+        key = bytes(v // 257 if depth == 16 else v * scale for v in struct.unpack(f">{len(trns) // 2}H", trns))
+        key = key * 3 if ctype == 0 else key
+        for i in range(0, len(rgba), 4):
+            if rgba[i:i + 3] == key:
+                rgba[i + 3] = 0
+    return width, height, rgba
+
+
+def _chunk(ctype, body):
+    return struct.pack(">I", len(body)) + ctype + body + struct.pack(">I", zlib.crc32(ctype + body) & 0xFFFFFFFF)
+
+
+def encode_png(width, height, rgba, level=9):
+    """PNG bytes for RGBA pixels; drops the alpha channel if everything is opaque."""
+    opaque = rgba[3::4] == b"\xff" * (width * height)
+    if opaque:
+        rgb = bytearray(width * height * 3)
+        rgb[0::3], rgb[1::3], rgb[2::3] = rgba[0::4], rgba[1::4], rgba[2::4]
+        pixels, ctype, stride = rgb, 2, width * 3
+    else:
+        pixels, ctype, stride = rgba, 6, width * 4
+    raw = bytearray()
+    for y in range(height):
+        raw.append(0)
+        raw += pixels[y * stride:(y + 1) * stride]
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, ctype, 0, 0, 0)
+    return (PNG_SIGNATURE + _chunk(b"IHDR", ihdr) + _chunk(b"IDAT", zlib.compress(bytes(raw), level))
+            + _chunk(b"IEND", b""))
+
+
+def write_png(fp, width, height, rgba):
+    fp.write(encode_png(width, height, rgba))
+
+
+def fit_size(width, height, max_w, max_h):
+    """Size that fits into max_w x max_h keeping the aspect ratio (never upscales)."""
+    f = min(max_w / width, max_h / height, 1.0)
+    return max(1, round(width * f)), max(1, round(height * f))
+
+
+def downscale(width, height, rgba, new_w, new_h):
+    """Area-average downscale; colours are weighted by alpha to avoid dark fringes."""
+    xs = [min(width - 1, x * width // new_w) for x in range(new_w + 1)]
+    xs[-1] = width
+    ys = [y * height // new_h for y in range(new_h + 1)]
+    ys[-1] = height
+    out = bytearray(new_w * new_h * 4)
+    for oy in range(new_h):
+        y0, y1 = ys[oy], max(ys[oy + 1], ys[oy] + 1)
+        # premultiplied column sums over the source rows of this output row
+        cr, cg, cb, ca = [0] * width, [0] * width, [0] * width, [0] * width
+        for y in range(y0, y1):
+            row = rgba[y * width * 4:(y + 1) * width * 4]
+            for x, (r, g, b, a) in enumerate(zip(row[0::4], row[1::4], row[2::4], row[3::4])):
+                cr[x] += r * a
+                cg[x] += g * a
+                cb[x] += b * a
+                ca[x] += a
+        rows = y1 - y0
+        o = oy * new_w * 4
+        for ox in range(new_w):
+            x0, x1 = xs[ox], max(xs[ox + 1], xs[ox] + 1)
+            sa = sum(ca[x0:x1])
+            if sa:
+                out[o] = sum(cr[x0:x1]) // sa
+                out[o + 1] = sum(cg[x0:x1]) // sa
+                out[o + 2] = sum(cb[x0:x1]) // sa
+                out[o + 3] = sa // ((x1 - x0) * rows)
+            o += 4
+    return out
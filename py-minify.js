@@ -0,0 +1,186 @@
+// py-minify.js – Python-Minifier für Übertragungen aufs Gerät (HEX + Paste-Modus)
+// Gleiche Ausgabe wie minify() in py_minify.py:
+//   - Kommentare und Docstrings entfernen, Einrückung auf 1 Leerzeichen je Ebene,
+//     Leerzeichen zwischen Tokens nur wo Python sie braucht; String-Literale bleiben unverändert
+//   - keepLines (Standard): jede Anweisung bleibt auf ihrer Zeile → Zeilennummern in
+//     MicroPython-Fehlermeldungen passen weiter zum Editor
+// Export: window.pyMinify = { minify, minifyCached }
+(function () {
+  'use strict';
+
+  const OPERATORS = [
+    '**=', '//=', '>>=', '<<=', '...', '!=', '%=', '&=', '**', '*=', '+=', '-=', '->', '//', '/=', ':=',
+    '<<', '<=', '==', '>=', '>>', '@=', '^=', '|=',
+    '%', '&', '(', ')', '*', '+', ',', '-', '.', '/', ':', ';', '<', '=', '>', '@', '[', ']', '^', '{', '|', '}', '~',
+  ];
+  const OPEN = '([{', CLOSE = ')]}';
+  const BLOCK_KEYWORDS = ['def', 'class', 'async'];
+
+  // wie die Regex in Pythons tokenize.py
+  const D = '[0-9](?:_?[0-9])*';
+  const EXP = '[eE][-+]?' + D;
+  const POINTFLOAT = '(?:' + D + '\\.(?:' + D + ')?|\\.' + D + ')(?:' + EXP + ')?';
+  const FLOAT = '(?:' + POINTFLOAT + '|' + D + EXP + ')';
+  const INT = '(?:0[xX](?:_?[0-9a-fA-F])+|0[bB](?:_?[01])+|0[oO](?:_?[0-7])+|(?:0(?:_?0)*|[1-9](?:_?[0-9])*))';
+  const NUMBER = new RegExp('(?:' + D + '[jJ]|' + FLOAT + '[jJ]|' + FLOAT + '|' + INT + ')', 'y');
+  // Bezeichner-Zeichen wie in Python (XID_Continue): Buchstaben, Buchstabenziffern, Marken, Ziffern, Verbinder
+  const NAME = /[\p{L}\p{Nl}\p{Mn}\p{Mc}\p{Nd}\p{Pc}]+/uy;
+  const STRING_START = /(?:[rR][bBfF]|[bBfF][rR]|[rRbBuUfF])?('''|"""|'|")/y;
+  const WORD_END = /[\p{L}\p{Nl}\p{Mn}\p{Mc}\p{Nd}\p{Pc}]$/u, WORD_START = /^[\p{L}\p{Nl}\p{Mn}\p{Mc}\p{Nd}\p{Pc}]/u;
+
+  function fail(row, msg) { throw new Error(`Zeile ${row}: ${msg}`); }
+
+  // [{ depth, tokens: [{ kind, text, start, end, brackets }] }] je Anweisung
+  function logicalLines(src) {
+    const lines = [];
+    const indents = [0];
+    let tokens = [];
+    let pos = 0, row = 1, brackets = 0, lineStart = true;
+
+    while (pos < src.length) {
+      if (lineStart && brackets === 0) {
+        lineStart = false;
+        let col = 0, p = pos;
+        for (; p < src.length; p++) {
+          const c = src[p];
+          if (c === ' ') col++;
+          else if (c === '\t') col = (Math.floor(col / 8) + 1) * 8;
+          else if (c === '\f') col = 0;
+          else break;
+        }
+        pos = p;
+        if (p >= src.length) break;
+        if (src[p] === '#' || src[p] === '\n') {   // Leer- oder Kommentarzeile
+          const nl = src.indexOf('\n', p);
+          if (nl < 0) break;
+          pos = nl + 1; row++; lineStart = true;
+          continue;
+        }
+        if (col > indents[indents.length - 1]) indents.push(col);
+        while (col < indents[indents.length - 1]) indents.pop();
+        if (col !== indents[indents.length - 1]) fail(row, 'Einrückung passt zu keiner äußeren Ebene');
+      }
+
+      const c = src[pos];
+      if (c === ' ' || c === '\t' || c === '\f') { pos++; continue; }
+      if (c === '#') {
+        const nl = src.indexOf('\n', pos);
+        pos = nl < 0 ? src.length : nl;
+        continue;
+      }
+      if (c === '\\' && src[pos + 1] === '\n') { pos += 2; row++; continue; }
+      if (c === '\n') {
+        pos++;
+        if (brackets === 0) {
+          if (tokens.length) lines.push({ depth: indents.length - 1, tokens });
+          tokens = [];
+          lineStart = true;
+        }
+        row++;
+        continue;
+      }
+
+      const start = row;
+      let kind, text;
+      STRING_START.lastIndex = pos;
+      NUMBER.lastIndex = pos;
+      NAME.lastIndex = pos;
+      let m;
+      if ((m = STRING_START.exec(src))) {
+        const quote = m[1];
+        let p = pos + m[0].length;
+        for (;;) {
+          if (p >= src.length) fail(start, 'String nicht abgeschlossen');
+          const ch = src[p];
+          if (ch === '\\') {
+            if (src[p + 1] === '\n') row++;
+            p += 2;
+          } else if (src.startsWith(quote, p)) {
+            p += quote.length;
+            break;
+          } else if (ch === '\n') {
+            if (quote.length === 1) fail(start, 'String nicht abgeschlossen');
+            row++; p++;
+          } else p++;
+        }
+        kind = 'string'; text = src.slice(pos, p);
+      } else if ((m = NUMBER.exec(src))) {
+        kind = 'number'; text = m[0];
+      } else if ((m = NAME.exec(src))) {
+        kind = 'name'; text = m[0];
+      } else {
+        text = OPERATORS.find(op => src.startsWith(op, pos));
+        if (!text) fail(row, `unerwartetes Zeichen ${JSON.stringify(c)}`);
+        kind = 'op';
+      }
+      pos += text.length;
+      if (kind === 'op' && CLOSE.includes(text)) brackets--;
+      tokens.push({ kind, text, start, end: row, brackets });
+      if (kind === 'op' && OPEN.includes(text)) brackets++;
+    }
+    if (brackets > 0) fail(row, 'Klammer nicht geschlossen');
+    if (tokens.length) lines.push({ depth: indents.length - 1, tokens });
+    return lines;
+  }
+
+  function isDocstring(tokens) {
+    return tokens.every(t => t.kind === 'string' && !/f/i.test(t.text.split(/['"]/)[0]));
+  }
+
+  function opensDocBlock(tokens) {
+    return BLOCK_KEYWORDS.includes(tokens[0].text) && tokens[tokens.length - 1].text === ':';
+  }
+
+  function minify(source, { keepLines = true } = {}) {
+    const lines = logicalLines(String(source).replace(/\r\n?/g, '\n'));
+    const out = [];
+    let row = 1;
+    let docAllowed = true;   // Modul-Docstring
+    lines.forEach((line, n) => {
+      let tokens = line.tokens;
+      if (docAllowed && isDocstring(tokens)) {
+        const following = n + 1 < lines.length ? lines[n + 1].depth : -1;
+        if (following >= line.depth || line.depth === 0) { docAllowed = false; return; }
+        tokens = [{ kind: 'name', text: 'pass', start: tokens[0].start, end: tokens[0].start, brackets: 0 }];
+      }
+      docAllowed = opensDocBlock(tokens);
+
+      const first = tokens[0].start;
+      if (keepLines) out.push('\n'.repeat(Math.max(first - row, out.length ? 1 : 0)));
+      else if (out.length) out.push('\n');
+      row = first;
+      out.push(' '.repeat(line.depth));
+      let prev = null;
+      for (const t of tokens) {
+        if (keepLines && t.start > row) {
+          out.push((t.brackets ? '\n' : '\\\n').repeat(t.start - row));
+        } else if (prev && ((WORD_END.test(prev.text) && WORD_START.test(t.text))
+                            || (prev.kind === 'number' && t.text[0] === '.'))) {
+          out.push(' ');
+        }
+        out.push(t.text);
+        row = t.end;
+        prev = t;
+      }
+    });
+    if (out.length) out.push('\n');
+    return out.join('');
+  }
+
+  // Ergebnisse je Quelltext merken (Editor-Inhalt wird oft mehrfach übertragen)
+  const cache = new Map();
+  const CACHE_MAX = 16;
+
+  // Wie minify(), aber gecacht; nicht lesbarer Code geht unverändert raus (das Gerät meldet den Fehler)
+  function minifyCached(source, opts = {}) {
+    const key = (opts.keepLines === false ? '0:' : '1:') + source;
+    if (cache.has(key)) return cache.get(key);
+    let text;
+    try { text = minify(source, opts); } catch { text = String(source); }
+    if (cache.size >= CACHE_MAX) cache.delete(cache.keys().next().value);
+    cache.set(key, text);
+    return text;
+  }
+
+  window.pyMinify = { minify, minifyCached };
+})();
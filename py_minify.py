@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Python minifier for device transfers (hex builds and paste mode)
+- Token based (tokenize): drops comments, docstrings and blank-line indentation,
+  indents with one space per level and removes spaces between tokens where Python
+  does not need them; string literals are copied unchanged
+- By default every statement stays on its source line (removed lines become empty),
+  so line numbers in MicroPython tracebacks still match the editor
+- Same output as minify() in py-minify.js
+- Results are cached by content hash in build/minify/
+
+Run:
+    python3 py_minify.py file main.py [-o main.min.py] [--join-lines]
+    python3 py_minify.py report [data/examples.json] [--root .]   (bytes saved per example)
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+import threading
+import tokenize
+import unicodedata
+
+from calliope_hex import MAX_SCRIPT_BYTES
+from examples_catalog import atomic_write, normalize_entries, read_examples
+from examples_manifest import DEFAULT_CATALOG, ROOT, code_candidates
+
+MINIFY_VERSION = 2  # 2: identifier characters per Unicode category (XID)
+DEFAULT_CACHE_DIR = os.path.join(ROOT, "build", "minify")
+
+_SKIP = {tokenize.COMMENT, tokenize.NL, tokenize.ENCODING, tokenize.ENDMARKER}
+_OPEN, _CLOSE = "([{", ")]}"
+_BLOCK_KEYWORDS = ("def", "class", "async")
+# characters that continue an identifier (XID_Continue: letters, letter numbers, marks, digits, connectors)
+_WORD = frozenset(("Lu", "Ll", "Lt", "Lm", "Lo", "Nl", "Mn", "Mc", "Nd", "Pc"))
+
+
+# ---------- Tokens -> logical lines ----------
+def _word(c):
+    return unicodedata.category(c) in _WORD
+
+
+def _logical_lines(source):
+    """[(indent depth, [(type, text, start row, end row, bracket depth)])] per statement."""
+    lines, tokens = [], []
+    depth = brackets = 0
+    fstring = None  # 3.12+: f-strings arrive as several tokens; copied as one source slice
+    name_end = None  # end of the last NAME token: tokenize splits names at marks (U+0301 in "cafe\u0301")
+    rows = source.splitlines(keepends=True)
+    try:
+        for tok in tokenize.generate_tokens(io.StringIO(source).readline):
+            kind = tok.type
+            if fstring is not None or kind == getattr(tokenize, "FSTRING_START", None):
+                if fstring is None:
+                    fstring = [tok.start, 0]
+                if kind == getattr(tokenize, "FSTRING_START", None):
+                    fstring[1] += 1
+                elif kind == getattr(tokenize, "FSTRING_END", None):
+                    fstring[1] -= 1
+                if fstring[1]:
+                    continue
+                (r0, c0), (r1, c1) = fstring[0], tok.end
+                text = rows[r0 - 1][c0:] + "".join(rows[r0:r1 - 1]) + rows[r1 - 1][:c1] if r1 > r0 \
+                    else rows[r0 - 1][c0:c1]
+                tokens.append((tokenize.STRING, text, r0, r1, brackets))
+                fstring = None
+                continue
+            if tok.start == name_end and kind in (tokenize.NAME, tokenize.ERRORTOKEN) and all(map(_word, tok.string)):
+                tokens[-1] = tokens[-1][:1] + (tokens[-1][1] + tok.string,) + tokens[-1][2:]
+                name_end = tok.end
+                continue
+            name_end = tok.end if kind == tokenize.NAME else None
+            if kind == tokenize.INDENT:
+                depth += 1
+            elif kind == tokenize.DEDENT:
+                depth -= 1
+            elif kind == tokenize.NEWLINE:
+                if tokens:
+                    lines.append((depth, tokens))
+                tokens = []
+            elif kind == tokenize.ERRORTOKEN:
+                if not tok.string.isspace():
+                    raise ValueError(f"Zeile {tok.start[0]}: unerwartetes Zeichen {tok.string!r}")
+            elif kind not in _SKIP:
+                if kind == tokenize.OP and tok.string in _CLOSE:
+                    brackets -= 1
+                tokens.append((kind, tok.string, tok.start[0], tok.end[0], brackets))
+                if kind == tokenize.OP and tok.string in _OPEN:
+                    brackets += 1
+    except (tokenize.TokenError, SyntaxError) as e:
+        raise ValueError(f"Script nicht lesbar: {e}") from None
+    if tokens:  # source without trailing NEWLINE token
+        lines.append((depth, tokens))
+    return lines
+
+
+def _is_docstring(tokens):
+    return all(t[0] == tokenize.STRING and "f" not in t[1].split("'")[0].split('"')[0].lower() for t in tokens)
+
+
+def _opens_doc_block(tokens):
+    return tokens[0][1] in _BLOCK_KEYWORDS and tokens[-1][1] == ":"
+
+
+# ---------- Minifier ----------
+def minify(source, keep_lines=True):
+    """
+    Minified source text. keep_lines=True keeps every token on its source line (line numbers
+    unchanged); False also drops empty lines and joins bracketed/continued lines.
+    Raises ValueError if the source cannot be tokenized.
+    """
+    lines = _logical_lines(source.replace("\r\n", "\n").replace("\r", "\n"))
+    out = []
+    row = 1
+    doc_allowed = True  # module docstring
+    for n, (depth, tokens) in enumerate(lines):
+        if doc_allowed and _is_docstring(tokens):
+            following = lines[n + 1][0] if n + 1 < len(lines) else -1
+            if following >= depth or depth == 0:
+                doc_allowed = False
+                continue
+            tokens = [(tokenize.NAME, "pass", tokens[0][2], tokens[0][2], 0)]  # docstring was the whole body
+        doc_allowed = _opens_doc_block(tokens)
+
+        first = tokens[0][2]
+        if keep_lines:
+            out.append("\n" * max(first - row, 1 if out else 0))
+        elif out:
+            out.append("\n")
+        row = first
+        out.append(" " * depth)
+        prev = None
+        for kind, text, start, end, brackets in tokens:
+            if keep_lines and start > row:
+                out.append(("\n" if brackets else "\\\n") * (start - row))
+            elif prev is not None and (
+                    _word(prev[1][-1]) and _word(text[0])
+                    or prev[0] == tokenize.NUMBER and text[0] == "."):
+                out.append(" ")
+            out.append(text)
+            row = end
+            prev = (kind, text)
+    if out:
+        out.append("\n")
+    return "".join(out)
+
+
+class MinifyCache:
+    """minify() results stored as <content hash>.py (thread-safe)."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._memo = {}  # key -> minified text
+        self.minified = 0  # cache misses in this process
+
+    def key(self, source, keep_lines=True):
+        h = hashlib.sha256(f"{MINIFY_VERSION}:{int(keep_lines)}:".encode("ascii"))
+        h.update(source.encode("utf-8"))
+        return h.hexdigest()[:16]
+
+    def get(self, source, keep_lines=True):
+        key = self.key(source, keep_lines)
+        with self._lock:
+            hit = self._memo.get(key)
+            if hit is not None:
+                return hit
+            path = os.path.join(self.cache_dir, key + ".py")
+            try:
+                with open(path, encoding="utf-8", newline="") as f:
+                    text = f.read()
+            except OSError:
+                text = minify(source, keep_lines)
+                self.minified += 1
+                os.makedirs(self.cache_dir, exist_ok=True)
+                atomic_write(path, lambda f: f.write(text.encode("utf-8")), binary=True)
+            self._memo[key] = text
+            return text
+
+
+_default = None
+
+
+def default_cache():
+    """Process-wide cache in build/minify."""
+    global _default
+    if _default is None:
+        _default = MinifyCache()
+    return _default
+
+
+def minify_cached(source, keep_lines=True):
+    """Cached minify(); scripts the tokenizer rejects are returned unchanged (the device reports the error)."""
+    try:
+        return default_cache().get(source, keep_lines)
+    except ValueError:
+        return source
+
+
+# ---------- Report ----------
+def minify_report(catalog, root=ROOT, keep_lines=True):
+    """Bytes before/after per micropython example of the catalog."""
+    rows = []
+    for e in normalize_entries(read_examples(catalog)):
+        if e["runtime"] != "micropython":
+            continue
+        row = {"file": e["file"], "name": e["name"]}
+        rows.append(row)
+        for cand in code_candidates(e["file"]):
+            try:
+                with open(os.path.join(root, cand), encoding="utf-8") as f:
+                    source = f.read()
+                break
+            except OSError:
+                continue
+        else:
+            row["error"] = "code nicht gefunden"
+            continue
+        try:
+            small = default_cache().get(source, keep_lines)
+        except ValueError as e:
+            row["error"] = str(e)
+            continue
+        before, after = len(source.encode("utf-8")), len(small.encode("utf-8"))
+        row.update({"bytes": before, "minified": after, "saved": before - after,
+                    "fits_v1": before <= MAX_SCRIPT_BYTES, "fits_v1_minified": after <= MAX_SCRIPT_BYTES})
+    done = [r for r in rows if "error" not in r]
+    return {
+        "catalog": catalog,
+        "keep_lines": keep_lines,
+        "entries": rows,
+        "bytes": sum(r["bytes"] for r in done),
+        "minified": sum(r["minified"] for r in done),
+        "saved": sum(r["saved"] for r in done),
+        "failed": len(rows) - len(done),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Minify MicroPython scripts before they go to the device.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("file", help="minify one script")
+    p.add_argument("script")
+    p.add_argument("--output", "-o", default="-", help="output file ('-' = stdout)")
+    p.add_argument("--join-lines", action="store_true", help="do not keep source line numbers")
+    p = sub.add_parser("report", help="bytes saved per micropython example")
+    p.add_argument("catalog", nargs="?", default=None, help=f"catalog (default: <root>/{DEFAULT_CATALOG})")
+    p.add_argument("--root", default=ROOT, help="web root the catalog paths are relative to")
+    p.add_argument("--join-lines", action="store_true", help="do not keep source line numbers")
+    args = parser.parse_args(argv)
+    keep_lines = not args.join_lines
+
+    try:
+        if args.command == "file":
+            with open(args.script, encoding="utf-8") as f:
+                text = minify(f.read(), keep_lines)
+            if args.output == "-":
+                sys.stdout.write(text)
+            else:
+                atomic_write(args.output, lambda f: f.write(text.encode("utf-8")), binary=True)
+            return 0
+        catalog = args.catalog or os.path.join(args.root, DEFAULT_CATALOG)
+        report = minify_report(catalog, args.root, keep_lines)
+    except (OSError, ValueError) as e:
+        print(f"Fehler: {type(e).__name__}: {e}", file=sys.stderr)
+        return 2
+    json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
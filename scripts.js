@@ -617,8 +617,8 @@ function joinUrl(...parts) {
 }
 async function urlExists(url) {
   try {
-    let res = await fetch(url, { method: "HEAD", cache: "no-store" });
-    if (!res.ok) res = await fetch(url, { method: "GET", cache: "no-store" });
+    let res = await fetch(url, { method: "HEAD", cache: "no-cache" });
+    if (!res.ok) res = await fetch(url, { method: "GET", cache: "no-cache" });
     return res.ok;
   } catch { return false; }
 }
@@ -664,9 +664,47 @@ async function detectBase(baseFolder) {
   return preferred;
 }
 
+// Vorkompiliertes Manifest (examples_manifest.py): Code + aufgelöste Bilder in EINEM Request.
+// Liefert null, wenn es (noch) nicht gebaut wurde → dann der Einzel-Fetch-Weg unten.
+async function loadExamplesManifest(jsonUrl, dev, placeholderImg) {
+  const mode = (dev === 'c12' || dev === 'c3') ? dev : 'none';
+  const url = jsonUrl.replace(/\.json$/i, '') + `.manifest.${mode}.json`;
+  try {
+    const res = await fetch(url, { cache: 'no-cache' });   // revalidieren statt neu laden
+    if (!res.ok) return null;
+    const data = await res.json();
+    if (!Array.isArray(data?.examples) || !data.examples.length) return null;
+    return data.examples.map(e => ({
+      name: e.name,
+      file: e.file,
+      // Thumbnail-Namen enthalten schon den Inhalts-Hash (examples_thumbs.py)
+      image: e.kind === 'calliope' ? null
+           : e.thumb ? e.thumb
+           : (e.image ? `${e.image}?v=${e.image_hash}` : placeholderImg),
+      width: e.thumb ? e.thumb_width : null,
+      height: e.thumb ? e.thumb_height : null,
+      description: e.description,
+      code: e.code,
+      kind: e.kind
+    }));
+  } catch { return null; }
+}
+
 async function loadExamplesFromJson(jsonUrl = 'data/examples.json') {
+  const placeholderImg =
+    'data:image/svg+xml;base64,' +
+    btoa('<svg xmlns="http://www.w3.org/2000/svg" width="300" height="180"><rect width="100%" height="100%" fill="#ddd"/><text x="50%" y="50%" dominant-baseline="middle" text-anchor="middle" fill="#777" font-family="Arial" font-size="14">Kein Bild</text></svg>');
+
+  // 0) Manifest bevorzugen
+  const manifest = await loadExamplesManifest(jsonUrl, currentDevice(), placeholderImg);
+  if (manifest) {
+    examples = manifest;
+    console.log('[examples] manifest', { count: examples.length });
+    return;
+  }
+
   // 1) JSON holen
-  const res = await fetch(jsonUrl, { cache: 'no-store' });
+  const res = await fetch(jsonUrl, { cache: 'no-cache' });
   if (!res.ok) throw new Error(`JSON nicht ladbar: ${res.status} ${res.statusText}`);
   const data = await res.json();
   const items = Array.isArray(data?.examples) ? data.examples : [];
@@ -680,7 +718,9 @@ async function loadExamplesFromJson(jsonUrl = 'data/examples.json') {
     .map(e => ({
       file: String(e.file || '').trim(),
       name: String(e.name || '').trim() || (e.file ? e.file.split('/').pop() : 'Beispiel'),
-      image: e.image ? String(e.image).trim() : null,
+      image: e.thumbnail?.file ? String(e.thumbnail.file) : (e.image ? String(e.image).trim() : null),
+      width: e.thumbnail?.width ?? null,
+      height: e.thumbnail?.height ?? null,
       runtime: String(e.runtime || '').toLowerCase().trim()  // 'python' | 'micropython'
     }))
     .filter(e => e.file && (e.runtime === 'python' || e.runtime === 'micropython'));
@@ -695,9 +735,6 @@ async function loadExamplesFromJson(jsonUrl = 'data/examples.json') {
 
   // 5) Code und Bild/Fallbacks vorab laden
   const out = [];
-  const placeholderImg =
-    'data:image/svg+xml;base64,' +
-    btoa('<svg xmlns="http://www.w3.org/2000/svg" width="300" height="180"><rect width="100%" height="100%" fill="#ddd"/><text x="50%" y="50%" dominant-baseline="middle" text-anchor="middle" fill="#777" font-family="Arial" font-size="14">Kein Bild</text></svg>');
 
   for (const ex of list) {
     // Code-Kandidaten (.py, .py.txt)
@@ -711,7 +748,7 @@ async function loadExamplesFromJson(jsonUrl = 'data/examples.json') {
     let codeText = null, usedUrl = null;
     for (const url of codeCandidates) {
       try {
-        const r = await fetch(url, { cache: 'no-store' });
+        const r = await fetch(url, { cache: 'no-cache' });
         if (!r.ok) continue;
         codeText = await r.text();
         usedUrl = url;
@@ -734,8 +771,8 @@ async function loadExamplesFromJson(jsonUrl = 'data/examples.json') {
           const candidate = base + stem + '.' + ext;
           try {
             // HEAD → wenn nicht erlaubt, GET probieren
-            let rr = await fetch(candidate, { method: 'HEAD', cache: 'no-store' });
-            if (!rr.ok) rr = await fetch(candidate, { method: 'GET', cache: 'no-store' });
+            let rr = await fetch(candidate, { method: 'HEAD', cache: 'no-cache' });
+            if (!rr.ok) rr = await fetch(candidate, { method: 'GET', cache: 'no-cache' });
             if (rr.ok) { img = candidate; break; }
           } catch {}
         }
@@ -747,6 +784,8 @@ async function loadExamplesFromJson(jsonUrl = 'data/examples.json') {
       name: ex.name,
       file: usedUrl || ex.file,
       image: isCalliope ? null : img,
+      width: ex.width,
+      height: ex.height,
       description: isCalliope ? `Calliope: ${ex.name}` : `Python-Programm: ${ex.name}`,
       code: codeText,
       kind: isCalliope ? 'calliope' : 'turtle'
@@ -795,6 +834,8 @@ function showExamples() {
           <div class="example-card" data-example="${index}">
             <img src="${ex.image}"
                  alt="${ex.name}"
+                 ${ex.width ? `width="${ex.width}" height="${ex.height}"` : ''}
+                 loading="lazy"
                  class="example-image"
                  onerror="this.src='data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iMTUwIiBoZWlnaHQ9IjE1MCIgeG1sbnM9Imh0dHA6Ly93d3cudzMub3JnLzIwMDAvc3ZnIj48cmVjdCB3aWR0aD0iMTAwJSIgaGVpZ2h0PSIxMDAlIiBmaWxsPSIjZGRkIi8+PHRleHQgeD0iNTAlIiB5PSI1MCUiIGZvbnQtZmFtaWx5PSJBcmlhbCIgZm9udC1zaXplPSIxNCIgZmlsbD0iIzk5OSIgdGV4dC1hbmNob3I9Im1pZGRsZSIgZHk9Ii4zZW0iPkJpbGQgbmljaHQgZ2VmdW5kZW48L3RleHQ+PC9zdmc+'">
             <div class="example-title">${ex.name}</div>
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Serial transfer engine for MicroPython boards (host side)
+- Talks the raw REPL instead of typing into the friendly REPL: no echo, no auto-indent,
+  one round trip per program instead of one 20 ms sleep per line (pasteExec)
+- Uses raw-paste mode where the firmware has it (MicroPython 1.14+, Calliope mini 3):
+  the device grants windows of bytes and acknowledges each one with Ctrl-A, so writes
+  go out as fast as the board consumes them, never faster
+- Older firmware (Calliope mini 1/2) gets the plain raw REPL with CHUNK_BYTES writes
+- put() writes a file in acknowledged chunks; after a board reset it reconnects and
+  continues from the size the file has on the device (or starts the file again)
+- POSIX ttys are driven through termios; pyserial is used instead when installed
+  (required on Windows)
+
+Run:
+    python3 serial_engine.py run /dev/ttyACM0 main.py
+    python3 serial_engine.py put /dev/ttyACM0 main.py [--name main.py]
+    python3 serial_engine.py bench [--lines 300] [--baud 115200]   (against fake_micropython.py)
+"""
+import argparse
+import json
+import os
+import select
+import struct
+import sys
+import time
+
+try:
+    import serial  # pyserial, optional
+except ImportError:
+    serial = None
+
+try:
+    import termios
+    import tty
+except ImportError:  # Windows
+    termios = None
+
+RAW_BANNER = b"raw REPL; CTRL-B to exit\r\n>"
+BOOT_MARKER = b"MicroPython v"
+CHUNK_BYTES = 256       # plain raw REPL: bytes per write …
+CHUNK_PAUSE = 0.01      # … and pause after it (no flow control on old firmware)
+PUT_CHUNK = 512         # file bytes per acknowledged put() command
+RECONNECT_TIMEOUT = 10  # seconds to wait for the board after a reset
+
+
+class ReplError(OSError):
+    """The board did not answer as the raw REPL protocol expects."""
+
+
+class DeviceReset(ReplError):
+    """The board rebooted (boot banner seen or port vanished) during a transfer."""
+
+
+# ---------- Ports ----------
+class PosixPort:
+    """Raw tty through termios: read(size, timeout) returns what arrived, b"" on timeout."""
+
+    def __init__(self, path, baudrate=115200):
+        self.fd = os.open(path, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+        try:
+            tty.setraw(self.fd)
+            attrs = termios.tcgetattr(self.fd)
+            speed = getattr(termios, f"B{baudrate}", None)
+            if speed is not None:
+                attrs[4] = attrs[5] = speed
+                termios.tcsetattr(self.fd, termios.TCSANOW, attrs)
+        except termios.error:
+            pass  # not a real tty (e.g. some pty implementations); raw is enough
+
+    def read(self, size, timeout):
+        if not select.select([self.fd], [], [], max(0, timeout))[0]:
+            return b""
+        data = os.read(self.fd, size)
+        if not data:
+            raise DeviceReset("Port geschlossen")
+        return data
+
+    def write(self, data):
+        view = memoryview(data)
+        while view:
+            select.select([], [self.fd], [], 1)
+            try:
+                n = os.write(self.fd, view)
+            except BlockingIOError:
+                continue
+            view = view[n:]
+
+    def discard_input(self):
+        while self.read(4096, 0):
+            pass
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PySerialPort:
+    def __init__(self, path, baudrate=115200):
+        self.port = serial.Serial(path, baudrate, timeout=0)
+
+    def read(self, size, timeout):
+        self.port.timeout = max(0, timeout)
+        return self.port.read(max(1, min(size, self.port.in_waiting or 1)))
+
+    def write(self, data):
+        self.port.write(data)
+
+    def discard_input(self):
+        self.port.reset_input_buffer()
+
+    def close(self):
+        self.port.close()
+
+
+def open_port(path, baudrate=115200):
+    if termios is not None:
+        return PosixPort(path, baudrate)
+    if serial is None:
+        raise OSError("pyserial wird auf diesem System benötigt (pip install pyserial)")
+    return PySerialPort(path, baudrate)
+
+
+# ---------- Raw REPL ----------
+class RawRepl:
+    """One board on one serial port; enter() once, then exec()/put() as often as needed."""
+
+    def __init__(self, path, baudrate=115200, timeout=10, opener=open_port):
+        self.path = path
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self._opener = opener
+        self.port = opener(path, baudrate)
+        self.raw_paste = None  # unknown until the first exec()
+        self.stats = {"sent": 0, "windows": 0, "resets": 0}
+
+    def close(self):
+        try:
+            self.port.write(b"\r\x02")  # back to the friendly REPL
+        except OSError:
+            pass
+        self.port.close()
+
+    def __enter__(self):
+        self.enter()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------- Protocol ----------
+    def _write(self, data):
+        try:
+            self.port.write(data)
+        except OSError as e:
+            raise DeviceReset(f"Schreiben fehlgeschlagen: {e}") from None
+        self.stats["sent"] += len(data)
+
+    def _read(self, size, timeout):
+        try:
+            return self.port.read(size, timeout)
+        except DeviceReset:
+            raise
+        except OSError as e:
+            raise DeviceReset(f"Lesen fehlgeschlagen: {e}") from None
+
+    def read_until(self, ending, timeout=None, watch_reset=True):
+        """Bytes up to and including ending; DeviceReset if the boot banner shows up instead."""
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        data = bytearray()
+        while not data.endswith(ending):
+            left = deadline - time.monotonic()
+            if left <= 0:
+                raise ReplError(f"Zeitüberschreitung, erwartet {ending!r}, erhalten {bytes(data[-40:])!r}")
+            data += self._read(4096 if len(ending) > 1 else 1, left)
+            if watch_reset and BOOT_MARKER in data:
+                raise DeviceReset("Board wurde neu gestartet")
+        return bytes(data)
+
+    def enter(self):
+        """Interrupt a running program and switch to the raw REPL."""
+        self._write(b"\r\x03\x03")
+        time.sleep(0.05)
+        self.port.discard_input()
+        self._write(b"\r\x01")
+        self.read_until(RAW_BANNER, watch_reset=False)
+
+    def exec_raw(self, code):
+        """Send code, let it run and return (stdout, stderr) as text."""
+        self._send_code(code)
+        return self._result()
+
+    def _result(self):
+        out = self.read_until(b"\x04")[:-1]
+        err = self.read_until(b"\x04")[:-1]
+        self.read_until(b">")
+        return _text(out), _text(err)
+
+    def exec(self, code):
+        """exec_raw(), raising ReplError with the device traceback if the code failed."""
+        out, err = self.exec_raw(code)
+        if err:
+            raise ReplError(err.strip())
+        return out
+
+    def _send_code(self, code):
+        data = code.encode("utf-8") if isinstance(code, str) else bytes(code)
+        if BOOT_MARKER in self._read(4096, 0):  # rebooted since the last command
+            raise DeviceReset("Board wurde neu gestartet")
+        if self.raw_paste is not False:
+            self._write(b"\x05A\x01")
+            answer = self._read_exact(2)
+            if BOOT_MARKER.startswith(answer):
+                raise DeviceReset("Board wurde neu gestartet")
+            if answer == b"R\x01":
+                self.raw_paste = True
+                self._paste(data)
+                return
+            if answer == b"R\x00":  # understood, but disabled
+                pass
+            else:  # old firmware: Ctrl-A restarted the raw REPL
+                self.read_until(b"w REPL; CTRL-B to exit\r\n>", watch_reset=False)
+            self.raw_paste = False
+        for i in range(0, len(data), CHUNK_BYTES):
+            self._write(data[i:i + CHUNK_BYTES])
+            time.sleep(CHUNK_PAUSE)
+        self._write(b"\x04")
+        answer = self._read_exact(2)
+        if answer != b"OK":
+            if BOOT_MARKER.startswith(answer):
+                raise DeviceReset("Board wurde neu gestartet")
+            raise ReplError(f"Code nicht angenommen: {answer!r}")
+
+    def _read_exact(self, size):
+        data = b""
+        deadline = time.monotonic() + self.timeout
+        while len(data) < size:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                raise ReplError(f"Zeitüberschreitung, erhalten {data!r}")
+            data += self._read(size - len(data), left)
+        return data
+
+    def _paste(self, data):
+        """Raw-paste transfer: never more than the granted window in flight."""
+        window = struct.unpack("<H", self._read_exact(2))[0]
+        credit = window
+        view = memoryview(data)
+        while view:
+            # pick up acknowledgements without waiting, or wait if the window is used up
+            while True:
+                ack = self._read(1, 0 if credit else self.timeout)
+                if not ack:
+                    if credit:
+                        break
+                    raise ReplError("keine Flusskontroll-Bestätigung vom Board")
+                if ack == b"\x01":
+                    credit += window
+                    self.stats["windows"] += 1
+                elif ack == b"\x04":  # device aborted (e.g. out of memory)
+                    self._write(b"\x04")
+                    return
+                else:
+                    seen = ack + self._read(64, 0.2)
+                    if BOOT_MARKER.startswith(seen[:len(BOOT_MARKER)]) or BOOT_MARKER in seen:
+                        raise DeviceReset("Board wurde neu gestartet")
+                    raise ReplError(f"unerwartete Daten im Raw-Paste-Modus: {seen!r}")
+            n = min(credit, len(view))
+            self._write(view[:n])
+            view = view[n:]
+            credit -= n
+        self._write(b"\x04")
+        self.read_until(b"\x04")
+
+    # ---------- Transfers with reset handling ----------
+    def reconnect(self, timeout=RECONNECT_TIMEOUT):
+        """Reopen the port after a reset (USB re-enumerates) and enter the raw REPL again."""
+        self.stats["resets"] += 1
+        try:
+            self.port.close()
+        except OSError:
+            pass
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                self.port = self._opener(self.path, self.baudrate)
+                self.enter()
+                return
+            except OSError as e:
+                if time.monotonic() >= deadline:
+                    raise ReplError(f"Board nach Reset nicht erreichbar: {e}") from None
+                time.sleep(0.2)
+
+    def run(self, code, resume=True):
+        """Run a program; if the board resets while the code is still being sent, send it again."""
+        while True:
+            try:
+                self._send_code(code)
+                break
+            except DeviceReset:
+                if not resume:
+                    raise
+                self.reconnect()
+        return self._result()  # a reset while it runs is the program's doing: not repeated
+
+    def put(self, name, data, resume=True, chunk=PUT_CHUNK):
+        """Write a file on the board in acknowledged chunks. Returns the bytes written."""
+        data = data.encode("utf-8") if isinstance(data, str) else bytes(data)
+        offset, mode = 0, "wb"
+        while True:
+            try:
+                self.exec(f"f=open({name!r},{mode!r})\nw=f.write")
+                while offset < len(data):
+                    part = data[offset:offset + chunk]
+                    self.exec(f"w({part!r})")
+                    offset += len(part)
+                self.exec("f.close()\ndel f,w")
+                return len(data)
+            except DeviceReset:
+                if not resume:
+                    raise
+                self.reconnect()
+                offset = self._device_size(name, offset)
+                mode = "ab" if offset else "wb"
+                if offset and not self._can_append(name):
+                    offset, mode = 0, "wb"
+
+    def _device_size(self, name, sent):
+        out = self.exec(
+            "import os\n"
+            "try:\n s=os.stat(%r)[6]\nexcept:\n try:\n  s=os.size(%r)\n except:\n  s=0\nprint(s)" % (name, name))
+        size = int(out.strip() or 0)
+        return size if size <= sent else 0
+
+    def _can_append(self, name):
+        out, err = self.exec_raw(f"open({name!r},'ab').close()")
+        return not err
+
+
+def _text(data):
+    return data.decode("utf-8", "replace").replace("\r\n", "\n")
+
+
+# ---------- Benchmark ----------
+def sample_program(lines):
+    body = ["# Benchmark-Programm", "def blink(n):", "    for i in range(n):", "        x = i * 2"]
+    while len(body) < lines - 1:
+        k = len(body)
+        body.append(f"value_{k} = {k} * 3 + len('zeile {k}')  # Kommentar {k}")
+    body.append("print('fertig', value_%d)" % (len(body) - 1))
+    return "\n".join(body) + "\n"
+
+
+def paste_exec(port, code, delay=0.02):
+    """What calliope.serial.js pasteExec does: friendly paste mode, one line per delay."""
+    port.write(b"\x05")
+    for line in code.replace("\r\n", "\n").split("\n"):
+        port.write(line.encode("utf-8") + b"\r")
+        time.sleep(delay)
+    port.write(b"\x04")
+
+
+def bench(lines=300, baudrate=115200, window=128):
+    from fake_micropython import FakeDevice
+
+    code = sample_program(lines)
+    report = {"lines": lines, "bytes": len(code.encode("utf-8")), "baudrate": baudrate}
+    with FakeDevice(baudrate, window) as dev:
+        port = open_port(dev.path, baudrate)
+        t0 = time.perf_counter()
+        paste_exec(port, code)
+        deadline = time.monotonic() + 30
+        seen = b""
+        while b"\r\nfertig " not in seen and time.monotonic() < deadline:
+            seen += port.read(4096, 0.1)
+        report["paste_exec_s"] = round(time.perf_counter() - t0, 3)
+        port.close()
+
+    for mode, raw_paste in (("raw_paste", True), ("raw_repl", False)):
+        with FakeDevice(baudrate, window, raw_paste=raw_paste) as dev:
+            with RawRepl(dev.path, baudrate) as repl:
+                t0 = time.perf_counter()
+                out, err = repl.exec_raw(code)
+                report[f"{mode}_s"] = round(time.perf_counter() - t0, 3)
+                if err or "fertig" not in out:
+                    report[f"{mode}_error"] = err or out
+            report[f"{mode}_window_overruns"] = dev.stats["window_overruns"]
+
+    with FakeDevice(baudrate, window, reset_after=2000) as dev:
+        with RawRepl(dev.path, baudrate) as repl:
+            t0 = time.perf_counter()
+            repl.put("main.py", code)
+            report["put_with_reset_s"] = round(time.perf_counter() - t0, 3)
+            report["put_resets"] = repl.stats["resets"]
+        report["put_ok"] = bytes(dev.files.get("main.py", b"")) == code.encode("utf-8")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fast raw-REPL transfers to a MicroPython board.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("run", help="run a script on the board and print its output")
+    p.add_argument("port")
+    p.add_argument("script")
+    p = sub.add_parser("put", help="copy a file to the board (e.g. as main.py)")
+    p.add_argument("port")
+    p.add_argument("script")
+    p.add_argument("--name", help="file name on the board (default: the script's name)")
+    for p in sub.choices.values():
+        p.add_argument("--baud", type=int, default=115200)
+        p.add_argument("--no-resume", action="store_true", help="fail instead of reconnecting after a reset")
+    p = sub.add_parser("bench", help="pasteExec vs raw REPL against the fake device")
+    p.add_argument("--lines", type=int, default=300)
+    p.add_argument("--baud", type=int, default=115200)
+    p.add_argument("--window", type=int, default=128, help="raw-paste window of the fake device")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "bench":
+            json.dump(bench(args.lines, args.baud, args.window), sys.stdout, indent=2)
+            sys.stdout.write("\n")
+            return 0
+        with open(args.script, "rb") as f:
+            data = f.read()
+        with RawRepl(args.port, args.baud) as repl:
+            if args.command == "put":
+                name = args.name or os.path.basename(args.script)
+                n = repl.put(name, data, resume=not args.no_resume)
+                print(f"{name}: {n} Bytes übertragen")
+                return 0
+            out, err = repl.run(data, resume=not args.no_resume)
+    except OSError as e:
+        print(f"Fehler: {type(e).__name__}: {e}", file=sys.stderr)
+        return 2
+    sys.stdout.write(out)
+    sys.stderr.write(err)
+    return 1 if err else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Precompressed static assets for the IDE
+- gzip (level 9) and, if the `brotli` module is installed, brotli (quality 11) variant of
+  every static asset (html/js/css/json/hex/py/…), compressed in worker processes
+- Variants are content-addressed: build/static/<hash>.gz / .br, so an asset whose content
+  hash did not change is skipped (files with unchanged size/mtime are not even read)
+- Variants that do not save at least MIN_SAVING are left out; the server then sends the
+  original
+- Writes build/static/manifest.json: path -> size, hash, variant sizes and a
+  cache-busting name (scripts.js -> scripts.<hash>.js) that dev_server.py serves
+  with an immutable Cache-Control
+
+Run (after changing the IDE files):
+    python3 static_build.py [--root .] [--prune] [-j N]
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from examples_catalog import atomic_write
+from examples_manifest import ROOT
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+DEFAULT_OUT = os.path.join("build", "static")
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+STATIC_EXTS = (".html", ".js", ".mjs", ".css", ".json", ".hex", ".py", ".txt", ".svg", ".map", ".md")
+SKIP_DIRS = {"build", "node_modules", "__pycache__", "Examples_JSON_Editor_Package"}
+MIN_SIZE = 512      # smaller files fit into one packet anyway
+MIN_SAVING = 0.05   # variant must be at least 5 % smaller than the original
+
+ENCODINGS = {"gzip": ".gz", "br": ".br"}
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def hashed_name(path, digest):
+    """scripts.js -> scripts.<first 8 hash chars>.js (same directory)."""
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.{digest[:8]}{ext}"
+
+
+def find_assets(root):
+    """Relative paths (forward slashes) of all static assets below root, sorted."""
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith(".") and d not in SKIP_DIRS)
+        for name in filenames:
+            if name.endswith(STATIC_EXTS) and not name.startswith("."):
+                rel = os.path.relpath(os.path.join(dirpath, name), root)
+                found.append(rel.replace(os.sep, "/"))
+    return sorted(found)
+
+
+# ---------- Compression (runs in worker processes) ----------
+def compress(data, encoding):
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    return brotli.compress(data, quality=11)
+
+
+def _compress_job(job):
+    """Writes the variants of one asset. Returns (path, {encoding: size}, error)."""
+    path, src, digest, out_dir, encodings = job
+    try:
+        with open(src, "rb") as f:
+            data = f.read()
+        sizes = {}
+        for enc in encodings:
+            packed = compress(data, enc)
+            if len(packed) > len(data) * (1 - MIN_SAVING):
+                continue
+            dst = os.path.join(out_dir, digest + ENCODINGS[enc])
+            atomic_write(dst, lambda f: f.write(packed), binary=True)
+            sizes[enc] = len(packed)
+        return path, sizes, None
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+
+
+# ---------- Build ----------
+def read_manifest(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == MANIFEST_VERSION:
+            return data
+    except (OSError, ValueError):
+        pass
+    return {"version": MANIFEST_VERSION, "assets": {}}
+
+
+def build_static(root=ROOT, out_dir=DEFAULT_OUT, jobs=None, prune=False):
+    t0 = time.perf_counter()
+    out_abs = os.path.join(root, out_dir)
+    manifest_path = os.path.join(out_abs, MANIFEST_NAME)
+    old = read_manifest(manifest_path)["assets"]
+    encodings = [e for e in ENCODINGS if e != "br" or brotli is not None]
+
+    assets, todo, skipped = {}, [], 0
+    for path in find_assets(root):
+        src = os.path.join(root, path)
+        st = os.stat(src)
+        if st.st_size < MIN_SIZE:
+            continue
+        prev = old.get(path)
+        if prev and (prev["size"], prev["mtime_ns"]) == (st.st_size, st.st_mtime_ns):
+            digest = prev["hash"]
+        else:
+            with open(src, "rb") as f:
+                digest = content_hash(f.read())
+        entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": digest,
+                 "hashed": hashed_name(path, digest), "encodings": {}}
+        assets[path] = entry
+        if prev and prev["hash"] == digest and set(prev.get("tried", ())) >= set(encodings) and all(
+                os.path.exists(os.path.join(out_abs, digest + ENCODINGS[e])) for e in prev["encodings"]):
+            entry["encodings"], entry["tried"] = prev["encodings"], prev["tried"]
+            skipped += 1
+            continue
+        todo.append((path, src, digest, out_abs, encodings))
+
+    if todo:
+        os.makedirs(out_abs, exist_ok=True)
+    if len(todo) > 1 and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_compress_job, todo))
+    else:
+        results = [_compress_job(job) for job in todo]
+
+    errors = []
+    for path, sizes, err in results:
+        if err:
+            errors.append({"path": path, "error": err})
+            del assets[path]
+        else:
+            assets[path]["encodings"] = sizes
+            assets[path]["tried"] = encodings
+
+    pruned = 0
+    if prune and os.path.isdir(out_abs):
+        keep = {a["hash"] + ENCODINGS[e] for a in assets.values() for e in a["encodings"]}
+        for name in os.listdir(out_abs):
+            if name != MANIFEST_NAME and name not in keep:
+                os.remove(os.path.join(out_abs, name))
+                pruned += 1
+
+    os.makedirs(out_abs, exist_ok=True)
+    manifest = {"version": MANIFEST_VERSION, "assets": assets}
+    atomic_write(manifest_path, lambda f: json.dump(manifest, f, ensure_ascii=False, indent=1))
+
+    total = sum(a["size"] for a in assets.values())
+    return {
+        "root": root,
+        "manifest": manifest_path,
+        "assets": len(assets),
+        "compressed": len(results) - len(errors),
+        "skipped": skipped,
+        "pruned": pruned,
+        "errors": errors,
+        "encodings": encodings,
+        "bytes": total,
+        "bytes_gzip": sum(a["encodings"].get("gzip", a["size"]) for a in assets.values()),
+        "bytes_br": sum(a["encodings"].get("br", a["size"]) for a in assets.values()) if brotli else None,
+        "total_s": round(time.perf_counter() - t0, 4),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompress the IDE's static assets (gzip/brotli).")
+    parser.add_argument("--root", default=ROOT, help="web root (default: this folder)")
+    parser.add_argument("--out", default=DEFAULT_OUT, help=f"output folder below root (default {DEFAULT_OUT})")
+    parser.add_argument("--prune", action="store_true", help="delete variants no asset refers to anymore")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="worker processes")
+    args = parser.parse_args(argv)
+    try:
+        report = build_static(args.root, args.out, args.jobs, args.prune)
+    except OSError as e:
+        print(f"Fehler: {type(e).__name__}: {e}", file=sys.stderr)
+        return 2
+    json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
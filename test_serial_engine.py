@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Checks serial_engine.RawRepl against the fake board from fake_micropython.py
+- exec_raw() in raw-paste mode and in the plain raw REPL of older firmware
+- put() with a board reset in the middle of the transfer
+- Output, window flow control (no window overruns) and the file on the device
+
+Run:
+    python3 -m unittest test_serial_engine
+"""
+import contextlib
+import io
+import os
+import unittest
+
+try:
+    import pty  # noqa: F401  (the fake board needs a pseudo terminal)
+    from fake_micropython import FakeDevice
+except ImportError:  # Windows
+    FakeDevice = None
+
+from serial_engine import RawRepl, sample_program
+
+BAUD = 1_000_000  # simulated line speed; high, so the tests stay fast
+WINDOW = 128
+
+
+@unittest.skipIf(FakeDevice is None or os.name != "posix", "benötigt ein Pseudo-Terminal (POSIX)")
+class RawReplTest(unittest.TestCase):
+    code = sample_program(120)
+
+    def expected_output(self):
+        """What the program prints when CPython runs it."""
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            exec(self.code, {})
+        return out.getvalue()
+
+    def exec_on(self, raw_paste):
+        with FakeDevice(BAUD, WINDOW, raw_paste=raw_paste) as dev:
+            with RawRepl(dev.path, BAUD) as repl:
+                out, err = repl.exec_raw(self.code)
+                self.assertEqual(repl.raw_paste, raw_paste)
+                self.assertEqual(repl.exec_raw("print(1 + 1)"), ("2\n", ""))
+            self.assertEqual(dev.stats["window_overruns"], 0)
+        return out, err
+
+    def test_exec_raw_paste(self):
+        out, err = self.exec_on(raw_paste=True)
+        self.assertEqual(err, "")
+        self.assertEqual(out, self.expected_output())
+
+    def test_exec_plain_raw_repl(self):
+        out, err = self.exec_on(raw_paste=False)
+        self.assertEqual(err, "")
+        self.assertEqual(out, self.expected_output())
+
+    def test_exec_raw_error(self):
+        with FakeDevice(BAUD, WINDOW) as dev:
+            with RawRepl(dev.path, BAUD) as repl:
+                out, err = repl.exec_raw("print('a')\n1/0")
+        self.assertEqual(out, "a\n")
+        self.assertIn("ZeroDivisionError", err)
+
+    def test_put_with_reset(self):
+        data = self.code.encode("utf-8")
+        with FakeDevice(BAUD, WINDOW, reset_after=2000) as dev:
+            with RawRepl(dev.path, BAUD) as repl:
+                self.assertEqual(repl.put("main.py", data), len(data))
+                self.assertEqual(repl.stats["resets"], 1)
+            self.assertEqual(dev.stats["resets"], 1)
+            self.assertEqual(dev.stats["window_overruns"], 0)
+            self.assertEqual(bytes(dev.files["main.py"]), data)
+
+
+if __name__ == "__main__":
+    unittest.main()
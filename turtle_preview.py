@@ -0,0 +1,821 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Turtle preview renderer
+- Runs every `runtime: python` example against a headless stand-in for the IDE's turtle
+  module (turtle.js: same API names, coordinates, heading and path/fill rules) that only
+  records the drawing; no Tk, no browser. `repeat n:` is expanded like in scripts.js
+  (examples_syntax.extend_repeat)
+- Rasterizes the recorded paths to PNG with a small scanline renderer (2x supersampled,
+  png_image.py), cropped to the drawing and fitted into --size
+- Every script runs in a fresh worker process (forkserver/spawn, -j at a time), so state
+  a script changes (modules, globals) never reaches another render or the build itself.
+  The build kills a worker whose script still runs START_GRACE seconds after its time
+  limit (also inside a long C call) or whose rendering takes longer than RENDER_TIMEOUT; in the worker, SIGALRM and a check on every turtle call end
+  the script cleanly at the limit, and on POSIX rlimits cap CPU time, address space
+  (MAX_MEMORY) and written file size (MAX_FILE_BYTES). Files and network stay reachable
+  with the rights of the build. input() gets no input, print() output is discarded,
+  random is seeded so renders are reproducible
+- Previews are content-addressed by script hash: <folder>/previews/<stem>.<hash>.png;
+  results (also "nothing drawn") are cached in build/preview-cache.json, so only new or
+  changed scripts run again; --prune deletes previews no catalog references any more
+  (this one plus the --catalog catalogs, default: all of the tree, examples_manifest.CATALOGS)
+- Writes the preview into the entry's `image` field (a stale `thumbnail` is dropped);
+  --keep-images leaves hand-made images alone and only fills in missing ones
+- Writes the execution cost of the run into the entry's `cost` field:
+  {"cpu_ms", "draw_ops", "segments", "peak_kb"} (CPU time, turtle calls, drawn line
+  segments, growth of the worker's peak RSS during the run; POSIX only) plus
+  "stopped": "timeout"|"limit"|"killed" when the run was cut off (a killed run only has
+  cpu_ms: the time until it was killed), so the IDE can pick the animation speed or warn before running an expensive
+  example; the report lists the same per entry
+
+Labels (label()) are not rendered: there is no font without Pillow.
+
+Run:
+    python3 turtle_preview.py [data/examples.json] [--size 400x300] [--timeout 5] [-j N] [--keep-images]
+                              [--prune [--catalog OTHER.json ...]]
+
+Exit codes: 0 ok, 1 some scripts could not be rendered, 2 catalog unusable.
+"""
+import argparse
+import builtins
+import hashlib
+import json
+import math
+import multiprocessing
+import multiprocessing.connection
+import os
+import random
+import re
+import signal
+import sys
+import threading
+import time
+import types
+
+from examples_catalog import atomic_write, normalize_entries, read_examples, write_catalog_atomic
+from examples_manifest import CATALOGS, DEFAULT_CATALOG, ROOT, referenced_files
+from examples_syntax import extend_repeat
+from hex_batch import read_script
+from png_image import downscale, encode_png
+
+try:
+    import resource  # POSIX: worker limits and peak memory
+except ImportError:  # Windows
+    resource = None
+
+PREVIEW_DIR = "previews"
+DEFAULT_SIZE = (400, 300)  # size of the hand-made screenshots in turtlebeispiele/
+DEFAULT_CACHE = os.path.join(ROOT, "build", "preview-cache.json")
+DEFAULT_TIMEOUT = 5.0
+MAX_OPS = 200000           # turtle calls per script
+RENDER_VERSION = 1         # part of the cache key: bump when the output changes
+CACHE_VERSION = 3          # 2: runs record peak_kb, 3: measured without tracemalloc
+START_GRACE = 2.0          # s on top of --timeout for starting a worker
+RENDER_TIMEOUT = 30.0      # s for rasterizing and writing the PNG once the script is done
+MAX_MEMORY = 1 << 30       # address space of a worker (POSIX)
+MAX_FILE_BYTES = 16 << 20  # largest file a worker may write (POSIX)
+
+TURTLE_MODULES = ("turtle", "jturtle")  # names registered by registerTurtleInPython (turtle.js)
+SUPERSAMPLE = 2
+MARGIN = 10                # logical px around the drawing
+BACKGROUND = (255, 255, 255, 255)
+
+
+# ---------- Headless turtle ----------
+class PreviewTimeout(BaseException):
+    """Time limit hit (BaseException: a script's `except Exception` must not swallow it)."""
+
+
+class PreviewLimit(BaseException):
+    """Too many turtle calls."""
+
+
+def to_color(value):
+    """toColorString in turtle.js: strings pass through, (r, g, b) becomes #rrggbb."""
+    if isinstance(value, str):
+        return value
+    try:
+        r, g, b = list(value)[:3]
+        return "#%02x%02x%02x" % tuple(max(0, min(255, round(float(c)))) for c in (r, g, b))
+    except (TypeError, ValueError):
+        return "#000"
+
+
+class _Path:
+    __slots__ = ("down", "stroke", "width", "fill", "fillstyle", "points", "dot", "text")
+
+    def __init__(self, down, stroke, width, fill, fillstyle, x, y):
+        self.down = down
+        self.stroke = stroke
+        self.width = width
+        self.fill = fill
+        self.fillstyle = fillstyle
+        self.points = [(x, y)]
+        self.dot = 0      # radius: the path is a dot at points[0]
+        self.text = None  # label text at points[0]
+
+
+class Recorder:
+    """State and path list of turtle.js, without a canvas."""
+
+    def __init__(self, max_ops=MAX_OPS, deadline=None):
+        self.max_ops = max_ops
+        self.deadline = deadline
+        self.ops = 0
+        self.segments = 0
+        self.reset()
+
+    def reset(self):
+        self.x = self.y = 0.0
+        self.heading = 0.0  # 0 = north, 90 = east
+        self.pen_down = True
+        self.stroke = "#000"
+        self.fillcolor = "#000"
+        self.width = 1.0
+        self.filling = False
+        self.active_fill = None
+        self.paths = []
+        self._new_path()
+
+    def _op(self):
+        self.ops += 1
+        if self.ops > self.max_ops:
+            raise PreviewLimit()
+        if self.deadline is not None and not self.ops & 255 and time.perf_counter() > self.deadline:
+            raise PreviewTimeout()
+
+    def _new_path(self, down=None, width=None, fill=None):
+        path = _Path(self.pen_down if down is None else down, self.stroke, self.width if width is None else width,
+                     self.filling if fill is None else fill, self.fillcolor, self.x, self.y)
+        self.paths.append(path)
+        self.current = path
+        return path
+
+    def _point(self):
+        self.current.points.append((self.x, self.y))
+        if self.current.down:
+            self.segments += 1
+        if self.filling and self.active_fill is not None:
+            self.active_fill.points.append((self.x, self.y))
+
+    # ---------- API (names as registered in registerTurtleInPython) ----------
+    def forward(self, dist):
+        self._op()
+        a = math.radians(90 - self.heading)
+        self.x += float(dist) * math.cos(a)
+        self.y += float(dist) * math.sin(a)
+        self.current.stroke = self.stroke
+        self._point()
+
+    def backward(self, dist):
+        self.forward(-float(dist))
+
+    def right(self, angle):
+        self._op()
+        self.heading = (self.heading + float(angle)) % 360
+
+    def left(self, angle):
+        self._op()
+        self.heading = (self.heading - float(angle)) % 360
+
+    def setheading(self, angle):
+        self._op()
+        self.heading = float(angle) % 360
+
+    def penup(self):
+        self._op()
+        self.pen_down = False
+        self._new_path()
+
+    def pendown(self):
+        self._op()
+        self.pen_down = True
+        self._new_path()
+
+    def goto(self, x, y):
+        self._op()
+        self.x, self.y = float(x), float(y)
+        self._point()
+
+    def setpos(self, x, y):
+        # teleports and starts a non-drawing path (as in turtle.js, until the next style change)
+        self._op()
+        self.x, self.y = float(x), float(y)
+        self._new_path(down=False, fill=False)
+
+    def moveto(self, x, y):
+        self._op()
+        x, y = float(x), float(y)
+        self.heading = (90 - math.degrees(math.atan2(y - self.y, x - self.x))) % 360
+        self.x, self.y = x, y
+        self._point()
+
+    def setx(self, x):
+        self._op()
+        self.x = float(x)
+
+    def sety(self, y):
+        self._op()
+        self.y = float(y)
+
+    def home(self):
+        self.goto(0, 0)
+        self.setheading(0)
+
+    def clear(self):
+        self._op()
+        self.paths = []
+        self._new_path()
+
+    def init(self, force=True):
+        self._op()
+        self.reset()
+
+    def color(self, *args):
+        self._op()
+        if len(args) == 1:
+            self.stroke = self.fillcolor = to_color(args[0])
+        elif len(args) == 2:
+            self.stroke, self.fillcolor = to_color(args[0]), to_color(args[1])
+        self._new_path()
+        if self.filling and self.active_fill is not None:
+            self.active_fill.stroke, self.active_fill.fillstyle = self.stroke, self.fillcolor
+
+    def pencolor(self, c):
+        self._op()
+        self.stroke = to_color(c)
+        self._new_path()
+
+    def fillcolor_(self, c):
+        self._op()
+        self.fillcolor = to_color(c)
+        self._new_path()
+
+    def pensize(self, w):
+        self._op()
+        self.width = float(w)
+        self._new_path()
+
+    def begin_fill(self):
+        self._op()
+        if self.filling:
+            return
+        self.filling = True
+        self.active_fill = _Path(self.pen_down, "transparent", 1.0, True, self.fillcolor, self.x, self.y)
+        self.paths.append(self.active_fill)
+
+    def end_fill(self):
+        self._op()
+        if not self.filling:
+            return
+        self.active_fill = None
+        self.filling = False
+        self._new_path()
+
+    def dot(self, size=5, c=None):
+        self._op()
+        color = to_color(c) if c else self.stroke
+        path = _Path(False, color, 1.0, True, color, self.x, self.y)
+        path.dot = max(0.5, float(size)) / 2
+        self.paths.append(path)
+
+    def circle(self, radius, steps=120):
+        r = float(radius)
+        s = max(8, int(steps))
+        step = 2 * math.pi * abs(r) / s
+        turn = 360 / s * (1 if r >= 0 else -1)
+        for _ in range(s):
+            self.forward(step)
+            self.left(turn)
+
+    def label(self, text):
+        self._op()
+        path = _Path(False, self.stroke, 1.0, True, self.stroke, self.x, self.y)
+        path.text = str(text)
+        self.paths.append(path)
+
+    def noop(self, *args, **kwargs):
+        self._op()
+
+    def module(self, name="turtle"):
+        """Module object with the turtle.js API bound to this recorder."""
+        api = {
+            "forward": self.forward, "backward": self.backward, "right": self.right, "left": self.left,
+            "penup": self.penup, "pendown": self.pendown, "pu": self.penup, "pd": self.pendown,
+            "penDown": self.pendown, "penUp": self.penup, "goto": self.goto, "setPos": self.setpos,
+            "setpos": self.setpos, "moveTo": self.moveto, "setheading": self.setheading,
+            "setHeading": self.setheading, "home": self.home, "setX": self.setx, "setY": self.sety,
+            "showTurtle": self.noop, "hideturtle": self.noop, "st": self.noop, "ht": self.noop,
+            "hideTurtle": self.noop, "speed": self.noop, "setFontSize": self.noop,
+            "color": self.color, "pencolor": self.pencolor, "fillcolor": self.fillcolor_,
+            "begin_fill": self.begin_fill, "end_fill": self.end_fill, "pensize": self.pensize,
+            "width": self.pensize, "setPenWidth": self.pensize, "setPenColor": self.pencolor,
+            "setFillColor": self.fillcolor_, "startPath": self.begin_fill, "fillPath": self.end_fill,
+            "dot": self.dot, "circle": self.circle, "label": self.label,
+            "clear": self.clear, "reset": self.init, "init": self.init, "initTurtle": self.init,
+            "turtleImg": None,
+            "getX": lambda: self.x, "getY": lambda: self.y, "xcor": lambda: self.x, "ycor": lambda: self.y,
+            "heading": lambda: self.heading,
+        }
+        module = types.ModuleType(name)
+        module.__dict__.update(api)
+        return module
+
+
+def _no_input(prompt=""):
+    raise EOFError("keine Eingabe in der Vorschau")
+
+
+def run_script(code, timeout=DEFAULT_TIMEOUT, max_ops=MAX_OPS, seed=0):
+    """
+    Run turtle code (repeat already expanded) headless. Returns (recorder, info) with
+    info = {"status": ok|timeout|limit|error, "error", "ops", "segments", "prints", "cpu_s", "wall_s",
+    "peak_kb"}; peak_kb is how much the peak RSS of the process grew during the run (POSIX,
+    only meaningful in a fresh process: see _job_main).
+    """
+    base = _max_rss_kb()
+    t0, c0 = time.perf_counter(), time.process_time()
+    rec = Recorder(max_ops, t0 + timeout if timeout else None)
+    prints = [0]
+
+    def quiet_print(*args, **kwargs):
+        prints[0] += 1
+
+    scope_builtins = dict(builtins.__dict__, input=_no_input, print=quiet_print)
+    scope = {"__name__": "__main__", "__builtins__": scope_builtins}
+    saved_modules = {name: sys.modules.get(name) for name in TURTLE_MODULES}
+    saved_sleep, saved_random = time.sleep, random.getstate()
+    use_alarm = bool(timeout) and hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+    status, error = "ok", None
+    try:
+        for name in TURTLE_MODULES:
+            sys.modules[name] = rec.module(name)
+        time.sleep = lambda seconds: None
+        random.seed(seed)
+        if use_alarm:
+            old_handler = signal.signal(signal.SIGALRM, _on_alarm)
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+        try:
+            exec(compile(code, "<preview>", "exec"), scope)
+        finally:
+            if use_alarm:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+                signal.signal(signal.SIGALRM, old_handler)
+    except PreviewTimeout:
+        status, error = "timeout", f"Zeitlimit ({timeout:g} s) überschritten"
+    except PreviewLimit:
+        status, error = "limit", f"mehr als {max_ops} Turtle-Aufrufe"
+    except SystemExit:
+        pass
+    except Exception as e:
+        status, error = "error", f"{type(e).__name__}: {e}"
+    finally:
+        for name, module in saved_modules.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+        time.sleep = saved_sleep
+        random.setstate(saved_random)
+    cpu, wall = time.process_time() - c0, time.perf_counter() - t0
+    info = {"status": status, "ops": rec.ops, "segments": rec.segments, "prints": prints[0],
+            "cpu_s": round(cpu, 4), "wall_s": round(wall, 4)}
+    if base is not None:
+        info["peak_kb"] = max(0, _max_rss_kb() - base)
+    if error:
+        info["error"] = error
+    return rec, info
+
+
+def _on_alarm(signum, frame):
+    raise PreviewTimeout()
+
+
+def _max_rss_kb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss  # bytes on macOS, KiB elsewhere
+
+
+# ---------- Rasterizer ----------
+_NAMED = {
+    "black": (0, 0, 0), "white": (255, 255, 255), "red": (255, 0, 0), "green": (0, 128, 0),
+    "blue": (0, 0, 255), "yellow": (255, 255, 0), "orange": (255, 165, 0), "purple": (128, 0, 128),
+    "pink": (255, 192, 203), "brown": (165, 42, 42), "gray": (128, 128, 128), "grey": (128, 128, 128),
+    "cyan": (0, 255, 255), "aqua": (0, 255, 255), "magenta": (255, 0, 255), "fuchsia": (255, 0, 255),
+    "lime": (0, 255, 0), "navy": (0, 0, 128), "maroon": (128, 0, 0), "olive": (128, 128, 0),
+    "teal": (0, 128, 128), "silver": (192, 192, 192), "gold": (255, 215, 0), "violet": (238, 130, 238),
+    "turquoise": (64, 224, 208), "darkgreen": (0, 100, 0), "darkblue": (0, 0, 139), "darkred": (139, 0, 0),
+    "lightblue": (173, 216, 230), "lightgreen": (144, 238, 144), "lightgray": (211, 211, 211),
+    "lightgrey": (211, 211, 211), "darkgray": (169, 169, 169), "darkgrey": (169, 169, 169),
+    "indigo": (75, 0, 130), "beige": (245, 245, 220), "salmon": (250, 128, 114), "skyblue": (135, 206, 235),
+}
+_RGB_FUNC = re.compile(r"^rgba?\(\s*([\d.]+)\s*,\s*([\d.]+)\s*,\s*([\d.]+)")
+
+
+def parse_color(text):
+    """RGBA bytes of a CSS colour as used by the examples; None for transparent."""
+    s = str(text).strip().lower()
+    if s in ("transparent", "none", ""):
+        return None
+    if s.startswith("#"):
+        h = s[1:]
+        if len(h) in (3, 4):
+            h = "".join(c * 2 for c in h[:3])
+        try:
+            return bytes((int(h[0:2], 16), int(h[2:4], 16), int(h[4:6], 16), 255))
+        except ValueError:
+            return bytes((0, 0, 0, 255))
+    m = _RGB_FUNC.match(s)
+    if m:
+        return bytes([max(0, min(255, round(float(v)))) for v in m.groups()] + [255])
+    return bytes(_NAMED.get(s, (0, 0, 0)) + (255,))
+
+
+class Canvas:
+    """RGBA pixel buffer with nonzero-winding polygon fill (canvas 2D default)."""
+
+    def __init__(self, width, height, background=BACKGROUND):
+        self.width = width
+        self.height = height
+        self.rgba = bytearray(bytes(background) * (width * height))
+
+    def fill_polygon(self, points, color):
+        edges = []
+        for i in range(len(points)):
+            (x0, y0), (x1, y1) = points[i - 1], points[i]
+            if y0 == y1:
+                continue
+            direction = 1
+            if y0 > y1:
+                x0, y0, x1, y1, direction = x1, y1, x0, y0, -1
+            edges.append((y0, y1, x0, (x1 - x0) / (y1 - y0), direction))
+        if not edges:
+            return
+        top = max(0, math.ceil(min(e[0] for e in edges) - 0.5))
+        bottom = min(self.height - 1, math.floor(max(e[1] for e in edges) - 0.5))
+        width, rgba = self.width, self.rgba
+        for row in range(top, bottom + 1):
+            yc = row + 0.5
+            xs = sorted((x0 + (yc - y0) * slope, d) for y0, y1, x0, slope, d in edges if y0 <= yc < y1)
+            winding = 0
+            for i in range(len(xs) - 1):
+                winding += xs[i][1]
+                if not winding:
+                    continue
+                a = max(0, math.ceil(xs[i][0] - 0.5))
+                b = min(width, math.ceil(xs[i + 1][0] - 0.5))
+                if b > a:
+                    o = (row * width + a) * 4
+                    rgba[o:o + (b - a) * 4] = color * (b - a)
+
+    def stroke_polyline(self, points, line_width, color):
+        half = max(line_width, 1.0) / 2
+        joins = line_width >= 3
+        for (x0, y0), (x1, y1) in zip(points, points[1:]):
+            dx, dy = x1 - x0, y1 - y0
+            length = math.hypot(dx, dy)
+            if not length:
+                continue
+            nx, ny = -dy / length * half, dx / length * half
+            self.fill_polygon(((x0 + nx, y0 + ny), (x1 + nx, y1 + ny), (x1 - nx, y1 - ny), (x0 - nx, y0 - ny)), color)
+            if joins:
+                self.fill_circle(x1, y1, half, color)
+
+    def fill_circle(self, cx, cy, r, color):
+        n = max(12, min(64, int(r * 2)))
+        self.fill_polygon([(cx + r * math.cos(2 * math.pi * i / n), cy + r * math.sin(2 * math.pi * i / n))
+                           for i in range(n)], color)
+
+
+def _bounds(paths):
+    xs, ys = [], []
+    for p in paths:
+        if p.dot:
+            x, y = p.points[0]
+            xs += (x - p.dot, x + p.dot)
+            ys += (y - p.dot, y + p.dot)
+        elif p.text is None and len(p.points) > 1 and (p.down or p.fill):
+            half = p.width / 2 if p.down else 0
+            for x, y in p.points:
+                xs += (x - half, x + half)
+                ys += (y - half, y + half)
+    if not xs:
+        return None
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def rasterize(paths, size=DEFAULT_SIZE):
+    """(width, height, rgba) of the drawing cropped and fitted into size, None if nothing is drawn."""
+    box = _bounds(paths)
+    if box is None:
+        return None
+    x0, y0, x1, y1 = box[0] - MARGIN, box[1] - MARGIN, box[2] + MARGIN, box[3] + MARGIN
+    scale = min(size[0] / (x1 - x0), size[1] / (y1 - y0), 1.0)  # like a screenshot, never enlarged
+    out_w, out_h = max(1, round((x1 - x0) * scale)), max(1, round((y1 - y0) * scale))
+    f = scale * SUPERSAMPLE
+    canvas = Canvas(out_w * SUPERSAMPLE, out_h * SUPERSAMPLE)
+
+    def to_px(pts):
+        return [((x - x0) * f, (y1 - y) * f) for x, y in pts]
+
+    for p in paths:  # order and fill-then-stroke as drawPaths() in turtle.js
+        if p.text is not None:
+            continue
+        if p.dot:
+            color = parse_color(p.fillstyle)
+            if color:
+                cx, cy = to_px(p.points[:1])[0]
+                canvas.fill_circle(cx, cy, p.dot * f, color)
+            continue
+        if len(p.points) < 2:
+            continue
+        pts = to_px(p.points)
+        if p.fill:
+            color = parse_color(p.fillstyle)
+            if color and len(pts) > 2:
+                canvas.fill_polygon(pts, color)
+        if p.down:
+            color = parse_color(p.stroke)
+            if color:
+                canvas.stroke_polyline(pts, max(p.width * f, SUPERSAMPLE), color)
+    return out_w, out_h, downscale(canvas.width, canvas.height, canvas.rgba, out_w, out_h)
+
+
+# ---------- Build ----------
+def preview_key(script, size):
+    h = hashlib.sha256(f"{RENDER_VERSION}:{size[0]}x{size[1]}:".encode("ascii"))
+    h.update(script)
+    return h.hexdigest()[:16]
+
+
+def preview_name(file, key):
+    """turtlebeispiele/beispiel1.py -> turtlebeispiele/previews/beispiel1.<key>.png"""
+    base = os.path.basename(file)
+    stem = base[:-len(".py.txt")] if base.endswith(".py.txt") else os.path.splitext(base)[0]
+    return "/".join(p for p in (os.path.dirname(file), PREVIEW_DIR, f"{stem}.{key}.png") if p)
+
+
+def render_preview(code, dst, size=DEFAULT_SIZE, timeout=DEFAULT_TIMEOUT, max_ops=MAX_OPS, on_ran=None):
+    """
+    Run code and write its drawing to dst. Returns the run info (with "drawn" and "size").
+    on_ran() is called when the script is done, before rendering.
+    """
+    rec, info = run_script(extend_repeat(code), timeout, max_ops)
+    if on_ran is not None:
+        on_ran()
+    image = rasterize(rec.paths, size)
+    info["drawn"] = image is not None
+    info["labels"] = sum(1 for p in rec.paths if p.text is not None)
+    if image is not None:
+        w, h, rgba = image
+        png = encode_png(w, h, rgba)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        atomic_write(dst, lambda f: f.write(png), binary=True)
+        info["size"] = [w, h]
+    return info
+
+
+def run_cost(info):
+    """The `cost` field of an entry from the run info."""
+    cost = {"cpu_ms": round(info["cpu_s"] * 1000)}
+    for key, field in (("ops", "draw_ops"), ("segments", "segments"), ("peak_kb", "peak_kb")):
+        if key in info:
+            cost[field] = info[key]
+    if info["status"] in ("timeout", "limit", "killed"):
+        cost["stopped"] = info["status"]
+    return cost
+
+
+def _render_job(job, on_ran=None):
+    src, dst, size, timeout, max_ops = job
+    try:
+        with open(src, "rb") as f:
+            code = f.read().decode("utf-8")
+        return dst, render_preview(code, dst, size, timeout, max_ops, on_ran), None
+    except Exception as e:
+        return dst, None, f"{type(e).__name__}: {e}"
+
+
+def _job_main(job, conn):
+    """
+    Worker process entry: limits first, then one render. conn gets None when the script
+    is done, then the _render_job result.
+    """
+    timeout = job[3]
+    if resource is not None:
+        if timeout:
+            cpu = math.ceil(timeout + START_GRACE + RENDER_TIMEOUT)
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+        for limit, value in ((resource.RLIMIT_AS, MAX_MEMORY), (resource.RLIMIT_FSIZE, MAX_FILE_BYTES)):
+            hard = resource.getrlimit(limit)[1]
+            resource.setrlimit(limit, (value if hard == resource.RLIM_INFINITY else min(value, hard), hard))
+    conn.send(_render_job(job, lambda: conn.send(None)))
+    conn.close()
+
+
+def _mp_context():
+    # forkserver/spawn: a fresh interpreter state per job, and safe from the watcher's threads
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def run_jobs(jobs, workers=None, timeout=DEFAULT_TIMEOUT):
+    """
+    _render_job results for jobs, each run in its own process, at most `workers` at a time.
+    A worker whose script runs past the time limit (plus START_GRACE) or whose rendering
+    takes longer than RENDER_TIMEOUT is killed.
+    """
+    ctx = _mp_context()
+    workers = max(1, workers or os.cpu_count() or 1)
+    results = [None] * len(jobs)
+    pending = list(range(len(jobs)))[::-1]
+    running = {}  # result pipe -> [job index, process, start, deadline or None]
+    while pending or running:
+        while pending and len(running) < workers:
+            i = pending.pop()
+            recv, send = ctx.Pipe(duplex=False)
+            proc = ctx.Process(target=_job_main, args=(jobs[i], send), name="turtle-preview", daemon=True)
+            proc.start()
+            send.close()
+            start = time.monotonic()
+            running[recv] = [i, proc, start, start + timeout + START_GRACE if timeout else None]
+        deadlines = [job[3] for job in running.values() if job[3] is not None]
+        wait = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+        ready = multiprocessing.connection.wait(list(running), wait)
+        now = time.monotonic()
+        for recv in list(running):
+            i, proc, start, deadline = running[recv]
+            result = None
+            if recv in ready:
+                try:
+                    message = recv.recv()
+                except (EOFError, OSError):  # worker died without a result
+                    proc.join()
+                    result = jobs[i][1], None, f"Worker beendet (Exitcode {proc.exitcode})"
+                else:
+                    if message is None:  # script done: now it may render
+                        running[recv][3] = now + RENDER_TIMEOUT if timeout else None
+                        continue
+                    result = message
+            elif deadline is not None and now >= deadline:
+                proc.kill()
+                result = jobs[i][1], {"status": "killed", "drawn": False, "cpu_s": round(now - start, 4),
+                                      "error": f"Zeitlimit ({timeout:g} s) überschritten, abgebrochen"}, None
+            else:
+                continue
+            del running[recv]
+            proc.join()
+            recv.close()
+            results[i] = result
+    return results
+
+
+def read_cache(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == CACHE_VERSION:
+            return data["renders"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return {}
+
+
+def build_previews(entries, root=ROOT, size=DEFAULT_SIZE, jobs=None, timeout=DEFAULT_TIMEOUT, max_ops=MAX_OPS,
+                   keep_images=False, cache_path=DEFAULT_CACHE):
+    """
+    Renders previews for the python entries and updates their `image` and `cost` (in place).
+    Returns a report dict; report["used"] is the set of preview files in use.
+    """
+    cache = read_cache(cache_path) if cache_path else {}
+    report = {"rendered": [], "cached": 0, "updated": 0, "costs_updated": 0, "no_drawing": [], "failed": [],
+              "missing": [], "runs": {}}
+    planned, todo, used = [], {}, set()
+    for e in entries:
+        if e.get("runtime") != "python":
+            continue
+        used_path, script = read_script(root, e["file"])
+        if script is None:
+            report["missing"].append(e["file"])
+            continue
+        key = preview_key(script, size)
+        rel = preview_name(e["file"], key)
+        dst = os.path.join(root, rel)
+        used.add(dst)
+        planned.append((e, key, rel))
+        known = cache.get(key)
+        if known and (not known.get("drawn") or os.path.exists(dst)):
+            continue
+        todo.setdefault(key, (os.path.join(root, used_path), dst, size, timeout, max_ops))
+
+    fresh = {}  # key -> run info of this build
+    if todo:
+        work = list(todo.items())
+        results = run_jobs([job for _, job in work], jobs, timeout)
+        for (key, _), (dst, info, err) in zip(work, results):
+            if err:
+                info = {"status": "error", "error": err, "drawn": False}
+            else:
+                cache[key] = info
+            fresh[key] = info
+            if info["drawn"]:
+                report["rendered"].append(os.path.relpath(dst, root).replace(os.sep, "/"))
+
+    for e, key, rel in planned:
+        info = fresh.get(key) or cache[key]
+        if key not in fresh:
+            report["cached"] += 1
+        report["runs"][e["file"]] = {k: info[k] for k in ("status", "ops", "segments", "cpu_s", "peak_kb")
+                                     if k in info}
+        if "cpu_s" in info:  # the script ran (not: worker error)
+            cost = run_cost(info)
+            if e.get("cost") != cost:
+                e["cost"] = cost
+                report["costs_updated"] += 1
+        if not info.get("drawn"):
+            target = report["failed"] if info.get("status") != "ok" else report["no_drawing"]
+            target.append({"file": e["file"], **({"error": info["error"]} if info.get("error") else {})})
+            continue
+        if e.get("image") == rel:
+            continue
+        handmade = e.get("image") and f"/{PREVIEW_DIR}/" not in "/" + e["image"]
+        if keep_images and handmade:
+            continue
+        e["image"] = rel
+        e.pop("thumbnail", None)  # belonged to the previous image
+        report["updated"] += 1
+
+    if cache_path and todo:
+        data = {"version": CACHE_VERSION, "renders": cache}
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            atomic_write(cache_path, lambda f: json.dump(data, f, separators=(",", ":")))
+        except OSError:
+            pass  # read-only checkout: results are simply not cached
+    report["used"] = used
+    return report
+
+
+def prune(root, used, code_dirs):
+    """Remove previews in the given script folders that no entry references."""
+    removed = []
+    for d in code_dirs:
+        pdir = os.path.join(root, d, PREVIEW_DIR)
+        if not os.path.isdir(pdir):
+            continue
+        for name in os.listdir(pdir):
+            path = os.path.join(pdir, name)
+            if name.endswith(".png") and path not in used:
+                os.remove(path)
+                removed.append(os.path.relpath(path, root).replace(os.sep, "/"))
+    return removed
+
+
+def _parse_size(text):
+    w, _, h = text.lower().partition("x")
+    return int(w), int(h or w)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render turtle examples headless and record the previews in the catalog.")
+    parser.add_argument("catalog", nargs="?", default=None, help=f"catalog (default: <root>/{DEFAULT_CATALOG})")
+    parser.add_argument("--root", default=ROOT, help="web root the catalog paths are relative to")
+    parser.add_argument("--size", type=_parse_size, default=DEFAULT_SIZE, help="bounding box WxH (default 400x300)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="seconds per script (default 5)")
+    parser.add_argument("--max-ops", type=int, default=MAX_OPS, help=f"turtle calls per script (default {MAX_OPS})")
+    parser.add_argument("--jobs", "-j", type=int, default=None, help="worker processes")
+    parser.add_argument("--keep-images", action="store_true", help="keep hand-made images, only fill in missing ones")
+    parser.add_argument("--prune", action="store_true", help="delete previews no catalog uses any more")
+    parser.add_argument("--catalog", dest="catalogs", action="append", default=None,
+                        help="further catalog whose previews --prune keeps (repeatable; default: all of the tree)")
+    args = parser.parse_args(argv)
+
+    catalog = args.catalog or os.path.join(args.root, DEFAULT_CATALOG)
+    try:
+        entries = normalize_entries(read_examples(catalog))
+        before = json.dumps(entries, sort_keys=True)
+        report = build_previews(entries, args.root, args.size, args.jobs, args.timeout, args.max_ops,
+                                args.keep_images)
+        used = report.pop("used")
+        changed = json.dumps(entries, sort_keys=True) != before
+        if changed:
+            write_catalog_atomic(catalog, entries)
+        if args.prune:
+            dirs = {os.path.dirname(e["file"]) for e in entries if e.get("runtime") == "python"}
+            others = args.catalogs or [os.path.join(args.root, c) for c in CATALOGS]
+            report["pruned"] = prune(args.root, used | referenced_files(args.root, [catalog, *others]), dirs)
+    except Exception as e:
+        json.dump({"catalog": catalog, "error": f"{type(e).__name__}: {e}"}, sys.stdout, ensure_ascii=False)
+        sys.stdout.write("\n")
+        return 2
+    report.update(catalog=catalog, catalog_updated=changed)
+    json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())